@@ -0,0 +1,267 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytest
+
+from pytest_sosu.plugin_helpers import parametrize_capabilities
+from pytest_sosu.resolver import CapabilitiesResolver
+from pytest_sosu.utils import ImmutableDict
+from pytest_sosu.webdriver import (
+    Browser,
+    Capabilities,
+    CapabilitiesMatrix,
+    Platform,
+    SauceOptions,
+)
+
+DEFAULT_SCALES = (1_000, 10_000, 100_000)
+DEFAULT_THRESHOLDS_PATH = os.path.join(os.path.dirname(__file__), "thresholds.json")
+# Measured values may exceed the recorded ones by these factors;
+# timings are much noisier across machines than allocations.
+DEFAULT_TIME_TOLERANCE = 3.0
+DEFAULT_MEMORY_TOLERANCE = 1.25
+REPEAT = 3
+
+Benchmark = Callable[[int], Callable[[], Any]]
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    def decorator(func: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+def build_matrix(scale: int) -> CapabilitiesMatrix:
+    sauce_options_count = 10
+    browsers_count = max(int((scale / sauce_options_count) ** 0.5), 1)
+    platforms_count = max(scale // (sauce_options_count * browsers_count), 1)
+    return CapabilitiesMatrix(
+        browsers=[Browser("chrome", 100 + i) for i in range(browsers_count)],
+        platforms=[Platform("Windows", str(i)) for i in range(platforms_count)],
+        sauce_options_list=[
+            SauceOptions(screen_resolution=f"{1000 + i}x768", tags=[f"tag-{i}"])
+            for i in range(sauce_options_count)
+        ],
+    )
+
+
+def build_capabilities_list(scale: int) -> List[Capabilities]:
+    return list(build_matrix(scale).iter_capabilities())
+
+
+class FakeDefinition:
+    def __init__(self, matrix: CapabilitiesMatrix) -> None:
+        self.own_markers = [pytest.mark.sosu(capabilities_matrix=matrix).mark]
+
+
+class FakeMetafunc:
+    fixturenames = ["sosu_webdriver_parameter_capabilities"]
+
+    def __init__(self, matrix: CapabilitiesMatrix) -> None:
+        self.definition = FakeDefinition(matrix)
+        self.parameters: List[Any] = []
+
+    def parametrize(self, argnames: str, argvalues: List[Any]) -> None:
+        self.parameters = argvalues
+
+
+@benchmark("parametrize_capabilities")
+def bench_parametrize_capabilities(scale: int) -> Callable[[], Any]:
+    matrix = build_matrix(scale)
+    return lambda: parametrize_capabilities(FakeMetafunc(matrix))  # type: ignore
+
+
+@benchmark("CapabilitiesMatrix.iter_capabilities")
+def bench_iter_capabilities(scale: int) -> Callable[[], Any]:
+    matrix = build_matrix(scale)
+    return lambda: list(matrix.iter_capabilities())
+
+
+@benchmark("Capabilities.merge")
+def bench_capabilities_merge(scale: int) -> Callable[[], Any]:
+    capabilities_list = build_capabilities_list(scale)
+    base = Capabilities(sauce_options=SauceOptions(name="test", build="build"))
+    return lambda: [base.merge(c) for c in capabilities_list]
+
+
+@benchmark("Capabilities.slug")
+def bench_capabilities_slug(scale: int) -> Callable[[], Any]:
+    capabilities_list = build_capabilities_list(scale)
+    return lambda: [c.slug for c in capabilities_list]
+
+
+@benchmark("Capabilities.to_dict")
+def bench_capabilities_to_dict(scale: int) -> Callable[[], Any]:
+    capabilities_list = build_capabilities_list(scale)
+    return lambda: [c.to_dict() for c in capabilities_list]
+
+
+def build_test_parameters(scale: int) -> List[Tuple[str, Capabilities]]:
+    # Tests of a suite sharing a small matrix.
+    cells = list(
+        CapabilitiesMatrix(
+            browsers=[Browser("chrome", 100 + i) for i in range(10)],
+            platforms=[Platform("Windows", "10")],
+        ).iter_capabilities()
+    )
+    return [(f"test_{i}", cells[i % len(cells)]) for i in range(scale)]
+
+
+@benchmark("capabilities fixture chain")
+def bench_capabilities_fixture_chain(scale: int) -> Callable[[], Any]:
+    test_parameters = build_test_parameters(scale)
+
+    def run() -> List[Capabilities]:
+        return [
+            Capabilities(
+                browser=Browser.default(),
+                platform=Platform.default(),
+                sauce_options=SauceOptions(name=test_name, build="build"),
+            ).merge(parameter)
+            for test_name, parameter in test_parameters
+        ]
+
+    return run
+
+
+@benchmark("CapabilitiesResolver.resolve")
+def bench_capabilities_resolver_resolve(scale: int) -> Callable[[], Any]:
+    test_parameters = build_test_parameters(scale)
+
+    def run() -> List[Capabilities]:
+        resolver = CapabilitiesResolver(__name__)
+        return [
+            resolver.resolve(test_name, "build", None, parameter)
+            for test_name, parameter in test_parameters
+        ]
+
+    return run
+
+
+@benchmark("ImmutableDict.__hash__")
+def bench_immutable_dict_hash(scale: int) -> Callable[[], Any]:
+    dicts = [ImmutableDict({"a": i, "b": str(i), "c": i * 2.0}) for i in range(scale)]
+    return lambda: [hash(d) for d in dicts]
+
+
+@benchmark("ImmutableDict.merge")
+def bench_immutable_dict_merge(scale: int) -> Callable[[], Any]:
+    dicts = [ImmutableDict({"a": i, "b": str(i)}) for i in range(scale)]
+    other = ImmutableDict({"b": "x", "c": 3})
+    return lambda: [d.merge(other) for d in dicts]
+
+
+def measure(func: Callable[[], Any]) -> Tuple[float, int]:
+    best_time = float("inf")
+    for _ in range(REPEAT):
+        gc.collect()
+        start_time = time.perf_counter()
+        func()
+        best_time = min(best_time, time.perf_counter() - start_time)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best_time, peak
+
+
+def run_benchmarks(scales: List[int], names: List[str]) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in names:
+        for scale in scales:
+            seconds, peak = measure(BENCHMARKS[name](scale))
+            key = f"{name}[{scale}]"
+            results[key] = {"seconds": round(seconds, 6), "peak_kib": peak // 1024}
+            sys.stdout.write(
+                f"{key:<50} {seconds * 1000:>10.2f} ms {peak / 1024:>10.0f} KiB\n"
+            )
+    return results
+
+
+def check_thresholds(
+    results: Dict[str, Dict[str, Any]],
+    thresholds: Dict[str, Any],
+    time_tolerance: float,
+    memory_tolerance: float,
+) -> List[str]:
+    regressions = []
+    for key, result in results.items():
+        expected = thresholds.get("benchmarks", {}).get(key)
+        if expected is None:
+            continue
+        max_seconds = expected["seconds"] * time_tolerance
+        if result["seconds"] > max_seconds:
+            regressions.append(f"{key}: {result['seconds']:.4f}s > {max_seconds:.4f}s")
+        max_peak_kib = expected["peak_kib"] * memory_tolerance
+        if result["peak_kib"] > max_peak_kib:
+            regressions.append(
+                f"{key}: {result['peak_kib']} KiB > {max_peak_kib:.0f} KiB"
+            )
+    return regressions
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark collection-time capabilities handling"
+    )
+    parser.add_argument(
+        "--scales",
+        default=",".join(str(s) for s in DEFAULT_SCALES),
+        help="comma separated numbers of capabilities",
+    )
+    parser.add_argument("-k", dest="keyword", help="run benchmarks matching keyword")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS_PATH)
+    parser.add_argument(
+        "--update-thresholds",
+        action="store_true",
+        help="store the measured values as new thresholds",
+    )
+    parser.add_argument("--time-tolerance", type=float)
+    parser.add_argument("--memory-tolerance", type=float)
+    args = parser.parse_args(argv)
+
+    scales = [int(s) for s in args.scales.split(",")]
+    names = [n for n in BENCHMARKS if not args.keyword or args.keyword in n]
+    results = run_benchmarks(scales, names)
+
+    thresholds: Dict[str, Any] = {}
+    if os.path.exists(args.thresholds):
+        with open(args.thresholds, encoding="utf-8") as f:
+            thresholds = json.load(f)
+
+    if args.update_thresholds:
+        thresholds.setdefault("time_tolerance", DEFAULT_TIME_TOLERANCE)
+        thresholds.setdefault("memory_tolerance", DEFAULT_MEMORY_TOLERANCE)
+        thresholds.setdefault("benchmarks", {}).update(results)
+        with open(args.thresholds, "w", encoding="utf-8") as f:
+            json.dump(thresholds, f, indent=2, sort_keys=True)
+            f.write("\n")
+        return 0
+
+    regressions = check_thresholds(
+        results,
+        thresholds,
+        time_tolerance=args.time_tolerance
+        or thresholds.get("time_tolerance", DEFAULT_TIME_TOLERANCE),
+        memory_tolerance=args.memory_tolerance
+        or thresholds.get("memory_tolerance", DEFAULT_MEMORY_TOLERANCE),
+    )
+    for regression in regressions:
+        sys.stderr.write(f"REGRESSION {regression}\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import binascii
+import json
+import os
+from typing import Any, Callable, List
+
+from pytest_sosu.background import BackgroundExecutor
+from pytest_sosu.logging import get_struct_logger
+from pytest_sosu.utils import to_safe_filename
+
+logger = get_struct_logger(__name__)
+
+DEFAULT_ARTIFACTS_WORKERS = 4
+# Has to be a multiple of 4 so every chunk is valid base64 on its own.
+BASE64_CHUNK_SIZE = 64 * 1024
+
+
+class ArtifactCollector(BackgroundExecutor):
+    def __init__(
+        self, base_dir: str, max_workers: int = DEFAULT_ARTIFACTS_WORKERS
+    ) -> None:
+        super().__init__(max_workers, thread_name_prefix="sosu-artifacts")
+        self.base_dir = base_dir
+
+    def for_test(self, nodeid: str) -> TestArtifacts:
+        test_dir = os.path.join(self.base_dir, to_safe_filename(nodeid))
+        return TestArtifacts(self, test_dir)
+
+
+class TestArtifacts:
+    __test__ = False
+
+    def __init__(self, collector: ArtifactCollector, directory: str) -> None:
+        self._collector = collector
+        self.directory = directory
+        self.paths: List[str] = []
+
+    def capture(self, driver: Any) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._capture(
+            "screenshot.png",
+            driver.get_screenshot_as_base64,
+            write_base64_file,
+        )
+        self._capture("page_source.html", lambda: driver.page_source, write_text_file)
+        self._capture(
+            "browser_log.json",
+            lambda: json.dumps(driver.get_log("browser"), indent=2),
+            write_text_file,
+        )
+
+    def _capture(
+        self,
+        filename: str,
+        getter: Callable[[], str],
+        writer: Callable[[str, str], None],
+    ) -> None:
+        try:
+            data = getter()
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.debug("Artifact capture failed", filename=filename, exc=exc)
+            return
+        path = os.path.join(self.directory, filename)
+        self._collector.submit(writer, path, data)
+        self.paths.append(path)
+
+
+def write_base64_file(path: str, data: str) -> None:
+    with open(path, "wb") as f:
+        for start in range(0, len(data), BASE64_CHUNK_SIZE):
+            end = start + BASE64_CHUNK_SIZE
+            f.write(binascii.a2b_base64(data[start:end]))
+
+
+def write_text_file(path: str, data: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(data)
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from pytest_sosu.logging import get_struct_logger
+
+logger = get_struct_logger(__name__)
+
+AUTH_STATE_STORES = ("memory", "run")
+
+CAPTURE_STORAGE_SCRIPT = """
+function dump(storage) {
+    var data = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        data[key] = storage.getItem(key);
+    }
+    return data;
+}
+return {
+    "origin": window.location.origin,
+    "localStorage": dump(window.localStorage),
+    "sessionStorage": dump(window.sessionStorage)
+};
+"""
+
+RESTORE_STORAGE_SCRIPT = """
+var state = arguments[0];
+if (window.location.origin !== state.origin) {
+    return false;
+}
+Object.keys(state.localStorage).forEach(function (key) {
+    window.localStorage.setItem(key, state.localStorage[key]);
+});
+Object.keys(state.sessionStorage).forEach(function (key) {
+    window.sessionStorage.setItem(key, state.sessionStorage[key]);
+});
+state.cookies.forEach(function (cookie) {
+    // Raw value as captured, not encoded.
+    var parts = [cookie.name + "=" + cookie.value];
+    parts.push("path=" + (cookie.path || "/"));
+    if (cookie.domain && cookie.domain.charAt(0) === ".") {
+        parts.push("domain=" + cookie.domain);
+    }
+    if (cookie.expiry) {
+        parts.push("expires=" + new Date(cookie.expiry * 1000).toUTCString());
+    }
+    if (cookie.secure) {
+        parts.push("secure");
+    }
+    if (cookie.sameSite) {
+        parts.push("samesite=" + cookie.sameSite);
+    }
+    document.cookie = parts.join("; ");
+});
+if (state.reload) {
+    window.location.replace(state.url);
+}
+return true;
+"""
+
+CLEAR_STORAGE_SCRIPT = """
+window.localStorage.clear();
+window.sessionStorage.clear();
+"""
+
+AuthStateKey = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class AuthState:
+    url: str
+    origin: str
+    cookies: List[Dict[str, Any]] = field(default_factory=list)
+    local_storage: Dict[str, str] = field(default_factory=dict)
+    session_storage: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> AuthState:
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dataclasses.asdict(self)
+
+
+def capture_auth_state(driver: Any) -> AuthState:
+    storage = driver.execute_script(CAPTURE_STORAGE_SCRIPT)
+    return AuthState(
+        url=driver.current_url,
+        origin=storage["origin"],
+        cookies=driver.get_cookies(),
+        local_storage=storage["localStorage"],
+        session_storage=storage["sessionStorage"],
+    )
+
+
+def restore_auth_state(driver: Any, state: AuthState) -> bool:
+    # Cookies and storage can only be set for the current origin.
+    driver.get(state.url)
+    # HttpOnly cookies cannot be set from JavaScript, only these cost
+    # a round-trip each and a navigation by WebDriver afterwards.
+    http_only_cookies = [c for c in state.cookies if c.get("httpOnly")]
+    restored = driver.execute_script(
+        RESTORE_STORAGE_SCRIPT,
+        {
+            "url": state.url,
+            "origin": state.origin,
+            "localStorage": state.local_storage,
+            "sessionStorage": state.session_storage,
+            "cookies": [c for c in state.cookies if not c.get("httpOnly")],
+            "reload": not http_only_cookies,
+        },
+    )
+    if not restored:
+        return False
+    for cookie in http_only_cookies:
+        driver.add_cookie(cookie)
+    if http_only_cookies:
+        driver.get(state.url)
+    return True
+
+
+def is_same_url(driver: Any, state: AuthState) -> bool:
+    # Rejected state usually ends with a redirect to a login page.
+    return driver.current_url == state.url
+
+
+class MemoryAuthStateStore:
+    def __init__(self) -> None:
+        self._states: Dict[AuthStateKey, AuthState] = {}
+        self._lock = threading.Lock()
+
+    def lock(self, key: AuthStateKey) -> ContextManager[None]:
+        # Tests of a worker run one at a time.
+        return contextlib.nullcontext()
+
+    def get(self, key: AuthStateKey) -> Optional[AuthState]:
+        with self._lock:
+            return self._states.get(key)
+
+    def set(self, key: AuthStateKey, state: AuthState) -> None:
+        with self._lock:
+            self._states[key] = state
+
+    def delete(self, key: AuthStateKey) -> None:
+        with self._lock:
+            self._states.pop(key, None)
+
+
+class FileAuthStateStore:
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    @contextlib.contextmanager
+    def lock(self, key: AuthStateKey) -> Iterator[None]:
+        # Held by xdist workers while logging in, so only one of them logs
+        # in with the same user and capabilities.
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._get_path(key, ".lock"), "a", encoding="utf-8") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def get(self, key: AuthStateKey) -> Optional[AuthState]:
+        try:
+            with open(self._get_path(key), encoding="utf-8") as f:
+                return AuthState.from_dict(json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def set(self, key: AuthStateKey, state: AuthState) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._get_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump(state.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    def delete(self, key: AuthStateKey) -> None:
+        with contextlib.suppress(OSError):
+            os.remove(self._get_path(key))
+
+    def _get_path(self, key: AuthStateKey, suffix: str = ".json") -> str:
+        key_hash = hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key_hash}{suffix}")
+
+
+AuthStateStore = Union[MemoryAuthStateStore, FileAuthStateStore]
+
+
+class AuthStateCache:
+    def __init__(self, store: AuthStateStore, driver: Any, slug: str) -> None:
+        self._store = store
+        self._driver = driver
+        self._slug = slug
+
+    def login(
+        self,
+        user: str,
+        login: Callable[[Any], None],
+        check: Callable[[Any, AuthState], bool] = is_same_url,
+    ) -> bool:
+        key = (user, self._slug)
+        state = self._store.get(key)
+        if state is not None and self._restore(user, state, check):
+            return True
+        with self._store.lock(key):
+            # Possibly stored by another worker while waiting for the lock.
+            stored_state = self._store.get(key)
+            if stored_state is not None:
+                if stored_state != state and self._restore(user, stored_state, check):
+                    return True
+                self._store.delete(key)
+            login(self._driver)
+            self._store.set(key, capture_auth_state(self._driver))
+        return False
+
+    def _restore(
+        self, user: str, state: AuthState, check: Callable[[Any, AuthState], bool]
+    ) -> bool:
+        if restore_auth_state(self._driver, state) and check(self._driver, state):
+            logger.debug("Auth state restored", user=user, slug=self._slug)
+            return True
+        logger.info("Auth state rejected", user=user, slug=self._slug)
+        self._driver.delete_all_cookies()
+        self._driver.execute_script(CLEAR_STORAGE_SCRIPT)
+        return False
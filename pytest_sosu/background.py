@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+import pytest
+
+from pytest_sosu.logging import get_struct_logger
+
+logger = get_struct_logger(__name__)
+
+
+class BackgroundExecutor:
+    def __init__(
+        self,
+        max_workers: int,
+        thread_name_prefix: str = "sosu",
+        max_pending: Optional[int] = None,
+    ) -> None:
+        self._max_workers = max_workers
+        self._thread_name_prefix = thread_name_prefix
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._futures: List[concurrent.futures.Future] = []
+        self._lock = threading.Lock()
+        # Blocks `submit` while given number of tasks is queued or running.
+        self._pending_semaphore = (
+            threading.BoundedSemaphore(max_pending) if max_pending else None
+        )
+        self.failures: List[Tuple[str, str]] = []
+
+    def submit(
+        self, func: Callable[..., None], *args: Any, task_name: Optional[str] = None
+    ) -> None:
+        if self._pending_semaphore is not None:
+            self._pending_semaphore.acquire()  # pylint: disable=consider-using-with
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix=self._thread_name_prefix,
+                )
+            future = self._executor.submit(func, *args)
+            self._futures.append(future)
+        setattr(future, "sosu_task_name", task_name or getattr(func, "__name__", ""))
+        if self._pending_semaphore is not None:
+            future.add_done_callback(lambda _: self._pending_semaphore.release())
+
+    def drain(self) -> None:
+        with self._lock:
+            futures, self._futures = self._futures, []
+        for future in concurrent.futures.as_completed(futures):
+            exc = future.exception()
+            if exc is not None:
+                task_name = getattr(future, "sosu_task_name", "")
+                logger.warning(
+                    "Background task failed",
+                    thread_name_prefix=self._thread_name_prefix,
+                    task_name=task_name,
+                    exc=exc,
+                )
+                self.failures.append((task_name, f"{type(exc).__name__}: {exc}"))
+
+    def shutdown(self) -> None:
+        self.drain()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    # Run before the metrics are written by the main plugin.
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionfinish(self) -> None:
+        self.shutdown()
+
+
+class BackgroundSessionFinisher(BackgroundExecutor):
+    # Marks and quits sessions while the next tests run. Failures are not
+    # teardown errors of the tests anymore, so they are reported separately.
+
+    def __init__(self, max_workers: int) -> None:
+        super().__init__(
+            max_workers, thread_name_prefix="sosu-sessions", max_pending=max_workers
+        )
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        if not self.failures:
+            return
+        terminalreporter.write_sep("=", "sosu background session finish failures")
+        for task_name, error in self.failures:
+            terminalreporter.write_line(f"{task_name}: {error}")
@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from pytest_sosu.webdriver.commands import CommandStats
+
+COMMAND_TIMINGS_PROPERTY_NAME = "sosu_command_timings"
+COMMAND_TIMINGS_SUMMARY_LIMIT = 10
+
+
+class CommandTimingsReporter:
+    def __init__(self, summary_limit: int = COMMAND_TIMINGS_SUMMARY_LIMIT) -> None:
+        self._summary_limit = summary_limit
+        self.command_stats = CommandStats()
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport):
+        if report.when != "teardown":
+            return
+        for name, value in report.user_properties:
+            if name == COMMAND_TIMINGS_PROPERTY_NAME:
+                self.command_stats.merge_dict(json.loads(str(value)))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.command_stats:
+            return
+        terminalreporter.write_sep("=", "sosu slowest WebDriver commands")
+        for command, timing in self.command_stats.get_slowest(self._summary_limit):
+            terminalreporter.write_line(
+                f"{timing.total:.3f}s total {timing.count} calls"
+                f" (avg {timing.avg:.3f}s, max {timing.max:.3f}s) {command}"
+            )
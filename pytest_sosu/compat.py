@@ -0,0 +1,29 @@
+from typing import Any, Callable
+
+import pytest
+
+
+def _async_fixture_unavailable(func: Callable[..., Any]) -> Any:
+    # Without an asyncio plugin pytest would pass the async generator itself
+    # to the tests instead of the value it yields.
+    def fixture() -> None:
+        raise ImportError(
+            f"{func.__name__} requires pytest-asyncio,"
+            " install it with: pip install pytest-sosu[async]"
+        )
+
+    fixture.__name__ = func.__name__
+    fixture.__doc__ = func.__doc__
+    return pytest.fixture(fixture)
+
+
+# Async fixtures need an asyncio pytest plugin; pytest-asyncio in strict mode
+# only handles the fixtures created by its own decorator.
+async_fixture: Callable[..., Any] = _async_fixture_unavailable
+
+try:
+    import pytest_asyncio  # type: ignore
+
+    async_fixture = pytest_asyncio.fixture
+except ImportError:
+    pass
@@ -1,11 +1,18 @@
 import argparse
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional
 
 from _pytest.config import UsageError
 
+from pytest_sosu.artifacts import DEFAULT_ARTIFACTS_WORKERS
+from pytest_sosu.auth_state import AUTH_STATE_STORES
+from pytest_sosu.live_sessions import DEFAULT_QUIT_TIMEOUT
 from pytest_sosu.logging import get_struct_logger
+from pytest_sosu.negative_cache import DEFAULT_NEGATIVE_CACHE_TTL
+from pytest_sosu.sharding import Shard, load_shard_durations
+from pytest_sosu.tunnel import DEFAULT_TUNNEL_TIMEOUT
+from pytest_sosu.utils import convert_or_none, smart_bool
 from pytest_sosu.webdriver import WebDriverUrlData
 
 DEFAULT_SAUCE_BUILD_FORMAT = "${build_basename}_${build_version}"
@@ -24,6 +31,33 @@ class SosuConfig:
     build_basename: Optional[str]
     build_version: Optional[str]
     build_format: str
+    metrics_file: Optional[str] = None
+    command_timings: bool = False
+    artifacts_dir: Optional[str] = None
+    artifacts_workers: int = DEFAULT_ARTIFACTS_WORKERS
+    shard: Optional[Shard] = None
+    shard_durations: Optional[Dict[str, float]] = None
+    export_durations: Optional[str] = None
+    rotation_build: Optional[int] = None
+    plan: bool = False
+    plan_concurrency: Optional[int] = None
+    abort_after: int = 0
+    negative_cache_ttl: int = DEFAULT_NEGATIVE_CACHE_TTL
+    clear_cache: bool = False
+    adaptive_recording: int = 0
+    background_quit: int = 0
+    quit_timeout: float = DEFAULT_QUIT_TIMEOUT
+    auth_state_store: str = "memory"
+    infra_retries: int = 0
+    resume: bool = False
+    log_buffer: int = 0
+    log_jsonl: Optional[str] = None
+    visual_baselines_dir: Optional[str] = None
+    visual_update: bool = False
+    tunnel_name: Optional[str] = None
+    tunnel_command: Optional[str] = None
+    tunnel_timeout: float = DEFAULT_TUNNEL_TIMEOUT
+    profile: Optional[str] = None
 
     @property
     def webdriver_url_data_with_credentials(self) -> WebDriverUrlData:
@@ -46,6 +80,133 @@ def build_sosu_config(args: argparse.Namespace, env: os._Environ) -> SosuConfig:
         or env.get("SAUCE_BUILD_FORMAT")
         or DEFAULT_SAUCE_BUILD_FORMAT
     )
+    metrics_file = args.sosu_metrics_file or env.get("SOSU_METRICS_FILE")
+    profile = args.sosu_profile or env.get("SOSU_PROFILE")
+    log_jsonl = args.sosu_log_jsonl or env.get("SOSU_LOG_JSONL")
+    visual_baselines_dir = args.sosu_visual_baselines_dir or env.get(
+        "SOSU_VISUAL_BASELINES_DIR"
+    )
+    visual_update = args.sosu_visual_update or smart_bool(env.get("SOSU_VISUAL_UPDATE"))
+    tunnel_name = args.sosu_tunnel_name or env.get("SOSU_TUNNEL_NAME")
+    tunnel_command = args.sosu_tunnel_command or env.get("SOSU_TUNNEL_COMMAND")
+    command_timings = args.sosu_command_timings or smart_bool(
+        env.get("SOSU_COMMAND_TIMINGS")
+    )
+    artifacts_dir = args.sosu_artifacts_dir or env.get("SOSU_ARTIFACTS_DIR")
+    try:
+        artifacts_workers = int(
+            args.sosu_artifacts_workers
+            or env.get("SOSU_ARTIFACTS_WORKERS")
+            or DEFAULT_ARTIFACTS_WORKERS
+        )
+    except ValueError:
+        raise UsageError("Invalid number of artifacts workers") from None
+    shard_str = args.sosu_shard or env.get("SOSU_SHARD")
+    shard: Optional[Shard] = None
+    shard_durations: Optional[Dict[str, float]] = None
+    rotation_build: Optional[int] = None
+    plan: bool = False
+    plan_concurrency: Optional[int] = None
+    abort_after: int = 0
+    negative_cache_ttl: int = DEFAULT_NEGATIVE_CACHE_TTL
+    clear_cache: bool = False
+    adaptive_recording: int = 0
+    background_quit: int = 0
+    quit_timeout: float = DEFAULT_QUIT_TIMEOUT
+    tunnel_timeout: float = DEFAULT_TUNNEL_TIMEOUT
+    auth_state_store: str = "memory"
+    infra_retries: int = 0
+    resume: bool = False
+    log_buffer: int = 0
+    if shard_str:
+        try:
+            shard = Shard.from_str(shard_str)
+        except ValueError as exc:
+            raise UsageError(f"Invalid shard {shard_str!r}: {exc}") from None
+    shard_durations_path = args.sosu_shard_durations or env.get("SOSU_SHARD_DURATIONS")
+    if shard_durations_path:
+        try:
+            shard_durations = load_shard_durations(shard_durations_path)
+        except (OSError, ValueError) as exc:
+            raise UsageError(f"Invalid shard durations: {exc}") from None
+    export_durations = args.sosu_export_durations or env.get("SOSU_EXPORT_DURATIONS")
+    rotation_build_str = args.sosu_rotation_build or env.get("SOSU_ROTATION_BUILD")
+    try:
+        rotation_build = convert_or_none(rotation_build_str, int)
+    except ValueError:
+        raise UsageError("Invalid rotation build number") from None
+    plan = args.sosu_plan or smart_bool(env.get("SOSU_PLAN"))
+    plan_concurrency_str = args.sosu_plan_concurrency or env.get(
+        "SOSU_PLAN_CONCURRENCY"
+    )
+    try:
+        plan_concurrency = convert_or_none(plan_concurrency_str, int)
+    except ValueError:
+        raise UsageError("Invalid plan concurrency") from None
+    try:
+        abort_after = int(args.sosu_abort_after or env.get("SOSU_ABORT_AFTER") or 0)
+    except ValueError:
+        raise UsageError("Invalid number of failures to abort after") from None
+    try:
+        log_buffer = int(args.sosu_log_buffer or env.get("SOSU_LOG_BUFFER") or 0)
+    except ValueError:
+        raise UsageError("Invalid log buffer size") from None
+    if log_buffer > 0 and log_jsonl:
+        raise UsageError("--sosu-log-buffer and --sosu-log-jsonl cannot be combined")
+    try:
+        infra_retries = int(
+            args.sosu_infra_retries or env.get("SOSU_INFRA_RETRIES") or 0
+        )
+    except ValueError:
+        raise UsageError("Invalid number of infrastructure retries") from None
+    try:
+        negative_cache_ttl = int(
+            args.sosu_negative_cache_ttl
+            or env.get("SOSU_NEGATIVE_CACHE_TTL")
+            or DEFAULT_NEGATIVE_CACHE_TTL
+        )
+    except ValueError:
+        raise UsageError("Invalid negative cache TTL") from None
+    resume = args.sosu_resume or smart_bool(env.get("SOSU_RESUME"))
+    clear_cache = args.sosu_clear_cache or smart_bool(env.get("SOSU_CLEAR_CACHE"))
+    try:
+        adaptive_recording = int(
+            args.sosu_adaptive_recording or env.get("SOSU_ADAPTIVE_RECORDING") or 0
+        )
+    except ValueError:
+        raise UsageError("Invalid number of passes for adaptive recording") from None
+    try:
+        background_quit = int(
+            args.sosu_background_quit or env.get("SOSU_BACKGROUND_QUIT") or 0
+        )
+    except ValueError:
+        raise UsageError("Invalid number of background quit threads") from None
+    if background_quit < 0:
+        raise UsageError("Number of background quit threads cannot be negative")
+    try:
+        quit_timeout = float(
+            args.sosu_quit_timeout
+            or env.get("SOSU_QUIT_TIMEOUT")
+            or DEFAULT_QUIT_TIMEOUT
+        )
+    except ValueError:
+        raise UsageError("Invalid quit timeout") from None
+    try:
+        tunnel_timeout = float(
+            args.sosu_tunnel_timeout
+            or env.get("SOSU_TUNNEL_TIMEOUT")
+            or DEFAULT_TUNNEL_TIMEOUT
+        )
+    except ValueError:
+        raise UsageError("Invalid tunnel timeout") from None
+    if tunnel_command and not tunnel_name:
+        raise UsageError("--sosu-tunnel-command requires --sosu-tunnel-name")
+    auth_state_store = (
+        args.sosu_auth_state_store or env.get("SOSU_AUTH_STATE_STORE") or "memory"
+    )
+    if auth_state_store not in AUTH_STATE_STORES:
+        choices = ", ".join(AUTH_STATE_STORES)
+        raise UsageError(f"Invalid auth state store, has to be one of: {choices}")
 
     if not username:
         raise UsageError("--sosu-username or SAUCE_USERNAME are not provided")
@@ -74,6 +235,33 @@ def build_sosu_config(args: argparse.Namespace, env: os._Environ) -> SosuConfig:
         build_basename=build_basename,
         build_version=build_version,
         build_format=build_format,
+        metrics_file=metrics_file,
+        command_timings=command_timings,
+        artifacts_dir=artifacts_dir,
+        artifacts_workers=artifacts_workers,
+        shard=shard,
+        shard_durations=shard_durations,
+        export_durations=export_durations,
+        rotation_build=rotation_build,
+        plan=plan,
+        plan_concurrency=plan_concurrency,
+        abort_after=abort_after,
+        negative_cache_ttl=negative_cache_ttl,
+        clear_cache=clear_cache,
+        adaptive_recording=adaptive_recording,
+        background_quit=background_quit,
+        quit_timeout=quit_timeout,
+        auth_state_store=auth_state_store,
+        infra_retries=infra_retries,
+        resume=resume,
+        log_buffer=log_buffer,
+        log_jsonl=log_jsonl,
+        visual_baselines_dir=visual_baselines_dir,
+        visual_update=visual_update,
+        tunnel_name=tunnel_name,
+        tunnel_command=tunnel_command,
+        tunnel_timeout=tunnel_timeout,
+        profile=profile,
     )
 
 
@@ -16,3 +16,7 @@ class WebDriverTestFailed(WebDriverTestMarkerException):
 
 class WebDriverTestInterrupted(WebDriverTestMarkerException):
     pass
+
+
+class SosuInfrastructureWarning(UserWarning):
+    pass
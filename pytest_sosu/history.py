@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Mapping, Optional, Set
+
+import pytest
+from _pytest.config import Config
+
+from pytest_sosu.logging import get_struct_logger
+from pytest_sosu.sharding import write_shard_durations
+from pytest_sosu.workers import is_xdist_worker
+
+logger = get_struct_logger(__name__)
+
+HISTORY_CACHE_KEY = "sosu/history"
+# Weight of the most recent duration in the exponential moving average.
+DURATION_SMOOTHING = 0.5
+# Entries of tests not run for a long time (removed, renamed or deselected
+# ones) are dropped, so the cache does not grow without bound.
+HISTORY_MAX_AGE = 30 * 24 * 60 * 60
+HISTORY_MAX_ENTRIES = 10000
+
+
+class TestHistory:
+    __test__ = False
+
+    def __init__(self, data: Optional[Mapping[str, Dict[str, Any]]] = None) -> None:
+        self._data: Dict[str, Dict[str, Any]] = dict(data or {})
+
+    def __contains__(self, nodeid: str) -> bool:
+        return nodeid in self._data
+
+    def get_entry(self, nodeid: str) -> Dict[str, Any]:
+        return self._data.get(nodeid, {})
+
+    def get_duration(self, nodeid: str) -> Optional[float]:
+        return self.get_entry(nodeid).get("duration")
+
+    def get_durations(self) -> Dict[str, float]:
+        return {
+            nodeid: entry["duration"]
+            for nodeid, entry in self._data.items()
+            if entry.get("duration") is not None
+        }
+
+    def record_duration(self, nodeid: str, duration: float) -> None:
+        entry = self._data.setdefault(nodeid, {})
+        previous_duration = entry.get("duration")
+        if previous_duration is not None:
+            duration = (
+                DURATION_SMOOTHING * duration
+                + (1 - DURATION_SMOOTHING) * previous_duration
+            )
+        entry["duration"] = duration
+
+    def get_pass_streak(self, nodeid: str, code_hash: Optional[str] = None) -> int:
+        entry = self.get_entry(nodeid)
+        if code_hash is not None and entry.get("code_hash") != code_hash:
+            return 0
+        return entry.get("pass_streak", 0)
+
+    def get_failed_nodeids(self) -> Set[str]:
+        return {
+            nodeid
+            for nodeid, entry in self._data.items()
+            if entry.get("pass_streak") == 0
+        }
+
+    def record_outcome(
+        self, nodeid: str, passed: bool, code_hash: Optional[str] = None
+    ) -> None:
+        entry = self._data.setdefault(nodeid, {})
+        if not passed:
+            entry["pass_streak"] = 0
+        else:
+            entry["pass_streak"] = self.get_pass_streak(nodeid, code_hash) + 1
+        if code_hash is not None:
+            entry["code_hash"] = code_hash
+
+    def touch(self, nodeid: str, now: Optional[float] = None) -> None:
+        entry = self._data.setdefault(nodeid, {})
+        entry["seen_at"] = time.time() if now is None else now
+
+    def prune(
+        self,
+        max_age: float = HISTORY_MAX_AGE,
+        max_entries: int = HISTORY_MAX_ENTRIES,
+        now: Optional[float] = None,
+    ) -> None:
+        if now is None:
+            now = time.time()
+        # Entries without the timestamp come from older versions.
+        recent = sorted(
+            (
+                (entry.get("seen_at", 0), nodeid)
+                for nodeid, entry in self._data.items()
+                if entry.get("seen_at", 0) >= now - max_age
+            ),
+            reverse=True,
+        )[:max_entries]
+        self._data = {nodeid: self._data[nodeid] for _, nodeid in recent}
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return self._data
+
+
+class TestHistoryRecorder:
+    __test__ = False
+
+    def __init__(self, config: Config, durations_path: Optional[str] = None) -> None:
+        self._config = config
+        self._cache = getattr(config, "cache", None)
+        # Durations of the history are exported for `--sosu-shard-durations`.
+        self._durations_path = durations_path
+        self._durations: Dict[str, float] = {}
+        self._outcomes: Dict[str, bool] = {}
+        self._code_hashes: Dict[str, str] = {}
+        self.history = TestHistory(self._load())
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        nodeid = report.nodeid
+        self._durations[nodeid] = self._durations.get(nodeid, 0.0) + report.duration
+        if report.failed:
+            self._outcomes[nodeid] = False
+        elif report.when == "call" and report.passed:
+            self._outcomes.setdefault(nodeid, True)
+        # Set in `pytest_runtest_makereport`, preserved by xdist serialization.
+        code_hash = getattr(report, "sosu_code_hash", None)
+        if code_hash is not None:
+            self._code_hashes[nodeid] = code_hash
+
+    def pytest_sessionfinish(self) -> None:
+        if is_xdist_worker(self._config):
+            return
+        for nodeid, duration in self._durations.items():
+            self.history.touch(nodeid)
+            self.history.record_duration(nodeid, duration)
+        for nodeid, passed in self._outcomes.items():
+            self.history.record_outcome(
+                nodeid, passed, code_hash=self._code_hashes.get(nodeid)
+            )
+        self.history.prune()
+        if self._cache is not None:
+            self._cache.set(HISTORY_CACHE_KEY, self.history.to_dict())
+        if self._durations_path:
+            logger.debug("Exporting durations", path=self._durations_path)
+            write_shard_durations(self._durations_path, self.history.get_durations())
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._cache is None:
+            return {}
+        data = self._cache.get(HISTORY_CACHE_KEY, {})
+        if not isinstance(data, dict):
+            logger.warning("Ignoring invalid test history", data=data)
+            return {}
+        return data
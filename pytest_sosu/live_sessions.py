@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import atexit
+import base64
+import contextlib
+import json
+import os
+import signal
+import socket
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from pytest_sosu.logging import get_struct_logger
+from pytest_sosu.utils import is_process_alive, to_safe_filename
+from pytest_sosu.webdriver import WebDriverUrlData
+
+logger = get_struct_logger(__name__)
+
+DEFAULT_QUIT_TIMEOUT = 10.0
+# Sessions which are older are terminated by Sauce Labs anyway.
+SESSION_STORE_ENTRY_MAX_AGE = 24 * 60 * 60
+
+
+def delete_remote_session(
+    url_data: WebDriverUrlData, session_id: str, timeout: float
+) -> None:
+    # Plain HTTP request, usable from any thread regardless of the driver
+    # (selenium or asyncio) which created the session.
+    url = f"{url_data.scheme}://{url_data.address}{url_data.path}/session/{session_id}"
+    request = urllib.request.Request(url, method="DELETE")
+    if url_data.has_credentials:
+        token = f"{url_data.username}:{url_data.access_key}".encode("utf-8")
+        request.add_header(
+            "Authorization", "Basic " + base64.b64encode(token).decode("ascii")
+        )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        response.read()
+
+
+class SessionStore:
+    # Sessions are kept on disk, so the ones of runs killed without any
+    # cleanup can be found and terminated by the next run.
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def add(self, session_id: str, url_data: WebDriverUrlData) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._get_path(session_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "session_id": session_id,
+                    "pid": os.getpid(),
+                    "hostname": socket.gethostname(),
+                    "created_at": time.time(),
+                    # Credentials are not stored on disk.
+                    "url": url_data.with_credentials(None, None).to_url(),
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+
+    def remove(self, session_id: str) -> None:
+        with contextlib.suppress(OSError):
+            os.remove(self._get_path(session_id))
+
+    def get_entries(self) -> List[Dict[str, Any]]:
+        entries = []
+        try:
+            dir_entries = list(os.scandir(self.directory))
+        except OSError:
+            return []
+        for dir_entry in dir_entries:
+            if not dir_entry.name.endswith(".json"):
+                continue
+            try:
+                with open(dir_entry.path, encoding="utf-8") as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def get_orphaned_entries(self) -> List[Dict[str, Any]]:
+        hostname = socket.gethostname()
+        oldest_created_at = time.time() - SESSION_STORE_ENTRY_MAX_AGE
+        orphaned_entries = []
+        for entry in self.get_entries():
+            if entry.get("created_at", 0) < oldest_created_at:
+                logger.debug("Removing old session entry", entry=entry)
+                self.remove(entry["session_id"])
+            # Processes of other hosts cannot be checked.
+            elif entry.get("hostname") == hostname and not is_process_alive(
+                entry.get("pid", 0)
+            ):
+                orphaned_entries.append(entry)
+        return orphaned_entries
+
+    def _get_path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{to_safe_filename(session_id)}.json")
+
+
+def reap_orphaned_sessions(
+    store: SessionStore,
+    username: str,
+    access_key: str,
+    timeout: float = DEFAULT_QUIT_TIMEOUT,
+) -> List[str]:
+    orphaned_entries = store.get_orphaned_entries()
+    if not orphaned_entries:
+        return []
+    logger.info("Reaping orphaned sessions", count=len(orphaned_entries))
+    registry = LiveSessionRegistry()
+    for entry in orphaned_entries:
+        url_data = WebDriverUrlData.from_url(entry["url"])
+        registry.add(
+            entry["session_id"], url_data.with_credentials(username, access_key)
+        )
+    reaped = registry.quit_all(timeout)
+    # Sessions which could not be deleted are left to Sauce Labs timeouts,
+    # there is no point in retrying them in every run.
+    for entry in orphaned_entries:
+        store.remove(entry["session_id"])
+    return reaped
+
+
+class LiveSessionRegistry:
+    def __init__(self, store: Optional[SessionStore] = None) -> None:
+        self._sessions: Dict[str, WebDriverUrlData] = {}
+        self._lock = threading.Lock()
+        self.store = store
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def add(self, session_id: str, url_data: WebDriverUrlData) -> None:
+        with self._lock:
+            self._sessions[session_id] = url_data
+        if self.store is not None:
+            self.store.add(session_id, url_data)
+
+    def claim(self, session_id: str) -> bool:
+        # Whoever claims the session is responsible for quitting it.
+        with self._lock:
+            claimed = self._sessions.pop(session_id, None) is not None
+        if claimed and self.store is not None:
+            self.store.remove(session_id)
+        return claimed
+
+    def quit_all(self, timeout: float = DEFAULT_QUIT_TIMEOUT) -> List[str]:
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        if not sessions:
+            return []
+        logger.info("Quitting live sessions", count=len(sessions), timeout=timeout)
+        quitted: List[str] = []
+        # Daemon threads, so sessions not quit before the deadline
+        # do not block the interpreter exit.
+        threads = [
+            threading.Thread(
+                target=self._quit_session,
+                args=(session_id, url_data, timeout, quitted),
+                name=f"sosu-quit-{session_id}",
+                daemon=True,
+            )
+            for session_id, url_data in sessions.items()
+        ]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+        pending = len(sessions) - len(quitted)
+        if pending:
+            logger.warning("Live sessions not quit before deadline", count=pending)
+        if self.store is not None:
+            for session_id in list(quitted):
+                self.store.remove(session_id)
+        return quitted
+
+    @staticmethod
+    def _quit_session(
+        session_id: str,
+        url_data: WebDriverUrlData,
+        timeout: float,
+        quitted: List[str],
+    ) -> None:
+        try:
+            delete_remote_session(url_data, session_id, timeout)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Live session quit failed", session_id=session_id, exc=exc)
+            return
+        logger.debug("Live session quitted", session_id=session_id)
+        quitted.append(session_id)
+
+
+live_session_registry = LiveSessionRegistry()
+
+
+class LiveSessionTerminator:
+    def __init__(
+        self,
+        registry: LiveSessionRegistry = live_session_registry,
+        timeout: float = DEFAULT_QUIT_TIMEOUT,
+    ) -> None:
+        self._registry = registry
+        self._timeout = timeout
+        self._previous_sigterm_handler: Any = None
+        self._installed = False
+
+    def install(self) -> None:
+        atexit.register(self.quit_all)
+        # Signal handlers can be set only in the main thread.
+        if threading.current_thread() is threading.main_thread():
+            self._previous_sigterm_handler = signal.signal(
+                signal.SIGTERM, self._handle_sigterm
+            )
+            self._installed = True
+
+    def uninstall(self) -> None:
+        self.quit_all()
+        atexit.unregister(self.quit_all)
+        if self._installed:
+            signal.signal(signal.SIGTERM, self._previous_sigterm_handler)
+            self._installed = False
+
+    def quit_all(self) -> None:
+        self._registry.quit_all(self._timeout)
+
+    def _handle_sigterm(self, signum: int, frame: Optional[Any]) -> None:
+        logger.info("Terminated, quitting live sessions", signum=signum)
+        self.quit_all()
+        previous_handler = self._previous_sigterm_handler
+        signal.signal(signum, previous_handler or signal.SIG_DFL)
+        self._installed = False
+        if callable(previous_handler):
+            previous_handler(signum, frame)
+        elif previous_handler in (signal.SIG_DFL, None):
+            os.kill(os.getpid(), signum)
+
+    # Ctrl-C is handled by pytest as KeyboardInterrupt. Quit the sessions
+    # concurrently before the fixtures are torn down one by one.
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionfinish(self, exitstatus: int) -> None:
+        if exitstatus == pytest.ExitCode.INTERRUPTED:
+            self.quit_all()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pytest
+
+from pytest_sosu.logging import (
+    JsonLinesStructLogger,
+    JsonLinesWriter,
+    LogRingBuffer,
+    RingBufferStructLogger,
+    StdlibStructLogger,
+    json_lines_writer,
+    log_ring_buffer,
+    set_struct_logger_class,
+)
+
+
+class FailureLogCapture:
+    def __init__(self, buffer: LogRingBuffer = log_ring_buffer) -> None:
+        self._buffer = buffer
+
+    def install(self, maxlen: int) -> None:
+        self._buffer.resize(maxlen)
+        set_struct_logger_class(RingBufferStructLogger)
+
+    def uninstall(self) -> None:
+        set_struct_logger_class(StdlibStructLogger)
+        self._buffer.resize(0)
+
+    def pytest_runtest_logstart(self) -> None:
+        self._buffer.clear()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item: pytest.Item, call: pytest.CallInfo):
+        outcome = yield
+        report = outcome.get_result()
+        # Events are rendered only for failed tests.
+        if report.failed and len(self._buffer):
+            report.sections.append(
+                (f"Captured sosu log {report.when}", self._buffer.render())
+            )
+
+
+class JsonLinesLogSink:
+    def __init__(self, writer: JsonLinesWriter = json_lines_writer) -> None:
+        self._writer = writer
+
+    def install(self, path: str) -> None:
+        try:
+            self._writer.open(path)
+        except OSError as exc:
+            raise pytest.UsageError(
+                f"Cannot open sosu JSON lines log {path!r}: {exc}"
+            ) from None
+        set_struct_logger_class(JsonLinesStructLogger)
+
+    def uninstall(self) -> None:
+        set_struct_logger_class(StdlibStructLogger)
+        self._writer.close()
@@ -1,5 +1,15 @@
+import collections
+import json
 import logging
-from typing import Callable, Mapping, Optional, Type
+import os
+import threading
+import time
+import traceback
+from typing import Any, Callable, Deque, List, Mapping, Optional, Tuple, Type
+
+DEFAULT_JSON_LINES_BATCH_SIZE = 100
+DEFAULT_JSON_LINES_FLUSH_INTERVAL = 1.0
+DEFAULT_JSON_LINES_MAX_QUEUE_SIZE = 100000
 
 
 def get_struct_logger(name):
@@ -46,22 +56,203 @@ class StdlibStructLogger(StructLogger):
         self._logger = logging.getLogger(name)
 
     def debug(self, msg, **kwargs):
-        return self._logger.debug(render_full_message(msg, kwargs))
+        return self._log(logging.DEBUG, msg, kwargs)
+
+    def info(self, msg, **kwargs):
+        return self._log(logging.INFO, msg, kwargs)
+
+    def warning(self, msg, **kwargs):
+        return self._log(logging.WARNING, msg, kwargs)
+
+    def error(self, msg, **kwargs):
+        return self._log(logging.ERROR, msg, kwargs)
+
+    def critical(self, msg, **kwargs):
+        return self._log(logging.CRITICAL, msg, kwargs)
+
+    def exception(self, msg, **kwargs):
+        return self._log(logging.ERROR, msg, kwargs, exc_info=True)
+
+    def _log(self, level: int, msg: str, kwargs: Mapping, exc_info: bool = False):
+        # Do not render messages which would be dropped anyway.
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, render_full_message(msg, kwargs), exc_info=exc_info)
+
+
+LogEvent = Tuple[float, int, str, str, Mapping]
+
+
+class LogRingBuffer:
+    def __init__(self, maxlen: int = 0) -> None:
+        self._events: Deque[LogEvent] = collections.deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def resize(self, maxlen: int) -> None:
+        with self._lock:
+            self._events = collections.deque(self._events, maxlen=maxlen)
+
+    def append(self, event: LogEvent) -> None:
+        self._events.append(event)
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            events: List[LogEvent] = list(self._events)
+        return "\n".join(_render_event(event) for event in events)
+
+
+log_ring_buffer = LogRingBuffer()
+
+
+class BufferingStructLogger(StructLogger):
+    # Events are appended unrendered by `_append`; only warnings and more
+    # severe events are also passed to the standard logger.
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self._stdlib_logger = StdlibStructLogger(name)
+
+    def debug(self, msg, **kwargs):
+        self._append(logging.DEBUG, msg, kwargs)
 
     def info(self, msg, **kwargs):
-        return self._logger.info(render_full_message(msg, kwargs))
+        self._append(logging.INFO, msg, kwargs)
 
     def warning(self, msg, **kwargs):
-        return self._logger.warning(render_full_message(msg, kwargs))
+        self._append(logging.WARNING, msg, kwargs)
+        return self._stdlib_logger.warning(msg, **kwargs)
 
     def error(self, msg, **kwargs):
-        return self._logger.error(render_full_message(msg, kwargs))
+        self._append(logging.ERROR, msg, kwargs)
+        return self._stdlib_logger.error(msg, **kwargs)
 
     def critical(self, msg, **kwargs):
-        return self._logger.critical(render_full_message(msg, kwargs))
+        self._append(logging.CRITICAL, msg, kwargs)
+        return self._stdlib_logger.critical(msg, **kwargs)
 
     def exception(self, msg, **kwargs):
-        return self._logger.exception(render_full_message(msg, kwargs))
+        self._append(logging.ERROR, msg, dict(kwargs, exc_info=traceback.format_exc()))
+        return self._stdlib_logger.exception(msg, **kwargs)
+
+    def _append(self, level: int, msg: str, kwargs: Mapping) -> None:
+        raise NotImplementedError()
+
+
+class RingBufferStructLogger(BufferingStructLogger):
+    def _append(self, level: int, msg: str, kwargs: Mapping) -> None:
+        log_ring_buffer.append((time.time(), level, self._name, msg, kwargs))
+
+
+class JsonLinesWriter:
+    # Events are serialized and written in batches by a background thread,
+    # so logging does not wait for the disk.
+
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_JSON_LINES_BATCH_SIZE,
+        flush_interval: float = DEFAULT_JSON_LINES_FLUSH_INTERVAL,
+        max_queue_size: int = DEFAULT_JSON_LINES_MAX_QUEUE_SIZE,
+    ) -> None:
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_queue_size = max_queue_size
+        self._events: List[LogEvent] = []
+        self._cond = threading.Condition()
+        self._fd: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._error_logged = False
+        self.dropped = 0
+
+    def open(self, path: str) -> None:
+        # Opened upfront, so an unwritable path is reported immediately.
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._closed = False
+        self._error_logged = False
+        self.dropped = 0
+        self._thread = threading.Thread(
+            target=self._run, name="sosu-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            os.close(fd)
+        if self.dropped:
+            logging.getLogger(__name__).warning(
+                "Dropped %d sosu log events, the writer could not keep up",
+                self.dropped,
+            )
+
+    def append(self, event: LogEvent) -> None:
+        with self._cond:
+            # Events are dropped rather than kept in memory without bound
+            # when the writer cannot keep up.
+            if len(self._events) >= self._max_queue_size:
+                self.dropped += 1
+                return
+            self._events.append(event)
+            if len(self._events) >= self._batch_size:
+                self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._events) < self._batch_size:
+                    self._cond.wait(self._flush_interval)
+                events, self._events = self._events, []
+                closed = self._closed
+            if events:
+                try:
+                    self._write(events)
+                except Exception as exc:  # pylint: disable=broad-except
+                    self._log_error("Writing sosu log events failed", exc)
+            if closed:
+                return
+
+    def _write(self, events: List[LogEvent]) -> None:
+        assert self._fd is not None
+        data = "".join(self._render(event) + "\n" for event in events)
+        # A single O_APPEND write per batch keeps lines of other processes
+        # (xdist workers) from being interleaved with ours.
+        os.write(self._fd, data.encode("utf-8"))
+
+    def _render(self, event: LogEvent) -> str:
+        try:
+            return render_json_line(event)
+        except Exception as exc:  # pylint: disable=broad-except
+            # E.g. data changed by another thread while being serialized.
+            self._log_error("Rendering sosu log event failed", exc)
+            timestamp, level, name, msg, _ = event
+            return render_json_line(
+                (timestamp, level, name, msg, {"render_error": repr(exc)})
+            )
+
+    def _log_error(self, msg: str, exc: Exception) -> None:
+        # Standard logger, logging to ourselves could fail the same way.
+        if not self._error_logged:
+            self._error_logged = True
+            logging.getLogger(__name__).warning("%s: %r", msg, exc)
+
+
+json_lines_writer = JsonLinesWriter()
+
+
+class JsonLinesStructLogger(BufferingStructLogger):
+    def _append(self, level: int, msg: str, kwargs: Mapping) -> None:
+        json_lines_writer.append((time.time(), level, self._name, msg, kwargs))
 
 
 class LazyStructLogger(StructLogger):
@@ -73,12 +264,16 @@ class LazyStructLogger(StructLogger):
         super().__init__(name)
         self._factory = factory
         self._logger: Optional[StructLogger] = None
+        self._factory_version = -1
 
     @property
     def logger(self) -> StructLogger:
-        if self._logger is not None:
+        # Recreate the logger when the factory changed its logger class.
+        factory_version = getattr(self._factory, "version", 0)
+        if self._logger is not None and self._factory_version == factory_version:
             return self._logger
         self._logger = self._factory(self._name)
+        self._factory_version = factory_version
         return self._logger
 
     def debug(self, msg, **kwargs):
@@ -103,12 +298,14 @@ class LazyStructLogger(StructLogger):
 class StructLoggerFactory:
     def __init__(self, struct_logger_cls: Type[StructLogger]) -> None:
         self._struct_logger_cls = struct_logger_cls
+        self.version = 0
 
     def __call__(self, name: str) -> StructLogger:
         return self._struct_logger_cls(name)
 
     def set_struct_logger_class(self, struct_logger_cls: Type[StructLogger]) -> None:
         self._struct_logger_cls = struct_logger_cls
+        self.version += 1
 
 
 struct_logger_factory = StructLoggerFactory(StdlibStructLogger)
@@ -123,3 +320,32 @@ def render_full_message(msg: str, data: Mapping) -> str:
 def _iter_kv_strings(data: Mapping):
     for name, value in data.items():
         yield f"{name}={value!r}"
+
+
+def _render_event(event: LogEvent) -> str:
+    timestamp, level, name, msg, data = event
+    time_str = time.strftime("%H:%M:%S", time.localtime(timestamp))
+    level_name = logging.getLevelName(level)
+    prefix = f"{time_str}.{int(timestamp % 1 * 1000):03d} {level_name:<8} {name}"
+    return f"{prefix}: {render_full_message(msg, data)}"
+
+
+def render_json_line(event: LogEvent) -> str:
+    timestamp, level, name, msg, data = event
+    return json.dumps(
+        {
+            "time": timestamp,
+            "level": logging.getLevelName(level),
+            "logger": name,
+            "msg": msg,
+            "data": data,
+        },
+        default=_to_json,
+    )
+
+
+def _to_json(value: Any) -> Any:
+    structlog = getattr(value, "__structlog__", None)
+    if structlog is not None:
+        return structlog()
+    return repr(value)
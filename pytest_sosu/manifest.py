@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import time
+from typing import Dict, Optional, Set
+
+import pytest
+
+from pytest_sosu.logging import get_struct_logger
+from pytest_sosu.retries import INFRA_RETRY_OUTCOME
+from pytest_sosu.utils import to_safe_filename
+
+logger = get_struct_logger(__name__)
+
+MANIFEST_MAX_AGE = 7 * 24 * 60 * 60
+# Failed tests and tests skipped by an aborted capabilities slug are not
+# considered finished, so resumed runs retry them.
+FINISHED_OUTCOMES = ("passed", "skipped")
+ABORTED_OUTCOME = "aborted"
+
+
+class ProgressManifest:
+    def __init__(self, directory: str, build_name: str) -> None:
+        self.directory = directory
+        self.path = os.path.join(directory, f"{to_safe_filename(build_name)}.jsonl")
+
+    def append(self, nodeid: str, slug: Optional[str], outcome: str) -> None:
+        line = json.dumps({"nodeid": nodeid, "slug": slug, "outcome": outcome})
+        # A single O_APPEND write per record keeps concurrent writers
+        # from interleaving their lines.
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (line + "\n").encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def read(self) -> Dict[str, str]:
+        outcomes: Dict[str, str] = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Last line may be cut off by a killed run.
+                        continue
+                    outcomes[record["nodeid"]] = record["outcome"]
+        except OSError:
+            pass
+        return outcomes
+
+    def get_finished_nodeids(self) -> Set[str]:
+        return {
+            nodeid
+            for nodeid, outcome in self.read().items()
+            if outcome in FINISHED_OUTCOMES
+        }
+
+
+def prune_manifests(directory: str, max_age: float = MANIFEST_MAX_AGE) -> None:
+    oldest_mtime = time.time() - max_age
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".jsonl") and entry.stat().st_mtime < oldest_mtime:
+            logger.debug("Removing old progress manifest", path=entry.path)
+            with contextlib.suppress(OSError):
+                os.remove(entry.path)
+
+
+class ProgressRecorder:
+    def __init__(self, manifest: ProgressManifest) -> None:
+        self._manifest = manifest
+        self._outcomes: Dict[str, str] = {}
+        self._retried: Set[str] = set()
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        nodeid = report.nodeid
+        if report.when == "setup":
+            self._outcomes.pop(nodeid, None)
+            self._retried.discard(nodeid)
+        if report.outcome == INFRA_RETRY_OUTCOME:
+            self._retried.add(nodeid)
+        elif report.failed:
+            self._outcomes[nodeid] = "failed"
+        elif getattr(report, "sosu_slug_aborted", False):
+            self._outcomes[nodeid] = ABORTED_OUTCOME
+        elif report.skipped:
+            self._outcomes.setdefault(nodeid, "skipped")
+        elif report.when == "call":
+            self._outcomes.setdefault(nodeid, "passed")
+        if report.when == "teardown" and nodeid not in self._retried:
+            self._manifest.append(
+                nodeid,
+                # Set in `pytest_runtest_makereport`.
+                getattr(report, "sosu_slug", None),
+                self._outcomes.pop(nodeid, "passed"),
+            )
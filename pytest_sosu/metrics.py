@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import bisect
+import contextlib
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Mapping, Tuple
+
+from pytest_sosu.typing import Literal
+
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    20.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+@dataclass(frozen=True)
+class MetricDefinition:
+    name: str
+    type: Literal["counter", "histogram"]
+    help: str
+    buckets: Tuple[float, ...] = ()
+
+
+SESSION_CREATE_SECONDS = MetricDefinition(
+    name="sosu_session_create_seconds",
+    type="histogram",
+    help="Time spent creating remote WebDriver sessions",
+    buckets=DEFAULT_LATENCY_BUCKETS,
+)
+SESSION_QUIT_SECONDS = MetricDefinition(
+    name="sosu_session_quit_seconds",
+    type="histogram",
+    help="Time spent quitting remote WebDriver sessions",
+    buckets=DEFAULT_LATENCY_BUCKETS,
+)
+SESSIONS_OPENED_TOTAL = MetricDefinition(
+    name="sosu_sessions_opened_total",
+    type="counter",
+    help="Remote WebDriver sessions opened",
+)
+SESSION_FAILURES_TOTAL = MetricDefinition(
+    name="sosu_session_failures_total",
+    type="counter",
+    help="Remote WebDriver session errors by stage and error class",
+)
+JOB_RESULTS_TOTAL = MetricDefinition(
+    name="sosu_job_results_total",
+    type="counter",
+    help="Sauce Labs job results",
+)
+
+METRIC_DEFINITIONS: Dict[str, MetricDefinition] = {
+    d.name: d
+    for d in [
+        SESSION_CREATE_SECONDS,
+        SESSION_QUIT_SECONDS,
+        SESSIONS_OPENED_TOTAL,
+        SESSION_FAILURES_TOTAL,
+        JOB_RESULTS_TOTAL,
+    ]
+}
+
+
+class HistogramData:
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        if idx < len(self.bucket_counts):
+            self.bucket_counts[idx] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge_dict(self, data: Mapping[str, Any]) -> None:
+        for idx, bucket_count in enumerate(data["bucket_counts"]):
+            self.bucket_counts[idx] += bucket_count
+        self.sum += data["sum"]
+        self.count += data["count"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bucket_counts": list(self.bucket_counts),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+    def iter_cumulative_buckets(self) -> Iterator[Tuple[str, int]]:
+        cumulative = 0
+        for bucket, bucket_count in zip(self.buckets, self.bucket_counts):
+            cumulative += bucket_count
+            yield _format_value(bucket), cumulative
+        yield "+Inf", self.count
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], HistogramData] = {}
+
+    def inc(self, metric: MetricDefinition, value: float = 1, **labels: str) -> None:
+        key = (metric.name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, metric: MetricDefinition, value: float, **labels: str) -> None:
+        key = (metric.name, _labels_key(labels))
+        with self._lock:
+            self._get_histogram(key).observe(value)
+
+    def get_counter_value(self, metric: MetricDefinition, **labels: str) -> float:
+        return self._counters.get((metric.name, _labels_key(labels)), 0)
+
+    def get_histogram_count(self, metric: MetricDefinition, **labels: str) -> int:
+        histogram = self._histograms.get((metric.name, _labels_key(labels)))
+        if histogram is None:
+            return 0
+        return histogram.count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": [
+                    [name, [list(kv) for kv in labels], value]
+                    for (name, labels), value in self._counters.items()
+                ],
+                "histograms": [
+                    [name, [list(kv) for kv in labels], histogram.to_dict()]
+                    for (name, labels), histogram in self._histograms.items()
+                ],
+            }
+
+    def merge_dict(self, data: Mapping[str, Any]) -> None:
+        with self._lock:
+            for name, labels, value in data.get("counters", []):
+                key = (name, _labels_key(dict(labels)))
+                self._counters[key] = self._counters.get(key, 0) + value
+            for name, labels, histogram_data in data.get("histograms", []):
+                key = (name, _labels_key(dict(labels)))
+                self._get_histogram(key).merge_dict(histogram_data)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for definition in METRIC_DEFINITIONS.values():
+                lines.extend(self._iter_metric_lines(definition))
+        return "".join(f"{line}\n" for line in lines)
+
+    def write_textfile(self, path: str) -> None:
+        # node_exporter textfile collector may read the file at any time,
+        # write it atomically.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def _get_histogram(self, key: Tuple[str, Labels]) -> HistogramData:
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            definition = METRIC_DEFINITIONS[key[0]]
+            histogram = HistogramData(definition.buckets)
+            self._histograms[key] = histogram
+        return histogram
+
+    def _iter_metric_lines(self, definition: MetricDefinition) -> Iterator[str]:
+        name = definition.name
+        if definition.type == "counter":
+            samples = sorted(
+                (labels, value)
+                for (sample_name, labels), value in self._counters.items()
+                if sample_name == name
+            )
+            if not samples:
+                return
+            yield f"# HELP {name} {definition.help}"
+            yield f"# TYPE {name} counter"
+            for labels, value in samples:
+                yield f"{name}{_render_labels(labels)} {_format_value(value)}"
+        else:
+            histograms = sorted(
+                (labels, histogram)
+                for (sample_name, labels), histogram in self._histograms.items()
+                if sample_name == name
+            )
+            if not histograms:
+                return
+            yield f"# HELP {name} {definition.help}"
+            yield f"# TYPE {name} histogram"
+            for labels, histogram in histograms:
+                for le, count in histogram.iter_cumulative_buckets():
+                    bucket_labels = labels + (("le", le),)
+                    yield f"{name}_bucket{_render_labels(bucket_labels)} {count}"
+                rendered_labels = _render_labels(labels)
+                yield f"{name}_sum{rendered_labels} {_format_value(histogram.sum)}"
+                yield f"{name}_count{rendered_labels} {histogram.count}"
+
+
+def _labels_key(labels: Mapping[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _render_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    rendered = ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in labels)
+    return f"{{{rendered}}}"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+metrics_registry = MetricsRegistry()
+
+
+@contextlib.contextmanager
+def track_session_failures(stage: str, slug: str):
+    try:
+        yield
+    except Exception as exc:
+        metrics_registry.inc(
+            SESSION_FAILURES_TOTAL,
+            slug=slug,
+            stage=stage,
+            error=type(exc).__name__,
+        )
+        raise
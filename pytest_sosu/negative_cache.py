@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from typing import Any, Dict, Optional
+
+from selenium.common.exceptions import (  # type: ignore
+    InvalidArgumentException,
+    SessionNotCreatedException,
+)
+
+from pytest_sosu.logging import get_struct_logger
+from pytest_sosu.webdriver import Capabilities
+
+logger = get_struct_logger(__name__)
+
+DEFAULT_NEGATIVE_CACHE_TTL = 24 * 60 * 60
+PER_TEST_SAUCE_OPTIONS_KEYS = ("name", "build", "tags", "custom-data")
+PERMANENT_REJECTION_MESSAGE_RE = re.compile(
+    r"unsupported|not supported|misconfigured|invalid",
+    re.IGNORECASE,
+)
+
+
+def is_permanent_rejection(exc: BaseException) -> bool:
+    if isinstance(exc, InvalidArgumentException):
+        return True
+    if isinstance(exc, SessionNotCreatedException):
+        return bool(PERMANENT_REJECTION_MESSAGE_RE.search(exc.msg or ""))
+    return False
+
+
+def get_capabilities_payload_hash(capabilities: Capabilities) -> str:
+    data = capabilities.to_dict()
+    sauce_options_data = data.get("sauce:options", data)
+    for key in PER_TEST_SAUCE_OPTIONS_KEYS:
+        sauce_options_data.pop(key, None)
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class NegativeCache:
+    def __init__(self, directory: str, ttl: float = DEFAULT_NEGATIVE_CACHE_TTL) -> None:
+        self.directory = directory
+        self.ttl = ttl
+
+    def get(self, capabilities: Capabilities) -> Optional[str]:
+        path = self._get_path(capabilities)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at", 0) < time.time():
+            logger.debug("Negative cache entry expired", path=path)
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            return None
+        return entry.get("message")
+
+    def add(self, capabilities: Capabilities, message: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._get_path(capabilities)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "message": message,
+                    "slug": capabilities.slug,
+                    "expires_at": time.time() + self.ttl,
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _get_path(self, capabilities: Capabilities) -> str:
+        payload_hash = get_capabilities_payload_hash(capabilities)
+        return os.path.join(self.directory, f"{payload_hash}.json")
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import collections
+import heapq
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import pytest
+
+from pytest_sosu.history import TestHistory
+from pytest_sosu.webdriver import Capabilities
+
+# Used for sessions of tests which were never run before.
+DEFAULT_SESSION_DURATION = 60.0
+SESSION_FIXTURE_NAMES = ("sosu_selenium_webdriver", "sosu_async_webdriver")
+PARAMETER_CAPABILITIES_FIXTURE_NAME = "sosu_webdriver_parameter_capabilities"
+
+
+@dataclass(frozen=True)
+class PlannedSession:
+    nodeid: str
+    capabilities: Capabilities
+    duration: Optional[float] = None
+
+    @property
+    def configuration_key(self) -> str:
+        return json.dumps(self.capabilities.to_dict(), sort_keys=True, default=str)
+
+
+@dataclass
+class SessionPlan:
+    sessions: List[PlannedSession] = field(default_factory=list)
+    concurrency: int = 1
+    default_duration: float = DEFAULT_SESSION_DURATION
+
+    def get_sessions_per_slug(self) -> Dict[str, int]:
+        counter = collections.Counter(s.capabilities.slug for s in self.sessions)
+        return dict(sorted(counter.items()))
+
+    def get_unique_configurations_count(self) -> int:
+        return len({s.configuration_key for s in self.sessions})
+
+    def get_estimated_durations(self) -> List[float]:
+        return [
+            self.default_duration if s.duration is None else s.duration
+            for s in self.sessions
+        ]
+
+    def get_session_minutes(self) -> float:
+        return sum(self.get_estimated_durations()) / 60
+
+    def get_makespan(self) -> float:
+        # Longest-processing-time-first scheduling on `concurrency` slots.
+        slots = [0.0] * max(self.concurrency, 1)
+        for duration in sorted(self.get_estimated_durations(), reverse=True):
+            heapq.heappush(slots, heapq.heappop(slots) + duration)
+        return max(slots)
+
+    def iter_lines(self) -> Iterator[str]:
+        known_count = sum(1 for s in self.sessions if s.duration is not None)
+        yield f"sessions: {len(self.sessions)}"
+        yield f"unique session configurations: {self.get_unique_configurations_count()}"
+        for slug, count in self.get_sessions_per_slug().items():
+            yield f"  {slug}: {count}"
+        yield (
+            f"estimated session-minutes: {self.get_session_minutes():.1f}"
+            f" ({known_count} of {len(self.sessions)} sessions with history,"
+            f" {self.default_duration:.0f}s assumed for others)"
+        )
+        yield (
+            f"estimated wall time: {self.get_makespan() / 60:.1f} min"
+            f" with concurrency {self.concurrency}"
+        )
+
+
+def build_session_plan(
+    items: Sequence[pytest.Item],
+    history: TestHistory,
+    concurrency: int,
+) -> SessionPlan:
+    plan = SessionPlan(concurrency=concurrency)
+    for item in items:
+        fixturenames = getattr(item, "fixturenames", ())
+        if not any(name in fixturenames for name in SESSION_FIXTURE_NAMES):
+            continue
+        capabilities = Capabilities()
+        callspec = getattr(item, "callspec", None)
+        if callspec is not None:
+            parameter_capabilities = callspec.params.get(
+                PARAMETER_CAPABILITIES_FIXTURE_NAME
+            )
+            if parameter_capabilities is not None:
+                capabilities = capabilities.merge(parameter_capabilities)
+        plan.sessions.append(
+            PlannedSession(
+                nodeid=item.nodeid,
+                capabilities=capabilities,
+                duration=history.get_duration(item.nodeid),
+            )
+        )
+    return plan
+
+
+class SessionPlanner:
+    def __init__(self, history: TestHistory, concurrency: int) -> None:
+        self._history = history
+        self._concurrency = concurrency
+        self.plan: Optional[SessionPlan] = None
+
+    def pytest_collection_finish(self, session: pytest.Session) -> None:
+        self.plan = build_session_plan(session.items, self._history, self._concurrency)
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtestloop(self, session: pytest.Session) -> bool:
+        # Do not run any tests, so no sessions are opened.
+        return True
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        if self.plan is None:
+            return
+        terminalreporter.write_sep("=", "sosu session plan")
+        for line in self.plan.iter_lines():
+            terminalreporter.write_line(line)
@@ -1,14 +1,67 @@
 # pylint: disable=redefined-outer-name
 import datetime
+import json
 import os
-from typing import Any, Callable, Optional
+import shutil
+import tempfile
+from typing import Any, Callable, List, Optional, Set
 
 import pytest
 from _pytest.config import Config
 
+from pytest_sosu.artifacts import ArtifactCollector
+from pytest_sosu.auth_state import (
+    AuthStateCache,
+    AuthStateStore,
+    FileAuthStateStore,
+    MemoryAuthStateStore,
+)
+from pytest_sosu.background import BackgroundSessionFinisher
+from pytest_sosu.command_timings import (
+    COMMAND_TIMINGS_PROPERTY_NAME,
+    CommandTimingsReporter,
+)
+from pytest_sosu.compat import async_fixture
 from pytest_sosu.config import SosuConfig, build_sosu_config
+from pytest_sosu.history import TestHistoryRecorder
+from pytest_sosu.live_sessions import (
+    LiveSessionTerminator,
+    SessionStore,
+    live_session_registry,
+    reap_orphaned_sessions,
+)
+from pytest_sosu.log_capture import FailureLogCapture, JsonLinesLogSink
 from pytest_sosu.logging import get_struct_logger
-from pytest_sosu.plugin_helpers import build_sosu_build_name, parametrize_capabilities
+from pytest_sosu.manifest import ProgressManifest, ProgressRecorder, prune_manifests
+from pytest_sosu.metrics import metrics_registry
+from pytest_sosu.negative_cache import NegativeCache, is_permanent_rejection
+from pytest_sosu.plan import SessionPlanner
+from pytest_sosu.plugin_helpers import (
+    build_sosu_build_name,
+    has_rotation_items,
+    parametrize_capabilities,
+    select_rotation_items,
+    select_shard_items,
+)
+from pytest_sosu.profiling import (
+    PluginProfiler,
+    profile_hot_path,
+    profiled_fixture,
+    set_active_profiler,
+)
+from pytest_sosu.recording import AdaptiveRecordingPolicy, get_code_hash
+from pytest_sosu.resolver import CapabilitiesResolver
+from pytest_sosu.retries import InfrastructureRetrier
+from pytest_sosu.rotation import RotationCursor
+from pytest_sosu.slug_failures import SlugFailureTracker
+from pytest_sosu.tunnel import SharedTunnel
+from pytest_sosu.utils import smart_bool
+from pytest_sosu.visual import (
+    DEFAULT_VISUAL_BASELINES_DIR,
+    VisualBaselines,
+    VisualChecker,
+    check_visual_dependencies,
+)
 from pytest_sosu.webdriver import (
     Browser,
     Capabilities,
@@ -18,7 +71,20 @@ from pytest_sosu.webdriver import (
     WebDriverTestInterrupted,
     WebDriverUrlData,
 )
+from pytest_sosu.webdriver.aio import (
+    async_remote_webdriver_ctx,
+    check_async_dependencies,
+)
+from pytest_sosu.webdriver.commands import CommandStats
+from pytest_sosu.webdriver.errors import is_infrastructure_error
 from pytest_sosu.webdriver.selenium import remote_webdriver_ctx
+from pytest_sosu.workers import (
+    get_worker_input,
+    get_worker_output,
+    is_xdist_worker,
+    set_worker_input,
+    set_worker_output,
+)
 
 logger = get_struct_logger(__name__)
 
@@ -75,6 +141,248 @@ def pytest_addoption(parser):
         help="Sauce Labs build name",
     )
 
+    group = parser.getgroup("sosu plugin instrumentation")
+
+    group.addoption(
+        "--sosu-metrics-file",
+        action="store",
+        metavar="SOSU_METRICS_FILE",
+        help="write session metrics in Prometheus text format to given file",
+    )
+
+    group.addoption(
+        "--sosu-profile",
+        action="store",
+        metavar="SOSU_PROFILE",
+        help=(
+            "profile plugin hooks and fixtures, writing pstats to given file"
+            " and collapsed stacks next to it"
+        ),
+    )
+    group.addoption(
+        "--sosu-command-timings",
+        action="store_true",
+        help="record count and latency of WebDriver commands per test",
+    )
+    group.addoption(
+        "--sosu-artifacts-dir",
+        action="store",
+        metavar="SOSU_ARTIFACTS_DIR",
+        help="save screenshot, page source and browser log of failed tests",
+    )
+    group.addoption(
+        "--sosu-artifacts-workers",
+        action="store",
+        metavar="SOSU_ARTIFACTS_WORKERS",
+        help="number of threads writing failure artifacts",
+    )
+
+    group.addoption(
+        "--sosu-log-buffer",
+        action="store",
+        metavar="SOSU_LOG_BUFFER",
+        help=(
+            "keep up to given number of sosu log events per test in memory"
+            " and show them only for failed tests"
+        ),
+    )
+    group.addoption(
+        "--sosu-log-jsonl",
+        action="store",
+        metavar="SOSU_LOG_JSONL",
+        help="append sosu log events as JSON lines to given file",
+    )
+
+    group = parser.getgroup("sosu plugin session teardown")
+
+    group.addoption(
+        "--sosu-background-quit",
+        action="store",
+        metavar="SOSU_BACKGROUND_QUIT",
+        help=(
+            "number of background threads marking and quitting sessions while"
+            " the next tests run, also the limit of sessions waiting to be quit"
+            " (default: 0, quit in test teardown)"
+        ),
+    )
+    group.addoption(
+        "--sosu-quit-timeout",
+        action="store",
+        metavar="SOSU_QUIT_TIMEOUT",
+        help=(
+            "seconds to wait for all live sessions being quit concurrently"
+            " on interrupt or termination"
+        ),
+    )
+
+    group = parser.getgroup("sosu plugin test selection")
+
+    group.addoption(
+        "--sosu-shard",
+        action="store",
+        metavar="SOSU_SHARD",
+        help="run only i-th of n balanced shards of the tests (i/n)",
+    )
+    group.addoption(
+        "--sosu-shard-durations",
+        action="store",
+        metavar="SOSU_SHARD_DURATIONS",
+        help=(
+            "JSON file mapping test node ids to durations in seconds, shared"
+            " by all shards, used to balance them (default: test counts)"
+        ),
+    )
+    group.addoption(
+        "--sosu-export-durations",
+        action="store",
+        metavar="SOSU_EXPORT_DURATIONS",
+        help=(
+            "write durations of the test history to given JSON file after"
+            " the run, for use with --sosu-shard-durations"
+        ),
+    )
+    group.addoption(
+        "--sosu-rotation-build",
+        action="store",
+        metavar="SOSU_ROTATION_BUILD",
+        help=(
+            "build number selecting cells of capabilities matrices with rotation"
+            " (defaults to a cursor advanced by every run)"
+        ),
+    )
+    group.addoption(
+        "--sosu-plan",
+        action="store_true",
+        help="only report planned Sauce Labs sessions and their estimated cost",
+    )
+    group.addoption(
+        "--sosu-plan-concurrency",
+        action="store",
+        metavar="SOSU_PLAN_CONCURRENCY",
+        help="concurrent sessions assumed by --sosu-plan (defaults to xdist -n)",
+    )
+    group.addoption(
+        "--sosu-abort-after",
+        action="store",
+        metavar="SOSU_ABORT_AFTER",
+        help=(
+            "skip remaining tests of a capabilities slug after given number"
+            " of consecutive infrastructure failures"
+        ),
+    )
+    group.addoption(
+        "--sosu-resume",
+        action="store_true",
+        help=(
+            "deselect tests which already passed or were skipped in the same build"
+            " (requires SAUCE_BUILD_NAME or SAUCE_BUILD_VERSION)"
+        ),
+    )
+    group.addoption(
+        "--sosu-infra-retries",
+        action="store",
+        metavar="SOSU_INFRA_RETRIES",
+        help=(
+            "retry tests using a sosu webdriver fixture which failed only due to"
+            " errors of the remote session (lost sessions, connection problems)"
+            " up to given number of times on fresh sessions"
+        ),
+    )
+
+    group.addoption(
+        "--sosu-adaptive-recording",
+        action="store",
+        metavar="SOSU_ADAPTIVE_RECORDING",
+        help=(
+            "disable video and screenshot recording of tests which passed"
+            " given number of times in a row without code changes"
+        ),
+    )
+
+    group = parser.getgroup("sosu plugin visual comparison")
+
+    group.addoption(
+        "--sosu-visual-baselines-dir",
+        action="store",
+        metavar="SOSU_VISUAL_BASELINES_DIR",
+        help=(
+            "directory with screenshot baselines of sosu_visual"
+            f" (default: {DEFAULT_VISUAL_BASELINES_DIR} in rootdir)"
+        ),
+    )
+    group.addoption(
+        "--sosu-visual-update",
+        action="store_true",
+        help=(
+            "create missing and replace differing screenshot baselines"
+            " instead of failing"
+        ),
+    )
+
+    group = parser.getgroup("sosu plugin tunnel")
+
+    group.addoption(
+        "--sosu-tunnel-name",
+        action="store",
+        metavar="SOSU_TUNNEL_NAME",
+        help="name of the Sauce Connect tunnel used by the sessions",
+    )
+    group.addoption(
+        "--sosu-tunnel-command",
+        action="store",
+        metavar="SOSU_TUNNEL_COMMAND",
+        help=(
+            "command starting the tunnel, shared by all workers and runs on the host"
+            " (supports ${tunnel_name}, ${readyfile}, ${username}, ${access_key}"
+            " and ${region})"
+        ),
+    )
+    group.addoption(
+        "--sosu-tunnel-timeout",
+        action="store",
+        metavar="SOSU_TUNNEL_TIMEOUT",
+        help="seconds to wait for the tunnel to be ready",
+    )
+
+    group = parser.getgroup("sosu plugin cache")
+
+    group.addoption(
+        "--sosu-negative-cache-ttl",
+        action="store",
+        metavar="SOSU_NEGATIVE_CACHE_TTL",
+        help="seconds to remember capabilities rejected by Sauce Labs",
+    )
+    group.addoption(
+        "--sosu-auth-state-store",
+        action="store",
+        metavar="SOSU_AUTH_STATE_STORE",
+        help=(
+            "where sosu_auth_state keeps login state: memory (per worker, default)"
+            " or run (shared by all workers of the run)"
+        ),
+    )
+    group.addoption(
+        "--sosu-clear-cache",
+        action="store_true",
+        help="clear capabilities rejected by Sauce Labs in previous runs",
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_cmdline_main(config: Config):
+    # Plan mode collects and reports in a single process. Distribution is
+    # turned off before xdist sets it up from -n, which is kept as the
+    # default plan concurrency.
+    if config.getoption("sosu_plan") or smart_bool(os.environ.get("SOSU_PLAN")):
+        numprocesses = config.getoption("numprocesses", None)
+        if isinstance(numprocesses, int) and numprocesses > 0:
+            setattr(config, "sosu_plan_numprocesses", numprocesses)
+        if numprocesses:
+            config.option.numprocesses = None
+        if config.getoption("dist", "no") != "no":
+            config.option.dist = "no"
+    yield
+
 
 def pytest_configure(config: Config):
     logger.debug("pytest_configure", config=config)
@@ -84,11 +392,284 @@ def pytest_configure(config: Config):
     sosu_config = build_sosu_config(config.option, os.environ)
     setattr(config, "sosu", sosu_config)
 
+    if is_xdist_worker(config):
+        run_dir = get_worker_input(config, "sosu_run_dir")
+    else:
+        run_dir = tempfile.mkdtemp(prefix="pytest-sosu-")
+    setattr(config, "sosu_run_dir", run_dir)
+
+    session_terminator = LiveSessionTerminator(timeout=sosu_config.quit_timeout)
+    session_terminator.install()
+    config.pluginmanager.register(session_terminator, "sosu_session_terminator")
+
+    if sosu_config.profile:
+        profiler = PluginProfiler(sosu_config.profile)
+        set_active_profiler(profiler)
+        config.pluginmanager.register(profiler, "sosu_profiler")
+
+    if sosu_config.log_buffer > 0:
+        log_capture = FailureLogCapture()
+        log_capture.install(sosu_config.log_buffer)
+        config.pluginmanager.register(log_capture, "sosu_log_capture")
+
+    if sosu_config.log_jsonl:
+        log_sink = JsonLinesLogSink()
+        log_sink.install(sosu_config.log_jsonl)
+        config.pluginmanager.register(log_sink, "sosu_log_sink")
+
+    history_recorder = TestHistoryRecorder(
+        config, durations_path=sosu_config.export_durations
+    )
+    setattr(config, "sosu_history_recorder", history_recorder)
+    config.pluginmanager.register(history_recorder, "sosu_history_recorder")
+
+    recording_policy = None
+    if sosu_config.adaptive_recording > 0:
+        recording_policy = AdaptiveRecordingPolicy(
+            history_recorder.history, sosu_config.adaptive_recording
+        )
+    setattr(config, "sosu_recording_policy", recording_policy)
+    setattr(
+        config,
+        "sosu_capabilities_resolver",
+        CapabilitiesResolver(__name__, tunnel_name=sosu_config.tunnel_name),
+    )
+
+    if (
+        sosu_config.tunnel_name
+        and sosu_config.tunnel_command
+        and not sosu_config.plan
+        and _runs_tests(config)
+    ):
+        config.pluginmanager.register(
+            SharedTunnel(
+                sosu_config.tunnel_name,
+                sosu_config.tunnel_command,
+                username=sosu_config.username,
+                access_key=sosu_config.access_key,
+                region=sosu_config.region,
+                timeout=sosu_config.tunnel_timeout,
+            ),
+            "sosu_tunnel",
+        )
+
+    if sosu_config.plan:
+        plan_concurrency = (
+            sosu_config.plan_concurrency
+            or getattr(config, "sosu_plan_numprocesses", None)
+            or 1
+        )
+        config.pluginmanager.register(
+            SessionPlanner(history_recorder.history, plan_concurrency),
+            "sosu_session_planner",
+        )
+
+    if sosu_config.command_timings:
+        config.pluginmanager.register(
+            CommandTimingsReporter(), "sosu_command_timings_reporter"
+        )
+
+    if sosu_config.artifacts_dir:
+        config.pluginmanager.register(
+            ArtifactCollector(
+                sosu_config.artifacts_dir,
+                max_workers=sosu_config.artifacts_workers,
+            ),
+            "sosu_artifact_collector",
+        )
+
+    if sosu_config.background_quit > 0:
+        config.pluginmanager.register(
+            BackgroundSessionFinisher(sosu_config.background_quit),
+            "sosu_session_finisher",
+        )
+
+    if sosu_config.infra_retries > 0:
+        config.pluginmanager.register(
+            InfrastructureRetrier(sosu_config.infra_retries),
+            "sosu_infrastructure_retrier",
+        )
+
+    slug_failure_tracker = None
+    if sosu_config.abort_after > 0:
+        slug_failures_dir = os.path.join(run_dir, "slug-failures")
+        os.makedirs(slug_failures_dir, exist_ok=True)
+        slug_failure_tracker = SlugFailureTracker(
+            slug_failures_dir, sosu_config.abort_after
+        )
+    setattr(config, "sosu_slug_failure_tracker", slug_failure_tracker)
+
+    negative_cache = None
+    cache = getattr(config, "cache", None)
+    if cache is not None:
+        negative_cache = NegativeCache(
+            str(cache.mkdir("sosu_negative_cache")),
+            ttl=sosu_config.negative_cache_ttl,
+        )
+        if sosu_config.clear_cache and not is_xdist_worker(config):
+            negative_cache.clear()
+    setattr(config, "sosu_negative_cache", negative_cache)
+
+    if cache is not None:
+        session_store = SessionStore(str(cache.mkdir("sosu_sessions")))
+        live_session_registry.store = session_store
+        if not is_xdist_worker(config) and not sosu_config.plan:
+            reap_orphaned_sessions(
+                session_store,
+                sosu_config.username,
+                sosu_config.access_key,
+                timeout=sosu_config.quit_timeout,
+            )
+
+    finished_nodeids: Set[str] = set()
+    build_name = _get_configured_build_name(sosu_config)
+    if sosu_config.resume and (build_name is None or cache is None):
+        raise pytest.UsageError(
+            "--sosu-resume requires the cache provider and a build name"
+            " or version set explicitly"
+        )
+    if is_xdist_worker(config):
+        finished_nodeids = set(get_worker_input(config, "sosu_finished_nodeids"))
+    elif cache is not None and build_name is not None:
+        manifests_dir = str(cache.mkdir("sosu_manifests"))
+        prune_manifests(manifests_dir)
+        manifest = ProgressManifest(manifests_dir, build_name)
+        if sosu_config.resume:
+            finished_nodeids = manifest.get_finished_nodeids()
+        config.pluginmanager.register(
+            ProgressRecorder(manifest), "sosu_progress_recorder"
+        )
+    setattr(config, "sosu_finished_nodeids", finished_nodeids)
+
+    rotation_build = sosu_config.rotation_build
+    if is_xdist_worker(config):
+        rotation_build = get_worker_input(config, "sosu_rotation_build")
+    elif rotation_build is None and cache is not None:
+        rotation_cursor = RotationCursor(cache)
+        rotation_build = rotation_cursor.value
+        if not sosu_config.plan:
+            config.pluginmanager.register(rotation_cursor, "sosu_rotation_cursor")
+    setattr(config, "sosu_rotation_build", rotation_build or 0)
+
+    visual_baselines_dir = sosu_config.visual_baselines_dir or os.path.join(
+        str(config.rootpath), DEFAULT_VISUAL_BASELINES_DIR
+    )
+    setattr(
+        config,
+        "sosu_visual_baselines",
+        VisualBaselines(visual_baselines_dir, update=sosu_config.visual_update),
+    )
+
+    auth_state_store: AuthStateStore = MemoryAuthStateStore()
+    if sosu_config.auth_state_store == "run":
+        auth_state_store = FileAuthStateStore(os.path.join(run_dir, "auth-state"))
+    setattr(config, "sosu_auth_state_store", auth_state_store)
+
+
+def pytest_unconfigure(config: Config):
+    session_terminator = config.pluginmanager.get_plugin("sosu_session_terminator")
+    if session_terminator is not None:
+        session_terminator.uninstall()
+    live_session_registry.store = None
+    if config.pluginmanager.get_plugin("sosu_profiler") is not None:
+        set_active_profiler(None)
+    log_capture = config.pluginmanager.get_plugin("sosu_log_capture")
+    if log_capture is not None:
+        log_capture.uninstall()
+    log_sink = config.pluginmanager.get_plugin("sosu_log_sink")
+    if log_sink is not None:
+        log_sink.uninstall()
+    tunnel = config.pluginmanager.get_plugin("sosu_tunnel")
+    if tunnel is not None:
+        tunnel.release()
+    run_dir = getattr(config, "sosu_run_dir", None)
+    if run_dir is not None and not is_xdist_worker(config):
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    set_worker_input(node, "sosu_run_dir", getattr(node.config, "sosu_run_dir"))
+    set_worker_input(
+        node,
+        "sosu_finished_nodeids",
+        sorted(getattr(node.config, "sosu_finished_nodeids")),
+    )
+    set_worker_input(
+        node, "sosu_rotation_build", getattr(node.config, "sosu_rotation_build")
+    )
+
 
 def _get_sosu_config(config: Config) -> SosuConfig:
     return getattr(config, "sosu")
 
 
+def _runs_tests(config: Config) -> bool:
+    # xdist controller only distributes the tests to the workers.
+    return is_xdist_worker(config) or config.getoption("dist", "no") == "no"
+
+
+def _get_configured_build_name(sosu_config: SosuConfig) -> Optional[str]:
+    # Same as the `sosu_build_name` fixture, without the time tag fallback.
+    # Only identifies the build locally, so the version alone is enough.
+    if sosu_config.build_name:
+        return sosu_config.build_name
+    if sosu_config.build_version:
+        return (
+            build_sosu_build_name(
+                sosu_config.build_basename or sosu_config.region,
+                sosu_config.build_version,
+                sosu_config.build_format,
+            )
+            or sosu_config.build_version
+        )
+    return None
+
+
+def _get_history_recorder(config: Config) -> TestHistoryRecorder:
+    return getattr(config, "sosu_history_recorder")
+
+
+def _get_artifact_collector(config: Config) -> Optional[ArtifactCollector]:
+    return config.pluginmanager.get_plugin("sosu_artifact_collector")
+
+
+def _get_session_finisher(config: Config) -> Optional[BackgroundSessionFinisher]:
+    return config.pluginmanager.get_plugin("sosu_session_finisher")
+
+
+def _get_slug_failure_tracker(config: Config) -> Optional[SlugFailureTracker]:
+    return getattr(config, "sosu_slug_failure_tracker")
+
+
+def _get_negative_cache(config: Config) -> Optional[NegativeCache]:
+    return getattr(config, "sosu_negative_cache")
+
+
+def _get_visual_baselines(config: Config) -> VisualBaselines:
+    return getattr(config, "sosu_visual_baselines")
+
+
+def _get_auth_state_store(config: Config) -> AuthStateStore:
+    return getattr(config, "sosu_auth_state_store")
+
+
+def _get_recording_policy(config: Config) -> Optional[AdaptiveRecordingPolicy]:
+    return getattr(config, "sosu_recording_policy")
+
+
+def _get_capabilities_resolver(config: Config) -> CapabilitiesResolver:
+    return getattr(config, "sosu_capabilities_resolver")
+
+
+def _get_code_hash(item: pytest.Item) -> Optional[str]:
+    if not hasattr(item, "sosu_code_hash"):
+        func = getattr(item, "function", None)
+        setattr(item, "sosu_code_hash", None if func is None else get_code_hash(func))
+    return getattr(item, "sosu_code_hash")
+
+
+@profile_hot_path
 def pytest_runtest_setup(item: pytest.Item):
     logger.debug("pytest_runtest_setup", item=item)
     sosu_markers = list(item.iter_markers(name="sosu"))
@@ -96,6 +677,7 @@ def pytest_runtest_setup(item: pytest.Item):
         logger.debug("sosu marker(s) found", sosu_markers=sosu_markers)
 
 
+@profile_hot_path
 def pytest_generate_tests(metafunc):
     logger.debug(
         "pytest_generate_tests",
@@ -106,7 +688,73 @@ def pytest_generate_tests(metafunc):
     parametrize_capabilities(metafunc)
 
 
+@profile_hot_path
+def pytest_collection_modifyitems(
+    session: pytest.Session, config: Config, items: List[pytest.Item]
+):
+    sosu_config = _get_sosu_config(config)
+    history = _get_history_recorder(config).history
+    failed_nodeids = history.get_failed_nodeids()
+    if sosu_config.shard is not None and has_rotation_items(items):
+        # Every shard has to select the same cells before being split,
+        # which neither the local cursor nor the local history guarantee.
+        if sosu_config.rotation_build is None:
+            pytest.exit(
+                "--sosu-shard with capabilities matrix rotation requires"
+                " --sosu-rotation-build",
+                returncode=pytest.ExitCode.USAGE_ERROR,
+            )
+        failed_nodeids = set()
+    selected, deselected = select_rotation_items(
+        items, getattr(config, "sosu_rotation_build"), failed_nodeids
+    )
+    if deselected:
+        items[:] = selected
+        config.hook.pytest_deselected(items=deselected)
+    if sosu_config.shard is not None:
+        selected, deselected = select_shard_items(
+            items, sosu_config.shard, sosu_config.shard_durations or {}
+        )
+        items[:] = selected
+        config.hook.pytest_deselected(items=deselected)
+    finished_nodeids = getattr(config, "sosu_finished_nodeids")
+    if finished_nodeids:
+        deselected = [item for item in items if item.nodeid in finished_nodeids]
+        items[:] = [item for item in items if item.nodeid not in finished_nodeids]
+        config.hook.pytest_deselected(items=deselected)
+
+
+def pytest_sessionfinish(session: pytest.Session):
+    config = session.config
+    logger.debug("pytest_sessionfinish", session=session)
+    if is_xdist_worker(config):
+        set_worker_output(config, "sosu_metrics", metrics_registry.to_dict())
+        session_finisher = _get_session_finisher(config)
+        if session_finisher is not None:
+            set_worker_output(
+                config, "sosu_session_finish_failures", session_finisher.failures
+            )
+        return
+    sosu_config = _get_sosu_config(config)
+    if sosu_config.metrics_file:
+        metrics_registry.write_textfile(sosu_config.metrics_file)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    metrics_data = get_worker_output(node, "sosu_metrics")
+    if metrics_data:
+        metrics_registry.merge_dict(metrics_data)
+    session_finisher = _get_session_finisher(node.config)
+    if session_finisher is not None:
+        session_finisher.failures.extend(
+            tuple(failure)
+            for failure in get_worker_output(node, "sosu_session_finish_failures", [])
+        )
+
+
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
+@profile_hot_path
 def pytest_runtest_makereport(item, call):
     # Execute all other hooks to obtain the report object.
     outcome = yield
@@ -116,14 +764,34 @@ def pytest_runtest_makereport(item, call):
     # be "setup", "call", "teardown"
     setattr(item, "report_when_" + report.when, report)
 
+    if report.when == "teardown":
+        capabilities = getattr(item, "funcargs", {}).get(
+            "sosu_webdriver_combined_capabilities"
+        )
+        if capabilities is not None:
+            setattr(report, "sosu_slug", capabilities.slug)
+
+    if report.skipped and getattr(item, "sosu_slug_aborted", False):
+        setattr(report, "sosu_slug_aborted", True)
+
+    if report.when == "call" and _get_recording_policy(item.config) is not None:
+        setattr(report, "sosu_code_hash", _get_code_hash(item))
+
+    if (
+        call.excinfo is not None
+        and is_infrastructure_error(call.excinfo.value)
+        and not is_permanent_rejection(call.excinfo.value)
+    ):
+        setattr(item, "sosu_infrastructure_error_when_" + report.when, True)
 
-@pytest.fixture(scope="session")
+
+@profiled_fixture(scope="session")
 def sosu_build_basename(pytestconfig: Config) -> Optional[str]:
     sosu_config = _get_sosu_config(pytestconfig)
     return sosu_config.region
 
 
-@pytest.fixture(scope="session")
+@profiled_fixture(scope="session")
 def sosu_build_time_tag() -> str:
     now = datetime.datetime.now()
     date_str = f"{now.year}{now.month:02d}{now.day:02d}"
@@ -131,13 +799,13 @@ def sosu_build_time_tag() -> str:
     return f"{date_str}_{time_str}"
 
 
-@pytest.fixture(scope="session")
+@profiled_fixture(scope="session")
 def sosu_build_format(pytestconfig: Config) -> str:
     sosu_config = _get_sosu_config(pytestconfig)
     return sosu_config.build_format
 
 
-@pytest.fixture(scope="session")
+@profiled_fixture(scope="session")
 def sosu_build_version(pytestconfig: Config, sosu_build_time_tag: str) -> str:
     sosu_config = _get_sosu_config(pytestconfig)
     if sosu_config.build_version:
@@ -145,7 +813,7 @@ def sosu_build_version(pytestconfig: Config, sosu_build_time_tag: str) -> str:
     return sosu_build_time_tag
 
 
-@pytest.fixture(scope="session")
+@profiled_fixture(scope="session")
 def sosu_build_name(
     pytestconfig: Config,
     sosu_build_basename: Optional[str],
@@ -162,16 +830,21 @@ def sosu_build_name(
     )
 
 
-@pytest.fixture
+# Session scoped, it depends only on the configuration.
+@profiled_fixture(scope="session")
 def sosu_webdriver_url_data(pytestconfig: Config) -> WebDriverUrlData:
     sosu_config = _get_sosu_config(pytestconfig)
     return sosu_config.webdriver_url_data_with_credentials
 
 
-@pytest.fixture
+@profiled_fixture
 def sosu_test_name(request: pytest.FixtureRequest) -> str:
-    path = get_function_path(request.node.function)
-    return f"{path}::{request.node.name}"
+    return get_test_name(request.node)
+
+
+def get_test_name(item: pytest.Item) -> str:
+    path = get_function_path(getattr(item, "function"))
+    return f"{path}::{item.name}"
 
 
 def get_function_path(func: Callable[..., Any]) -> str:
@@ -179,25 +852,39 @@ def get_function_path(func: Callable[..., Any]) -> str:
     return f"{rel_path}.py"
 
 
-@pytest.fixture
+@profiled_fixture
 def sosu_webdriver_platform() -> Optional[Platform]:
     return Platform.default()
 
 
-@pytest.fixture
+@profiled_fixture
 def sosu_webdriver_browser() -> Optional[Browser]:
     return Browser.default()
 
 
-@pytest.fixture
-def sosu_sauce_options(sosu_test_name: str, sosu_build_name: str) -> SauceOptions:
-    return SauceOptions(
+@profiled_fixture
+def sosu_sauce_options(
+    request: pytest.FixtureRequest, sosu_test_name: str, sosu_build_name: str
+) -> SauceOptions:
+    sauce_options = SauceOptions(
         name=sosu_test_name,
         build=sosu_build_name,
+        tunnel_name=_get_sosu_config(request.config).tunnel_name,
     )
+    recording_sauce_options = _get_recording_sauce_options(request.node)
+    if recording_sauce_options is not None:
+        sauce_options = sauce_options.merge(recording_sauce_options)
+    return sauce_options
 
 
-@pytest.fixture
+def _get_recording_sauce_options(item: pytest.Item) -> Optional[SauceOptions]:
+    recording_policy = _get_recording_policy(item.config)
+    if recording_policy is None:
+        return None
+    return recording_policy.get_sauce_options(item.nodeid, _get_code_hash(item))
+
+
+@profiled_fixture
 def sosu_webdriver_capabilities(
     sosu_sauce_options: SauceOptions,
     sosu_webdriver_platform: Optional[Platform],
@@ -210,35 +897,182 @@ def sosu_webdriver_capabilities(
     )
 
 
-@pytest.fixture
+@profiled_fixture
 def sosu_webdriver_parameter_capabilities() -> Capabilities:
     return Capabilities()
 
 
-@pytest.fixture
+@profiled_fixture
 def sosu_webdriver_combined_capabilities(
-    sosu_webdriver_capabilities: Capabilities,
+    request: pytest.FixtureRequest,
+    sosu_build_name: Optional[str],
     sosu_webdriver_parameter_capabilities: Capabilities,
 ) -> Capabilities:
-    return sosu_webdriver_capabilities.merge(sosu_webdriver_parameter_capabilities)
+    resolver = _get_capabilities_resolver(request.config)
+    if not resolver.is_resolvable(request.node):
+        # Some of the default fixtures are overridden, use all of them.
+        sosu_webdriver_capabilities: Capabilities = request.getfixturevalue(
+            "sosu_webdriver_capabilities"
+        )
+        return sosu_webdriver_capabilities.merge(sosu_webdriver_parameter_capabilities)
+    return resolver.resolve(
+        get_test_name(request.node),
+        sosu_build_name,
+        _get_recording_sauce_options(request.node),
+        sosu_webdriver_parameter_capabilities,
+    )
 
 
-@pytest.fixture
+@profiled_fixture
 def sosu_selenium_webdriver(
     request,
     sosu_webdriver_url_data: WebDriverUrlData,
     sosu_webdriver_combined_capabilities: Capabilities,
 ):
-    with remote_webdriver_ctx(
-        sosu_webdriver_url_data,
-        sosu_webdriver_combined_capabilities,
-    ) as webdriver:
-        yield webdriver
-        # Using attribute defined in `pytest_runtest_makereport`.
-        if not hasattr(request.node, "report_when_call"):
-            # No report for test call set - assuming the test was interrupted.
-            # Use marker exception for the `remote_webdriver_ctx`.
-            raise WebDriverTestInterrupted()
-        if request.node.report_when_call.failed:
-            # Use marker exception for the `remote_webdriver_ctx`.
-            raise WebDriverTestFailed()
+    _check_session_allowed(request, sosu_webdriver_combined_capabilities)
+    sosu_config = _get_sosu_config(request.config)
+    command_stats = CommandStats() if sosu_config.command_timings else None
+    failure_artifacts = None
+    artifact_collector = _get_artifact_collector(request.config)
+    if artifact_collector is not None:
+        failure_artifacts = artifact_collector.for_test(request.node.nodeid)
+    session_started = False
+    try:
+        with remote_webdriver_ctx(
+            sosu_webdriver_url_data,
+            sosu_webdriver_combined_capabilities,
+            command_stats=command_stats,
+            failure_artifacts=failure_artifacts,
+            finish_executor=_get_session_finisher(request.config),
+        ) as webdriver:
+            session_started = True
+            yield webdriver
+            _raise_for_test_outcome(request)
+    except Exception as exc:
+        _record_session_error(
+            request, sosu_webdriver_combined_capabilities, exc, session_started
+        )
+        raise
+    _record_session_finished(
+        request, sosu_webdriver_combined_capabilities, command_stats
+    )
+    if failure_artifacts is not None and failure_artifacts.paths:
+        for path in failure_artifacts.paths:
+            request.node.user_properties.append(("sosu_artifact", path))
+        request.node.add_report_section(
+            "teardown", "sosu artifacts", "\n".join(failure_artifacts.paths)
+        )
+
+
+@profiled_fixture
+def sosu_auth_state(
+    request,
+    sosu_selenium_webdriver,
+    sosu_webdriver_combined_capabilities: Capabilities,
+) -> AuthStateCache:
+    return AuthStateCache(
+        _get_auth_state_store(request.config),
+        sosu_selenium_webdriver,
+        sosu_webdriver_combined_capabilities.slug,
+    )
+
+
+@profiled_fixture
+def sosu_visual(
+    request, sosu_webdriver_combined_capabilities: Capabilities
+) -> VisualChecker:
+    check_visual_dependencies()
+    return _get_visual_baselines(request.config).for_test(
+        request.node.nodeid, sosu_webdriver_combined_capabilities.slug
+    )
+
+
+@async_fixture
+async def sosu_async_webdriver(
+    request,
+    sosu_webdriver_url_data: WebDriverUrlData,
+    sosu_webdriver_combined_capabilities: Capabilities,
+):
+    check_async_dependencies()
+    _check_session_allowed(request, sosu_webdriver_combined_capabilities)
+    sosu_config = _get_sosu_config(request.config)
+    command_stats = CommandStats() if sosu_config.command_timings else None
+    session_started = False
+    try:
+        async with async_remote_webdriver_ctx(
+            sosu_webdriver_url_data,
+            sosu_webdriver_combined_capabilities,
+            command_stats=command_stats,
+        ) as webdriver:
+            session_started = True
+            yield webdriver
+            _raise_for_test_outcome(request)
+    except Exception as exc:
+        _record_session_error(
+            request, sosu_webdriver_combined_capabilities, exc, session_started
+        )
+        raise
+    _record_session_finished(
+        request, sosu_webdriver_combined_capabilities, command_stats
+    )
+
+
+def _check_session_allowed(request, capabilities: Capabilities) -> None:
+    slug = capabilities.slug
+    slug_failure_tracker = _get_slug_failure_tracker(request.config)
+    if slug_failure_tracker is not None and slug_failure_tracker.should_skip(slug):
+        # Not a skip of the test itself, see `pytest_runtest_makereport`.
+        setattr(request.node, "sosu_slug_aborted", True)
+        pytest.skip(
+            f"{slug}: aborted after {slug_failure_tracker.threshold}"
+            " consecutive infrastructure failures"
+        )
+    negative_cache = _get_negative_cache(request.config)
+    if negative_cache is not None:
+        rejection_message = negative_cache.get(capabilities)
+        if rejection_message is not None:
+            pytest.fail(
+                f"{slug}: capabilities rejected by a previous run (cached):"
+                f" {rejection_message}",
+                pytrace=False,
+            )
+
+
+def _raise_for_test_outcome(request) -> None:
+    # Using attribute defined in `pytest_runtest_makereport`.
+    if not hasattr(request.node, "report_when_call"):
+        # No report for test call set - assuming the test was interrupted.
+        # Use marker exception for the `remote_webdriver_ctx`.
+        raise WebDriverTestInterrupted()
+    if request.node.report_when_call.failed:
+        # Use marker exception for the `remote_webdriver_ctx`.
+        raise WebDriverTestFailed()
+
+
+def _record_session_error(
+    request, capabilities: Capabilities, exc: Exception, session_started: bool
+) -> None:
+    slug_failure_tracker = _get_slug_failure_tracker(request.config)
+    if slug_failure_tracker is not None and (
+        not session_started or is_infrastructure_error(exc)
+    ):
+        slug_failure_tracker.record_failure(capabilities.slug)
+    negative_cache = _get_negative_cache(request.config)
+    if negative_cache is not None and not session_started:
+        if is_permanent_rejection(exc):
+            negative_cache.add(capabilities, getattr(exc, "msg", None) or str(exc))
+
+
+def _record_session_finished(
+    request, capabilities: Capabilities, command_stats: Optional[CommandStats]
+) -> None:
+    slug_failure_tracker = _get_slug_failure_tracker(request.config)
+    if slug_failure_tracker is not None:
+        if getattr(request.node, "sosu_infrastructure_error_when_call", False):
+            slug_failure_tracker.record_failure(capabilities.slug)
+        else:
+            slug_failure_tracker.record_success(capabilities.slug)
+    if command_stats is not None:
+        request.node.user_properties.append(
+            (COMMAND_TIMINGS_PROPERTY_NAME, json.dumps(command_stats.to_dict()))
+        )
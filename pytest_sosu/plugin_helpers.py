@@ -1,5 +1,5 @@
 import string
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 
 import pytest
 from _pytest.mark.structures import Mark
@@ -9,9 +9,12 @@ from pytest_sosu.exceptions import (
     InvalidMarkerConfiguration,
     MultipleMarkerParametersFound,
 )
+from pytest_sosu.rotation import is_in_rotation
+from pytest_sosu.sharding import Shard, split_into_shard
 from pytest_sosu.webdriver import Capabilities, CapabilitiesMatrix
 
 SOSU_MARKER_NAME = "sosu"
+PARAMETER_CAPABILITIES_FIXTURE_NAME = "sosu_webdriver_parameter_capabilities"
 
 
 def parametrize_capabilities(metafunc: Metafunc):
@@ -99,3 +102,70 @@ def build_sosu_build_name(
             "build_version": sosu_build_version,
         }
     )
+
+
+def select_shard_items(
+    items: List[pytest.Item],
+    shard: Shard,
+    durations: Mapping[str, float],
+) -> Tuple[List[pytest.Item], List[pytest.Item]]:
+    selected_indices, deselected_indices = split_into_shard(
+        [item.nodeid for item in items],
+        shard,
+        durations,
+    )
+    return (
+        [items[i] for i in selected_indices],
+        [items[i] for i in deselected_indices],
+    )
+
+
+def select_rotation_items(
+    items: List[pytest.Item],
+    build_number: int,
+    failed_nodeids: Set[str],
+) -> Tuple[List[pytest.Item], List[pytest.Item]]:
+    selected: List[pytest.Item] = []
+    deselected: List[pytest.Item] = []
+    cell_counts: Dict[int, int] = {}
+    for item in items:
+        caps_matrix = _get_item_capabilities_matrix_or_none(item)
+        callspec = getattr(item, "callspec", None)
+        # Recently failed cells are run in every build until they pass.
+        if (
+            caps_matrix is None
+            or caps_matrix.rotation is None
+            or callspec is None
+            or item.nodeid in failed_nodeids
+        ):
+            selected.append(item)
+            continue
+        if id(caps_matrix) not in cell_counts:
+            cell_counts[id(caps_matrix)] = sum(
+                1 for _ in caps_matrix.iter_capabilities()
+            )
+        # Parametrized in the order of the matrix, so the parameter index
+        # is the cell index (capabilities need not be hashable).
+        index = callspec.indices.get(PARAMETER_CAPABILITIES_FIXTURE_NAME)
+        if index is None or is_in_rotation(
+            index, cell_counts[id(caps_matrix)], caps_matrix.rotation, build_number
+        ):
+            selected.append(item)
+        else:
+            deselected.append(item)
+    return selected, deselected
+
+
+def has_rotation_items(items: List[pytest.Item]) -> bool:
+    for item in items:
+        caps_matrix = _get_item_capabilities_matrix_or_none(item)
+        if caps_matrix is not None and caps_matrix.rotation is not None:
+            return True
+    return False
+
+
+def _get_item_capabilities_matrix_or_none(
+    item: pytest.Item,
+) -> Optional[CapabilitiesMatrix]:
+    sosu_markers = [m for m in item.own_markers if m.name == SOSU_MARKER_NAME]
+    return _get_marker_capabilites_matrix_or_none(sosu_markers)
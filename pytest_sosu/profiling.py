@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import collections
+import cProfile
+import functools
+import inspect
+import marshal
+import os
+import pstats
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import pytest
+
+from pytest_sosu.logging import get_struct_logger
+from pytest_sosu.workers import get_worker_output, is_xdist_worker, set_worker_output
+
+logger = get_struct_logger(__name__)
+
+# Shorter call paths are dropped from the collapsed stacks.
+MIN_COLLAPSED_STACK_TIME = 1e-6
+
+F = TypeVar("F", bound=Callable[..., Any])
+FuncKey = Tuple[str, int, str]
+StatsData = Dict[FuncKey, Any]
+
+active_profiler: Optional[PluginProfiler] = None
+
+
+class PluginProfiler:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.collapsed_path = os.path.splitext(path)[0] + ".collapsed"
+        self._profile = _create_profile()
+        self._stats = pstats.Stats()
+        self._thread_id = threading.get_ident()
+        self._depth = 0
+
+    def start(self) -> bool:
+        # Only the main thread is profiled, other threads (e.g. background
+        # session finishing) run outside of the measured hot paths.
+        if threading.get_ident() != self._thread_id:
+            return False
+        self._depth += 1
+        if self._depth == 1:
+            try:
+                self._profile.enable()
+            except ValueError as exc:
+                # Another profiler is already active.
+                logger.warning("Could not start profiling", error=exc)
+                self._depth -= 1
+                return False
+        return True
+
+    def stop(self) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            self._profile.disable()
+
+    def add_stats_data(self, stats_data: StatsData) -> None:
+        if not stats_data:
+            return
+        stats = pstats.Stats()
+        stats.stats = stats_data  # type: ignore
+        stats.get_top_level_stats()  # type: ignore
+        self._stats.add(stats)
+
+    def collect(self) -> StatsData:
+        self._profile.create_stats()
+        self.add_stats_data(_drop_own_frames(self._profile.stats))  # type: ignore
+        self._profile = _create_profile()
+        return self._stats.stats  # type: ignore
+
+    def write(self) -> None:
+        stats_data = self.collect()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._stats.dump_stats(self.path)
+        with open(self.collapsed_path, "w", encoding="utf-8") as f:
+            for stack, seconds in sorted(build_collapsed_stacks(stats_data).items()):
+                f.write(f"{stack} {round(seconds * 1_000_000)}\n")
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        config = session.config
+        if is_xdist_worker(config):
+            set_worker_output(config, "sosu_profile", marshal.dumps(self.collect()))
+            return
+        self.write()
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error) -> None:
+        data = get_worker_output(node, "sosu_profile")
+        if data:
+            self.add_stats_data(marshal.loads(data))
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        terminalreporter.write_sep("-", "sosu profile")
+        terminalreporter.write_line(f"pstats: {self.path}")
+        terminalreporter.write_line(f"collapsed stacks: {self.collapsed_path}")
+
+
+def set_active_profiler(profiler: Optional[PluginProfiler]) -> None:
+    global active_profiler  # pylint: disable=global-statement
+    active_profiler = profiler
+
+
+def profile_hot_path(func: F) -> F:
+    if inspect.isgeneratorfunction(func):
+        # Fixtures and hook wrappers: profile each step separately, leaving
+        # out the code run while the generator is suspended.
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            gen = func(*args, **kwargs)
+            sent = None
+            while True:
+                profiler = _start_profiling()
+                try:
+                    value = gen.send(sent)
+                except StopIteration as stop:
+                    return stop.value
+                finally:
+                    if profiler is not None:
+                        profiler.stop()
+                sent = yield value
+
+        return generator_wrapper  # type: ignore
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _start_profiling()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+
+    return wrapper  # type: ignore
+
+
+def profiled_fixture(*args: Any, **kwargs: Any) -> Any:
+    # `pytest.fixture` of a function profiled as a hot path; usable with
+    # and without arguments, same as `pytest.fixture`.
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return pytest.fixture(profile_hot_path(args[0]))
+
+    def decorator(func: F) -> Any:
+        return pytest.fixture(*args, **kwargs)(profile_hot_path(func))
+
+    return decorator
+
+
+def build_collapsed_stacks(stats_data: StatsData) -> Dict[str, float]:
+    # cProfile records only caller-callee pairs, so time of functions called
+    # from many places is split between the call paths proportionally.
+    children: Dict[FuncKey, List[FuncKey]] = collections.defaultdict(list)
+    for key, (_, _, _, _, callers) in stats_data.items():
+        for caller in callers:
+            children[caller].append(key)
+    stacks: Dict[str, float] = collections.defaultdict(float)
+    pending: List[Tuple[Tuple[FuncKey, ...], float]] = [
+        ((key,), 1.0) for key, func_stats in stats_data.items() if not func_stats[4]
+    ]
+    while pending:
+        path, scale = pending.pop()
+        key = path[-1]
+        _, _, own_time, _, _ = stats_data[key]
+        stacks[_get_stack_label(path)] += own_time * scale
+        for child in children[key]:
+            if child in path:
+                continue
+            _, _, _, child_time, child_callers = stats_data[child]
+            edge_time = child_callers[key][3]
+            if child_time <= 0 or edge_time * scale < MIN_COLLAPSED_STACK_TIME:
+                continue
+            pending.append((path + (child,), scale * edge_time / child_time))
+    return {
+        stack: seconds
+        for stack, seconds in stacks.items()
+        if seconds >= MIN_COLLAPSED_STACK_TIME
+    }
+
+
+def _create_profile() -> cProfile.Profile:
+    # CPU time, so waiting for the remote end (e.g. creating or quitting
+    # sessions in the driver fixtures) does not dominate the plugin overhead.
+    return cProfile.Profile(time.process_time)
+
+
+def _start_profiling() -> Optional[PluginProfiler]:
+    profiler = active_profiler
+    if profiler is not None and profiler.start():
+        return profiler
+    return None
+
+
+def _drop_own_frames(stats_data: StatsData) -> StatsData:
+    # Leave out the profiler's start and stop calls.
+    own_keys = {
+        key
+        for key in stats_data
+        if key[0] == __file__ or key[2].endswith("of '_lsprof.Profiler' objects>")
+    }
+    return {
+        key: (
+            *func_stats[:4],
+            {
+                caller: caller_stats
+                for caller, caller_stats in func_stats[4].items()
+                if caller not in own_keys
+            },
+        )
+        for key, func_stats in stats_data.items()
+        if key not in own_keys
+    }
+
+
+def _get_stack_label(path: Tuple[FuncKey, ...]) -> str:
+    if len(path) > 1 and path[0][0] == "~":
+        # Generator steps start with a builtin `send` call.
+        path = path[1:]
+    return ";".join(_get_frame_label(key) for key in path)
+
+
+def _get_frame_label(key: FuncKey) -> str:
+    filename, line, name = key
+    if filename == "~":
+        label = name
+    else:
+        label = f"{name} ({os.path.basename(filename)}:{line})"
+    return label.replace(";", ",")
@@ -0,0 +1,38 @@
+import hashlib
+import inspect
+from typing import Any, Callable, Optional
+
+from pytest_sosu.history import TestHistory
+from pytest_sosu.webdriver import SauceOptions
+
+NO_RECORDING_SAUCE_OPTIONS = SauceOptions(
+    record_video=False,
+    video_upload_on_pass=False,
+    record_screenshots=False,
+)
+
+
+def get_code_hash(func: Callable[..., Any]) -> Optional[str]:
+    try:
+        source = inspect.getsource(func).encode("utf-8")
+    except (OSError, TypeError):
+        code = getattr(func, "__code__", None)
+        if code is None:
+            return None
+        source = code.co_code
+    return hashlib.sha1(source).hexdigest()
+
+
+class AdaptiveRecordingPolicy:
+    # Recording is switched off for tests which passed `stable_passes` times
+    # in a row without changing their code; any failure resets the streak.
+
+    def __init__(self, history: TestHistory, stable_passes: int) -> None:
+        self._history = history
+        self.stable_passes = stable_passes
+
+    def get_sauce_options(self, nodeid: str, code_hash: Optional[str]) -> SauceOptions:
+        pass_streak = self._history.get_pass_streak(nodeid, code_hash)
+        if code_hash is not None and pass_streak >= self.stable_passes:
+            return NO_RECORDING_SAUCE_OPTIONS
+        return SauceOptions()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import dataclasses
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+import pytest
+
+from pytest_sosu.webdriver import Browser, Capabilities, Platform, SauceOptions
+
+# Default fixtures whose work is done by the resolver, unless overridden.
+RESOLVED_FIXTURE_NAMES = (
+    "sosu_test_name",
+    "sosu_webdriver_platform",
+    "sosu_webdriver_browser",
+    "sosu_sauce_options",
+    "sosu_webdriver_capabilities",
+)
+
+
+class CapabilitiesResolver:
+    # Capabilities not depending on the test are computed once per build
+    # name, recording options and parameter capabilities; only the test name
+    # is applied per test.
+
+    def __init__(
+        self,
+        plugin_module: str,
+        fixture_names: Sequence[str] = RESOLVED_FIXTURE_NAMES,
+        tunnel_name: Optional[str] = None,
+    ) -> None:
+        self._plugin_module = plugin_module
+        self._tunnel_name = tunnel_name
+        self._fixture_names = fixture_names
+        self._cache: Dict[Hashable, Tuple[Any, Capabilities]] = {}
+
+    def is_resolvable(self, item: pytest.Item) -> bool:
+        if not hasattr(item, "sosu_resolvable"):
+            setattr(item, "sosu_resolvable", self._is_resolvable(item))
+        return getattr(item, "sosu_resolvable")
+
+    def resolve(
+        self,
+        test_name: str,
+        build_name: Optional[str],
+        recording_sauce_options: Optional[SauceOptions],
+        parameter_capabilities: Capabilities,
+    ) -> Capabilities:
+        capabilities = self._get_static(
+            build_name, recording_sauce_options, parameter_capabilities
+        )
+        # Name from the parameter capabilities takes precedence,
+        # same as when merging the default fixtures.
+        if capabilities.sauce_options.name is not None:
+            return capabilities
+        return dataclasses.replace(
+            capabilities,
+            sauce_options=dataclasses.replace(
+                capabilities.sauce_options, name=test_name
+            ),
+        )
+
+    def _get_static(
+        self,
+        build_name: Optional[str],
+        recording_sauce_options: Optional[SauceOptions],
+        parameter_capabilities: Capabilities,
+    ) -> Capabilities:
+        key: Hashable = (build_name, recording_sauce_options, parameter_capabilities)
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable values (e.g. list of tags) are cached by identity,
+            # keeping them referenced, so the identities are not reused.
+            key = (build_name, id(recording_sauce_options), id(parameter_capabilities))
+        entry = self._cache.get(key)
+        if entry is not None:
+            return entry[1]
+        sauce_options = SauceOptions(build=build_name, tunnel_name=self._tunnel_name)
+        if recording_sauce_options is not None:
+            sauce_options = sauce_options.merge(recording_sauce_options)
+        capabilities = Capabilities(
+            browser=Browser.default(),
+            platform=Platform.default(),
+            sauce_options=sauce_options,
+        ).merge(parameter_capabilities)
+        self._cache[key] = (
+            (recording_sauce_options, parameter_capabilities),
+            capabilities,
+        )
+        return capabilities
+
+    def _is_resolvable(self, item: pytest.Item) -> bool:
+        callspec = getattr(item, "callspec", None)
+        if callspec is not None and any(
+            name in callspec.params for name in self._fixture_names
+        ):
+            return False
+        fixture_manager = getattr(item.session, "_fixturemanager", None)
+        arg2fixturedefs = getattr(fixture_manager, "_arg2fixturedefs", None)
+        if arg2fixturedefs is None:
+            return False
+        for name in self._fixture_names:
+            for fixturedef in arg2fixturedefs.get(name, ()):
+                func = getattr(fixturedef, "func", None)
+                if getattr(func, "__module__", None) == self._plugin_module:
+                    continue
+                # Conservative check whether the override is visible
+                # from the item; if in doubt, default fixtures are used.
+                if item.nodeid.startswith(fixturedef.baseid or ""):
+                    return False
+        return True
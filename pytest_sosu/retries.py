@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+import pytest
+from _pytest.runner import runtestprotocol
+
+from pytest_sosu.logging import get_struct_logger
+from pytest_sosu.plan import SESSION_FIXTURE_NAMES
+
+logger = get_struct_logger(__name__)
+
+INFRA_RETRY_OUTCOME = "infra-retry"
+ITEM_STATE_ATTRIBUTE_PREFIXES = (
+    "report_when_",
+    "sosu_infrastructure_error_when_",
+    "sosu_slug_aborted",
+)
+
+
+class InfrastructureRetrier:
+    def __init__(self, max_retries: int) -> None:
+        self.max_retries = max_retries
+        self.retried_reports: List[pytest.TestReport] = []
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_protocol(
+        self, item: pytest.Item, nextitem: Optional[pytest.Item]
+    ) -> bool:
+        item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+        attempt = 0
+        while True:
+            _reset_item_state(item)
+            reports = runtestprotocol(item, nextitem=nextitem, log=False)
+            retry = attempt < self.max_retries and is_infrastructure_failure(
+                item, reports
+            )
+            for report in reports:
+                if retry and report.failed:
+                    report.outcome = INFRA_RETRY_OUTCOME  # type: ignore
+                item.ihook.pytest_runtest_logreport(report=report)
+            if not retry:
+                break
+            attempt += 1
+            logger.info(
+                "Retrying test after infrastructure failure",
+                nodeid=item.nodeid,
+                attempt=attempt,
+            )
+        item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+        return True
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        if report.outcome == INFRA_RETRY_OUTCOME:
+            self.retried_reports.append(report)
+
+    def pytest_report_teststatus(self, report: pytest.TestReport):
+        if report.outcome == INFRA_RETRY_OUTCOME:
+            return INFRA_RETRY_OUTCOME, "I", ("INFRA-RETRY", {"yellow": True})
+        return None
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        if not self.retried_reports:
+            return
+        terminalreporter.write_sep("=", "sosu infrastructure retries")
+        for report in self.retried_reports:
+            reason = str(report.longrepr).strip().splitlines()
+            terminalreporter.write_line(
+                f"{report.nodeid} ({report.when}): {reason[-1] if reason else ''}"
+            )
+
+
+def is_infrastructure_failure(
+    item: pytest.Item, reports: Sequence[pytest.TestReport]
+) -> bool:
+    # Only tests with a remote session get a fresh one by being retried.
+    if not any(name in SESSION_FIXTURE_NAMES for name in item.fixturenames):
+        return False
+    # Using attributes defined in `pytest_runtest_makereport`.
+    failed = [r for r in reports if r.failed]
+    return bool(failed) and all(
+        getattr(item, f"sosu_infrastructure_error_when_{r.when}", False) for r in failed
+    )
+
+
+def _reset_item_state(item: pytest.Item) -> None:
+    for name in list(vars(item)):
+        if name.startswith(ITEM_STATE_ATTRIBUTE_PREFIXES):
+            delattr(item, name)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import math
+from typing import Any
+
+import pytest
+
+ROTATION_CURSOR_CACHE_KEY = "sosu/rotation_cursor"
+
+
+def get_rotation_window_size(count: int, fraction: float) -> int:
+    return min(max(math.ceil(count * fraction), 1), count)
+
+
+def is_in_rotation(index: int, count: int, fraction: float, build_number: int) -> bool:
+    # Each build runs the next window of cells, wrapping around, so every
+    # cell is run at least once within ceil(1 / fraction) builds.
+    window_size = get_rotation_window_size(count, fraction)
+    start = build_number * window_size % count
+    return (index - start) % count < window_size
+
+
+class RotationCursor:
+    # Build number persisted in the pytest cache, used when the CI build
+    # number is not provided.
+
+    def __init__(self, cache: Any) -> None:
+        self._cache = cache
+        self._tests_ran = False
+        self.value: int = self._load()
+
+    def pytest_runtest_logreport(self) -> None:
+        self._tests_ran = True
+
+    def pytest_sessionfinish(self, exitstatus: int) -> None:
+        # Windows of collect-only or interrupted runs are not skipped.
+        if self._tests_ran and exitstatus != pytest.ExitCode.INTERRUPTED:
+            self._cache.set(ROTATION_CURSOR_CACHE_KEY, self.value + 1)
+
+    def _load(self) -> int:
+        value = self._cache.get(ROTATION_CURSOR_CACHE_KEY, 0)
+        if not isinstance(value, int):
+            return 0
+        return value
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Shard:
+    index: int
+    count: int
+
+    @classmethod
+    def from_str(cls, value: str) -> Shard:
+        index_str, sep, count_str = value.partition("/")
+        if not sep:
+            raise ValueError("shard has to be in i/n format")
+        shard = cls(index=int(index_str), count=int(count_str))
+        if not 1 <= shard.index <= shard.count:
+            raise ValueError("shard index has to be between 1 and shard count")
+        return shard
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+def load_shard_durations(path: str) -> Dict[str, float]:
+    # Durations have to be the same for all shards, so they are read from
+    # a file shared by them, not from the history of the local cache.
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("shard durations have to be a JSON object")
+    try:
+        return {str(key): float(value) for key, value in data.items()}
+    except (TypeError, ValueError):
+        raise ValueError("shard durations have to be numbers") from None
+
+
+def write_shard_durations(path: str, durations: Mapping[str, float]) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(durations.items())), f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def split_into_shard(
+    keys: Sequence[str],
+    shard: Shard,
+    durations: Mapping[str, float],
+) -> Tuple[List[int], List[int]]:
+    # Keys are placed on a ring ordered by their hashes, which is cut into
+    # `shard.count` contiguous arcs of (roughly) equal total duration.
+    # Adding or removing a key only shifts the arc boundaries a bit,
+    # so most of the keys stay in their shards.
+    weights = _get_weights(keys, durations)
+    total_weight = sum(weights)
+    order = sorted(range(len(keys)), key=lambda i: (_get_ring_position(keys[i]), i))
+    selected: List[int] = []
+    deselected: List[int] = []
+    cumulative_weight = 0.0
+    for i in order:
+        weight = weights[i]
+        middle = cumulative_weight + weight / 2
+        cumulative_weight += weight
+        shard_index = min(int(middle / total_weight * shard.count), shard.count - 1)
+        if shard_index == shard.index - 1:
+            selected.append(i)
+        else:
+            deselected.append(i)
+    return sorted(selected), sorted(deselected)
+
+
+def _get_weights(keys: Sequence[str], durations: Mapping[str, float]) -> List[float]:
+    known_durations = [durations[key] for key in keys if key in durations]
+    if not known_durations:
+        return [1.0] * len(keys)
+    default_duration = sum(known_durations) / len(known_durations)
+    return [max(durations.get(key, default_duration), 0.001) for key in keys]
+
+
+def _get_ring_position(key: str) -> int:
+    return int.from_bytes(hashlib.sha1(key.encode("utf-8")).digest()[:8], "big")
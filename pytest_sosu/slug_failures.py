@@ -0,0 +1,47 @@
+import os
+
+from pytest_sosu.utils import to_safe_filename
+
+SUCCESS_MARK = b"S"
+FAILURE_MARK = b"F"
+
+
+class SlugFailureTracker:
+    # Results are appended to a file per capabilities slug in a directory
+    # shared by all xdist workers. Small appends are atomic, so no locking
+    # is needed.
+
+    def __init__(self, directory: str, threshold: int) -> None:
+        self.directory = directory
+        self.threshold = threshold
+
+    def record_success(self, slug: str) -> None:
+        self._append(slug, SUCCESS_MARK)
+
+    def record_failure(self, slug: str) -> None:
+        self._append(slug, FAILURE_MARK)
+
+    def get_consecutive_failures(self, slug: str) -> int:
+        try:
+            with open(self._get_path(slug), "rb") as f:
+                marks = f.read()
+        except FileNotFoundError:
+            return 0
+        return len(marks) - len(marks.rstrip(FAILURE_MARK))
+
+    def should_skip(self, slug: str) -> bool:
+        return self.get_consecutive_failures(slug) >= self.threshold
+
+    def _append(self, slug: str, mark: bytes) -> None:
+        fd = os.open(
+            self._get_path(slug),
+            os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+            0o644,
+        )
+        try:
+            os.write(fd, mark)
+        finally:
+            os.close(fd)
+
+    def _get_path(self, slug: str) -> str:
+        return os.path.join(self.directory, to_safe_filename(slug))
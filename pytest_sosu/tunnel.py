@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import atexit
+import contextlib
+import fcntl
+import os
+import shlex
+import signal
+import string
+import subprocess
+import tempfile
+import time
+import uuid
+from typing import Iterator, List, Optional
+
+from pytest_sosu.logging import get_struct_logger
+from pytest_sosu.utils import (
+    get_process_start_time,
+    is_process_alive,
+    to_safe_filename,
+)
+
+logger = get_struct_logger(__name__)
+
+DEFAULT_TUNNEL_TIMEOUT = 120.0
+TUNNEL_STOP_TIMEOUT = 10.0
+TUNNEL_POLL_INTERVAL = 0.1
+
+
+class TunnelError(Exception):
+    pass
+
+
+def get_tunnels_dir() -> str:
+    # Shared by all pytest processes of the host.
+    return os.path.join(tempfile.gettempdir(), "pytest-sosu-tunnels")
+
+
+def build_tunnel_command(
+    command: str,
+    tunnel_name: str,
+    readyfile: str,
+    username: str,
+    access_key: str,
+    region: Optional[str] = None,
+) -> List[str]:
+    values = {
+        "tunnel_name": tunnel_name,
+        "readyfile": readyfile,
+        "username": username,
+        "access_key": access_key,
+        "region": region or "",
+    }
+    # Substituted after splitting, so values containing spaces stay single args.
+    return [
+        string.Template(arg).safe_substitute(values) for arg in shlex.split(command)
+    ]
+
+
+class SharedTunnel:
+    # The tunnel process is started by the first pytest process (controller,
+    # xdist worker or a concurrent run) acquiring it and stopped by the last
+    # one releasing it. Users are counted by files in the tunnel directory,
+    # guarded by a host-wide file lock.
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        tunnel_name: str,
+        command: str,
+        username: str,
+        access_key: str,
+        region: Optional[str] = None,
+        timeout: float = DEFAULT_TUNNEL_TIMEOUT,
+        directory: Optional[str] = None,
+    ) -> None:
+        self.tunnel_name = tunnel_name
+        self.command = command
+        self.username = username
+        self.access_key = access_key
+        self.region = region
+        self.timeout = timeout
+        self.directory = os.path.join(
+            directory or get_tunnels_dir(), to_safe_filename(tunnel_name)
+        )
+        self._user_id = f"{os.getpid()}-{uuid.uuid4().hex}"
+        self._process: Optional[subprocess.Popen] = None
+        self._acquired = False
+
+    @property
+    def readyfile(self) -> str:
+        return os.path.join(self.directory, "ready")
+
+    @property
+    def logfile(self) -> str:
+        return os.path.join(self.directory, "tunnel.log")
+
+    def pytest_sessionstart(self) -> None:
+        self.acquire()
+
+    def acquire(self) -> None:
+        if self._acquired:
+            return
+        with self._lock():
+            self._add_user()
+            pid = self._read_pid()
+            if pid is None or not self._is_running(pid):
+                self._start()
+            else:
+                logger.debug("Reusing tunnel", tunnel_name=self.tunnel_name, pid=pid)
+        self._acquired = True
+        # Killed runs do not release the tunnel, their users are pruned
+        # by the next acquire or release.
+        atexit.register(self.release)
+        try:
+            self._wait_until_ready()
+        except TunnelError:
+            self.release()
+            raise
+
+    def release(self) -> None:
+        if not self._acquired:
+            return
+        self._acquired = False
+        atexit.unregister(self.release)
+        with self._lock():
+            self._remove_user()
+            if self._get_users():
+                return
+            pid = self._read_pid()
+            if pid is not None:
+                self._stop(pid)
+            for path in [self._get_pid_path(), self.readyfile]:
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+
+    @contextlib.contextmanager
+    def _lock(self) -> Iterator[None]:
+        os.makedirs(self._get_users_dir(), exist_ok=True)
+        with open(os.path.join(self.directory, "lock"), "a", encoding="utf-8") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _start(self) -> None:
+        with contextlib.suppress(OSError):
+            os.remove(self.readyfile)
+        args = build_tunnel_command(
+            self.command,
+            tunnel_name=self.tunnel_name,
+            readyfile=self.readyfile,
+            username=self.username,
+            access_key=self.access_key,
+            region=self.region,
+        )
+        logger.info("Starting tunnel", tunnel_name=self.tunnel_name, cmd=args[0])
+        # Credentials are passed in the environment as well, so they do not
+        # have to appear in the command line.
+        env = dict(
+            os.environ,
+            SAUCE_USERNAME=self.username,
+            SAUCE_ACCESS_KEY=self.access_key,
+        )
+        with open(self.logfile, "ab") as log:
+            try:
+                # New session, so the tunnel outlives the process starting it
+                # and is not interrupted by Ctrl-C of the run.
+                self._process = subprocess.Popen(  # pylint: disable=consider-using-with
+                    args,
+                    stdin=subprocess.DEVNULL,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                    env=env,
+                    start_new_session=True,
+                )
+            except OSError as exc:
+                raise TunnelError(
+                    f"Tunnel {self.tunnel_name!r} could not be started: {exc}"
+                ) from None
+        pid = self._process.pid
+        pid_path = self._get_pid_path()
+        tmp_path = f"{pid_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(f"{pid} {get_process_start_time(pid) or ''}")
+        os.replace(tmp_path, pid_path)
+
+    def _wait_until_ready(self) -> None:
+        deadline = time.monotonic() + self.timeout
+        while not os.path.exists(self.readyfile):
+            pid = self._read_pid()
+            if pid is None or not self._is_running(pid):
+                raise TunnelError(
+                    f"Tunnel {self.tunnel_name!r} exited before being ready,"
+                    f" see {self.logfile}"
+                )
+            if time.monotonic() >= deadline:
+                raise TunnelError(
+                    f"Tunnel {self.tunnel_name!r} not ready within"
+                    f" {self.timeout} seconds, see {self.logfile}"
+                )
+            time.sleep(TUNNEL_POLL_INTERVAL)
+        logger.debug("Tunnel ready", tunnel_name=self.tunnel_name)
+
+    def _stop(self, pid: int) -> None:
+        logger.info("Stopping tunnel", tunnel_name=self.tunnel_name, pid=pid)
+        # Process group of the new session, including processes spawned
+        # by the tunnel command.
+        with contextlib.suppress(OSError):
+            os.killpg(pid, signal.SIGTERM)
+        deadline = time.monotonic() + TUNNEL_STOP_TIMEOUT
+        while self._is_running(pid):
+            if time.monotonic() >= deadline:
+                logger.warning("Tunnel not stopped, killing", pid=pid)
+                with contextlib.suppress(OSError):
+                    os.killpg(pid, signal.SIGKILL)
+                break
+            time.sleep(TUNNEL_POLL_INTERVAL)
+
+    def _is_running(self, pid: int) -> bool:
+        if self._process is not None and self._process.pid == pid:
+            # Also reaps the exited process started by this one.
+            return self._process.poll() is None
+        # Exited tunnel started by another instance of the same process
+        # would stay a zombie otherwise.
+        with contextlib.suppress(ChildProcessError):
+            if os.waitpid(pid, os.WNOHANG)[0] == pid:
+                return False
+        return is_process_alive(pid)
+
+    def _add_user(self) -> None:
+        with open(os.path.join(self._get_users_dir(), self._user_id), "w"):
+            pass
+
+    def _remove_user(self) -> None:
+        with contextlib.suppress(OSError):
+            os.remove(os.path.join(self._get_users_dir(), self._user_id))
+
+    def _get_users(self) -> List[str]:
+        users = []
+        for user_id in os.listdir(self._get_users_dir()):
+            pid_str, _, _ = user_id.partition("-")
+            if pid_str.isdigit() and is_process_alive(int(pid_str)):
+                users.append(user_id)
+                continue
+            logger.debug("Removing tunnel user of dead process", user_id=user_id)
+            with contextlib.suppress(OSError):
+                os.remove(os.path.join(self._get_users_dir(), user_id))
+        return users
+
+    def _read_pid(self) -> Optional[int]:
+        try:
+            with open(self._get_pid_path(), encoding="utf-8") as f:
+                pid_str, _, start_time = f.read().partition(" ")
+            pid = int(pid_str)
+        except (OSError, ValueError):
+            return None
+        # The tunnel may have died and its pid been reused by an unrelated
+        # process, which must not be signalled.
+        if not _is_tunnel_process(pid, start_time.strip() or None):
+            logger.debug("Ignoring pid reused by another process", pid=pid)
+            return None
+        return pid
+
+    def _get_pid_path(self) -> str:
+        return os.path.join(self.directory, "pid")
+
+    def _get_users_dir(self) -> str:
+        return os.path.join(self.directory, "users")
+
+
+def _is_tunnel_process(pid: int, start_time: Optional[str]) -> bool:
+    # Started in a new session, so the tunnel leads its process group.
+    try:
+        if os.getpgid(pid) != pid:
+            return False
+    except ProcessLookupError:
+        # Already exited, nothing to signal.
+        return True
+    except OSError:
+        return False
+    current_start_time = get_process_start_time(pid)
+    return start_time is None or current_start_time in (None, start_time)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import os
+import re
 from enum import Enum
 from numbers import Number
 from types import MappingProxyType
@@ -17,6 +19,8 @@ class DefaultValues(Enum):
 
 RAISE_EXCEPTION = DefaultValues.RAISE_EXCEPTION
 
+_unsafe_filename_chars_re = re.compile(r"[^A-Za-z0-9_.-]+")
+
 
 class ImmutableDict(Mapping[_T, _S]):
     def __init__(self, _dict: Mapping[_T, _S]):
@@ -109,3 +113,30 @@ def try_one_of(
 def convert_snake_case_to_camel_case(value: str) -> str:
     first_segment, *other_segments = value.split("_")
     return first_segment + "".join(seg.capitalize() for seg in other_segments)
+
+
+def to_safe_filename(value: str) -> str:
+    return _unsafe_filename_chars_re.sub("_", value)
+
+
+def is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def get_process_start_time(pid: int) -> Optional[str]:
+    # In clock ticks since boot, distinguishes processes reusing a pid.
+    # Available only on Linux.
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # Fields following the command name, which may contain spaces.
+    fields = stat.rpartition(")")[2].split()
+    return fields[19] if len(fields) > 19 else None
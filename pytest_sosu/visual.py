@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pytest_sosu.logging import get_struct_logger
+from pytest_sosu.utils import to_safe_filename
+
+logger = get_struct_logger(__name__)
+
+# Optional dependencies, needed only by the `sosu_visual` fixture.
+try:
+    import numpy  # type: ignore
+except ImportError:
+    numpy = None  # type: ignore
+
+try:
+    from PIL import Image  # type: ignore
+except ImportError:
+    Image = None  # type: ignore
+
+DEFAULT_VISUAL_BASELINES_DIR = "sosu-visual-baselines"
+
+# (x, y, width, height) in screenshot pixels.
+Region = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class VisualComparison:
+    name: str
+    baseline_path: str
+    diff_ratio: float = 0.0
+    created: bool = False
+    updated: bool = False
+    identical: bool = False
+    shape_mismatch: bool = False
+
+
+def check_visual_dependencies() -> None:
+    if numpy is None or Image is None:
+        raise ImportError(
+            "sosu_visual requires numpy and Pillow,"
+            " install them with: pip install pytest-sosu[visual]"
+        )
+
+
+def decode_png(data: bytes) -> Any:
+    with Image.open(io.BytesIO(data)) as image:
+        return numpy.asarray(image.convert("RGB"))
+
+
+def build_ignore_mask(shape: Sequence[int], regions: Sequence[Region]) -> Any:
+    mask = numpy.zeros(shape[:2], dtype=bool)
+    for x, y, width, height in regions:
+        rows = slice(max(y, 0), max(y + height, 0))
+        columns = slice(max(x, 0), max(x + width, 0))
+        mask[rows, columns] = True
+    return mask
+
+
+def get_pixels_digest(pixels: Any, mask: Any) -> str:
+    # Ignored regions are blanked, so changes there do not affect the digest.
+    if mask.any():
+        pixels = pixels.copy()
+        pixels[mask] = 0
+    digest = hashlib.sha1(str(pixels.shape).encode("ascii"))
+    digest.update(numpy.ascontiguousarray(pixels).data)
+    return digest.hexdigest()
+
+
+def get_diff_ratio(
+    actual: Any, baseline: Any, mask: Any, pixel_tolerance: int = 0
+) -> float:
+    diff = numpy.abs(actual.astype(numpy.int16) - baseline.astype(numpy.int16))
+    changed = diff.max(axis=2) > pixel_tolerance
+    changed &= ~mask
+    compared_count = mask.size - int(numpy.count_nonzero(mask))
+    if not compared_count:
+        return 0.0
+    return int(numpy.count_nonzero(changed)) / compared_count
+
+
+class VisualBaselines:
+    def __init__(self, directory: str, update: bool = False) -> None:
+        self.directory = directory
+        self.update = update
+
+    def for_test(self, nodeid: str, slug: str) -> VisualChecker:
+        test_dir = os.path.join(
+            self.directory, to_safe_filename(nodeid), to_safe_filename(slug)
+        )
+        return VisualChecker(test_dir, update=self.update)
+
+
+class VisualChecker:
+    def __init__(self, directory: str, update: bool = False) -> None:
+        self.directory = directory
+        self.update = update
+        self.comparisons: List[VisualComparison] = []
+
+    def check(
+        self,
+        driver: Any,
+        name: str = "screenshot",
+        ignore_regions: Sequence[Region] = (),
+        max_diff_ratio: float = 0.0,
+        pixel_tolerance: int = 0,
+    ) -> VisualComparison:
+        return self.check_png(
+            driver.get_screenshot_as_png(),
+            name=name,
+            ignore_regions=ignore_regions,
+            max_diff_ratio=max_diff_ratio,
+            pixel_tolerance=pixel_tolerance,
+        )
+
+    # pylint: disable=too-many-arguments
+    def check_png(
+        self,
+        data: bytes,
+        name: str = "screenshot",
+        ignore_regions: Sequence[Region] = (),
+        max_diff_ratio: float = 0.0,
+        pixel_tolerance: int = 0,
+    ) -> VisualComparison:
+        comparison = self.compare(
+            decode_png(data),
+            name=name,
+            ignore_regions=ignore_regions,
+            pixel_tolerance=pixel_tolerance,
+        )
+        self.comparisons.append(comparison)
+        if comparison.created and not self.update:
+            # Written anyway, so it can be reviewed and committed, but the
+            # test would pass with nothing compared otherwise.
+            raise AssertionError(
+                f"screenshot {name!r} has no baseline, created"
+                f" {comparison.baseline_path} (use --sosu-visual-update"
+                " to create baselines without failing)"
+            )
+        if comparison.shape_mismatch:
+            raise AssertionError(
+                f"screenshot {name!r} has different size than its baseline"
+                f" {comparison.baseline_path}"
+            )
+        if comparison.diff_ratio > max_diff_ratio:
+            raise AssertionError(
+                f"screenshot {name!r} differs from its baseline"
+                f" {comparison.baseline_path} in {comparison.diff_ratio:.2%}"
+                f" of pixels (allowed {max_diff_ratio:.2%})"
+            )
+        return comparison
+
+    def compare(
+        self,
+        actual: Any,
+        name: str = "screenshot",
+        ignore_regions: Sequence[Region] = (),
+        pixel_tolerance: int = 0,
+    ) -> VisualComparison:
+        baseline_path = self._get_baseline_path(name)
+        regions = [list(region) for region in ignore_regions]
+        mask = build_ignore_mask(actual.shape, ignore_regions)
+        digest = get_pixels_digest(actual, mask)
+        meta = self._read_meta(name)
+        if meta is None:
+            self._write(name, actual, digest, regions)
+            return VisualComparison(name, baseline_path, created=True)
+        # Exact digest of the not ignored pixels; only images which differ
+        # are compared pixel by pixel.
+        if meta.get("digest") == digest and meta.get("ignore_regions") == regions:
+            return VisualComparison(name, baseline_path, identical=True)
+        # Memory-mapped, so only the compared baseline is read from disk.
+        baseline = numpy.load(baseline_path, mmap_mode="r")
+        if baseline.shape != actual.shape:
+            comparison = VisualComparison(name, baseline_path, shape_mismatch=True)
+        else:
+            comparison = VisualComparison(
+                name,
+                baseline_path,
+                diff_ratio=get_diff_ratio(actual, baseline, mask, pixel_tolerance),
+            )
+        del baseline
+        if self.update and (comparison.shape_mismatch or comparison.diff_ratio):
+            self._write(name, actual, digest, regions)
+            return VisualComparison(name, baseline_path, updated=True)
+        return comparison
+
+    def _get_baseline_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{to_safe_filename(name)}.npy")
+
+    def _get_meta_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{to_safe_filename(name)}.json")
+
+    def _read_meta(self, name: str) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self._get_baseline_path(name)):
+            return None
+        try:
+            with open(self._get_meta_path(name), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(
+        self, name: str, pixels: Any, digest: str, regions: List[List[int]]
+    ) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._get_baseline_path(name)
+        logger.info("Writing visual baseline", path=path)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            numpy.save(f, pixels)
+        os.replace(tmp_path, path)
+        meta_path = self._get_meta_path(name)
+        tmp_meta_path = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp_meta_path, "w", encoding="utf-8") as f:
+            json.dump({"digest": digest, "ignore_regions": regions}, f)
+        os.replace(tmp_meta_path, meta_path)
@@ -0,0 +1,419 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from selenium.common.exceptions import (  # type: ignore
+    InvalidArgumentException,
+    InvalidSessionIdException,
+    JavascriptException,
+    NoSuchElementException,
+    SessionNotCreatedException,
+    TimeoutException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By  # type: ignore
+
+from pytest_sosu.exceptions import WebDriverTestFailed, WebDriverTestInterrupted
+from pytest_sosu.live_sessions import live_session_registry
+from pytest_sosu.logging import get_struct_logger
+from pytest_sosu.metrics import (
+    JOB_RESULTS_TOTAL,
+    SESSION_CREATE_SECONDS,
+    SESSION_QUIT_SECONDS,
+    SESSIONS_OPENED_TOTAL,
+    metrics_registry,
+    track_session_failures,
+)
+from pytest_sosu.webdriver.capabilities import Capabilities
+from pytest_sosu.webdriver.commands import CommandStats
+from pytest_sosu.webdriver.errors import (
+    mark_remote_session_error,
+    warn_on_infrastructure_error,
+)
+from pytest_sosu.webdriver.url import WebDriverUrlData
+
+logger = get_struct_logger(__name__)
+
+# Optional dependency, needed only by the `sosu_async_webdriver` fixture.
+try:
+    import aiohttp  # type: ignore
+except ImportError:
+    aiohttp = None  # type: ignore
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+DEFAULT_HTTP_TIMEOUT = 120.0
+
+W3C_ERROR_EXCEPTION_CLASSES = {
+    "invalid argument": InvalidArgumentException,
+    "invalid session id": InvalidSessionIdException,
+    "javascript error": JavascriptException,
+    "no such element": NoSuchElementException,
+    "script timeout": TimeoutException,
+    "session not created": SessionNotCreatedException,
+    "timeout": TimeoutException,
+}
+
+
+def check_async_dependencies() -> None:
+    if aiohttp is None:
+        raise ImportError(
+            "sosu_async_webdriver requires aiohttp,"
+            " install it with: pip install pytest-sosu[async]"
+        )
+
+
+class AsyncHttpClient:
+    # Keeps idle keep-alive connections around, so concurrent commands do not
+    # wait for each other. Proxies are taken from HTTP(S)_PROXY environment
+    # variables, same as done by Selenium.
+
+    def __init__(
+        self, url_data: WebDriverUrlData, timeout: float = DEFAULT_HTTP_TIMEOUT
+    ) -> None:
+        check_async_dependencies()
+        self._base_url = url_data.with_credentials(None, None).to_url()
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._auth = None
+        if url_data.has_credentials:
+            self._auth = aiohttp.BasicAuth(url_data.username, url_data.access_key)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def request(
+        self, method: str, path: str, payload: Optional[Dict[str, Any]] = None
+    ) -> Tuple[int, Any]:
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        try:
+            try:
+                return await self._request(method, path, body)
+            except aiohttp.ServerDisconnectedError:
+                # Idle keep-alive connection closed by the remote end, the
+                # request did not get anywhere, so it is retried once.
+                logger.debug("Retrying on a new connection", method=method, path=path)
+                return await self._request(method, path, body)
+        except aiohttp.ClientConnectionError as exc:
+            # Same exceptions as raised by Selenium, recognized as
+            # infrastructure errors.
+            raise mark_remote_session_error(ConnectionError(str(exc))) from exc
+        except asyncio.TimeoutError as exc:
+            raise mark_remote_session_error(
+                TimeoutError(f"{method} {path} timed out")
+            ) from exc
+
+    async def close(self) -> None:
+        session, self._session = self._session, None
+        if session is not None:
+            await session.close()
+
+    async def _request(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        async with self._get_session().request(
+            method, f"{self._base_url}{path}", data=body
+        ) as response:
+            response_body = await response.read()
+            return response.status, json.loads(response_body) if response_body else None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily, as it has to be bound to the running event loop.
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                auth=self._auth,
+                timeout=self._timeout,
+                headers={
+                    "Accept": "application/json",
+                    "Content-Type": "application/json;charset=UTF-8",
+                },
+                trust_env=True,
+            )
+        return self._session
+
+
+class AsyncWebElement:
+    def __init__(self, driver: AsyncWebDriver, element_id: str) -> None:
+        self._driver = driver
+        self.id = element_id
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.id!r})"
+
+    async def find_element(self, by: str = By.ID, value: str = "") -> AsyncWebElement:
+        return await self._find("/element", by, value)
+
+    async def find_elements(
+        self, by: str = By.ID, value: str = ""
+    ) -> List[AsyncWebElement]:
+        return await self._find("/elements", by, value)
+
+    async def click(self) -> None:
+        await self._execute("POST", "/click", {})
+
+    async def clear(self) -> None:
+        await self._execute("POST", "/clear", {})
+
+    async def send_keys(self, text: str) -> None:
+        await self._execute("POST", "/value", {"text": text})
+
+    @property
+    async def text(self) -> str:
+        return await self._execute("GET", "/text")
+
+    async def get_attribute(self, name: str) -> Optional[str]:
+        return await self._execute("GET", f"/attribute/{quote(name)}")
+
+    async def get_property(self, name: str) -> Any:
+        return await self._execute("GET", f"/property/{quote(name)}")
+
+    async def _find(self, path: str, by: str, value: str) -> Any:
+        return self._driver.unwrap_value(
+            await self._execute("POST", path, _locate(by, value))
+        )
+
+    async def _execute(
+        self, method: str, path: str, payload: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        return await self._driver.execute(method, f"/element/{self.id}{path}", payload)
+
+
+class AsyncWebDriver:
+    def __init__(
+        self,
+        client: AsyncHttpClient,
+        session_id: str,
+        capabilities: Dict[str, Any],
+        command_stats: Optional[CommandStats] = None,
+    ) -> None:
+        self._client = client
+        self.session_id = session_id
+        self.capabilities = capabilities
+        self._command_stats = command_stats
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(session_id={self.session_id!r})"
+
+    async def execute(
+        self, method: str, path: str, payload: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        start_time = time.perf_counter()
+        try:
+            return await _execute(
+                self._client, method, f"/session/{self.session_id}{path}", payload
+            )
+        finally:
+            if self._command_stats is not None:
+                self._command_stats.record(
+                    f"{method} {path}", time.perf_counter() - start_time
+                )
+
+    async def get(self, url: str) -> None:
+        await self.execute("POST", "/url", {"url": url})
+
+    @property
+    async def current_url(self) -> str:
+        return await self.execute("GET", "/url")
+
+    @property
+    async def title(self) -> str:
+        return await self.execute("GET", "/title")
+
+    @property
+    async def page_source(self) -> str:
+        return await self.execute("GET", "/source")
+
+    async def get_screenshot_as_base64(self) -> str:
+        return await self.execute("GET", "/screenshot")
+
+    async def execute_script(self, script: str, *args: Any) -> Any:
+        payload = {"script": script, "args": [_wrap_value(arg) for arg in args]}
+        return self.unwrap_value(await self.execute("POST", "/execute/sync", payload))
+
+    async def execute_async_script(self, script: str, *args: Any) -> Any:
+        payload = {"script": script, "args": [_wrap_value(arg) for arg in args]}
+        return self.unwrap_value(await self.execute("POST", "/execute/async", payload))
+
+    async def set_timeouts(self, timeout: float) -> None:
+        timeout_ms = int(timeout * 1000)
+        await self.execute(
+            "POST",
+            "/timeouts",
+            {"implicit": timeout_ms, "pageLoad": timeout_ms, "script": timeout_ms},
+        )
+
+    async def find_element(self, by: str = By.ID, value: str = "") -> AsyncWebElement:
+        return self.unwrap_value(
+            await self.execute("POST", "/element", _locate(by, value))
+        )
+
+    async def find_elements(
+        self, by: str = By.ID, value: str = ""
+    ) -> List[AsyncWebElement]:
+        return self.unwrap_value(
+            await self.execute("POST", "/elements", _locate(by, value))
+        )
+
+    async def quit(self) -> None:
+        try:
+            await _execute(self._client, "DELETE", f"/session/{self.session_id}")
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    def unwrap_value(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return [self.unwrap_value(v) for v in value]
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return AsyncWebElement(self, value[ELEMENT_KEY])
+            return {k: self.unwrap_value(v) for k, v in value.items()}
+        return value
+
+
+def _wrap_value(value: Any) -> Any:
+    if isinstance(value, AsyncWebElement):
+        return {ELEMENT_KEY: value.id}
+    if isinstance(value, (list, tuple)):
+        return [_wrap_value(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _wrap_value(v) for k, v in value.items()}
+    return value
+
+
+def _locate(by: str, value: str) -> Dict[str, str]:
+    # Same translation of non-W3C locators as done by Selenium.
+    if by == By.ID:
+        by, value = By.CSS_SELECTOR, f'[id="{value}"]'
+    elif by == By.CLASS_NAME:
+        by, value = By.CSS_SELECTOR, f".{value}"
+    elif by == By.NAME:
+        by, value = By.CSS_SELECTOR, f'[name="{value}"]'
+    return {"using": by, "value": value}
+
+
+async def _execute(
+    client: AsyncHttpClient,
+    method: str,
+    path: str,
+    payload: Optional[Dict[str, Any]] = None,
+) -> Any:
+    status, data = await client.request(method, path, payload)
+    value = data.get("value") if isinstance(data, dict) else None
+    if status >= 400 or (isinstance(value, dict) and "error" in value):
+        error = value.get("error", "") if isinstance(value, dict) else ""
+        message = value.get("message") if isinstance(value, dict) else None
+        exc_class = W3C_ERROR_EXCEPTION_CLASSES.get(error, WebDriverException)
+        raise exc_class(message or f"{error or 'HTTP error'} ({status})")
+    return value
+
+
+async def create_async_remote_webdriver(
+    wd_url_data: WebDriverUrlData,
+    capabilities: Capabilities,
+    setup_timeouts: bool = True,
+    command_stats: Optional[CommandStats] = None,
+) -> AsyncWebDriver:
+    caps = capabilities.to_dict()
+    logger.debug("Dumping caps data", caps=caps)
+    logger.debug("Using webdriver URL", wd_url=wd_url_data.to_safe_url())
+    client = AsyncHttpClient(wd_url_data)
+    try:
+        value = await _execute(
+            client, "POST", "/session", {"capabilities": {"alwaysMatch": caps}}
+        )
+    except BaseException:
+        await client.close()
+        raise
+    driver = AsyncWebDriver(
+        client,
+        value["sessionId"],
+        value.get("capabilities", {}),
+        command_stats=command_stats,
+    )
+    if setup_timeouts:
+        timeout = capabilities.sauce_options.command_timeout
+        if timeout is not None:
+            await driver.set_timeouts(timeout)
+    return driver
+
+
+# pylint: disable=too-many-arguments
+@contextlib.asynccontextmanager
+async def async_remote_webdriver_ctx(
+    url_data: WebDriverUrlData,
+    capabilities: Capabilities,
+    quit_on_finish: bool = True,
+    mark_result_on_finish: bool = True,
+    setup_timeouts: bool = True,
+    command_stats: Optional[CommandStats] = None,
+):
+    wd_safe_url = url_data.to_safe_url()
+    slug = capabilities.slug
+    logger.debug("Driver starting", capabilities=capabilities, wd_url=wd_safe_url)
+    start_time = time.perf_counter()
+    with track_session_failures("create", slug):
+        driver = await create_async_remote_webdriver(
+            url_data,
+            capabilities,
+            setup_timeouts=setup_timeouts,
+            command_stats=command_stats,
+        )
+    metrics_registry.observe(
+        SESSION_CREATE_SECONDS, time.perf_counter() - start_time, slug=slug
+    )
+    metrics_registry.inc(SESSIONS_OPENED_TOTAL, slug=slug)
+    session_id = driver.session_id
+    if quit_on_finish:
+        live_session_registry.add(session_id, url_data)
+    logger.info("Session started", wd_url=wd_safe_url, session_id=session_id)
+    job_result: Optional[str] = "failed"
+    try:
+        yield driver
+        job_result = "passed"
+    except WebDriverTestFailed:
+        pass
+    except (WebDriverTestInterrupted, KeyboardInterrupt, asyncio.CancelledError):
+        job_result = None
+    finally:
+        metrics_registry.inc(
+            JOB_RESULTS_TOTAL, slug=slug, result=job_result or "interrupted"
+        )
+        try:
+            if quit_on_finish and not live_session_registry.claim(session_id):
+                logger.debug("Session already quitted", session_id=session_id)
+            else:
+                await _finish_session(
+                    driver, slug, job_result, mark_result_on_finish, quit_on_finish
+                )
+        finally:
+            # Also when the remote session is kept, the HTTP session is not.
+            await driver.close()
+
+
+async def _finish_session(
+    driver: AsyncWebDriver,
+    slug: str,
+    job_result: Optional[str],
+    mark_result_on_finish: bool,
+    quit_on_finish: bool,
+) -> None:
+    session_id = driver.session_id
+    try:
+        if mark_result_on_finish and job_result is not None:
+            logger.debug("Marking test", session_id=session_id, job_result=job_result)
+            with warn_on_infrastructure_error("mark", session_id):
+                with track_session_failures("mark", slug):
+                    await driver.execute_script(f"sauce:job-result={job_result}")
+    finally:
+        if quit_on_finish:
+            logger.debug("Driver quitting", driver=driver)
+            start_time = time.perf_counter()
+            with warn_on_infrastructure_error("quit", session_id):
+                with track_session_failures("quit", slug):
+                    await driver.quit()
+            metrics_registry.observe(
+                SESSION_QUIT_SECONDS, time.perf_counter() - start_time, slug=slug
+            )
+        logger.info("Session stopped", session_id=session_id)
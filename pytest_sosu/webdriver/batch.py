@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional, Tuple, Union
+
+from selenium.common.exceptions import NoSuchElementException  # type: ignore
+from selenium.webdriver.common.by import By  # type: ignore
+from selenium.webdriver.remote.webelement import WebElement  # type: ignore
+
+from pytest_sosu.logging import get_struct_logger
+
+logger = get_struct_logger(__name__)
+
+FIND_ALL_FUNCTION = """
+function findAll(by, value, root) {
+    if (by === "xpath") {
+        var snapshot = document.evaluate(
+            value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+        );
+        var nodes = [];
+        for (var i = 0; i < snapshot.snapshotLength; i++) {
+            nodes.push(snapshot.snapshotItem(i));
+        }
+        return nodes;
+    }
+    return Array.prototype.slice.call(root.querySelectorAll(value));
+}
+"""
+
+SET_VALUE_FUNCTION = """
+function setValue(element, value) {
+    // Setter of the prototype (e.g. HTMLInputElement), as React and other
+    // frameworks track values by overriding the property of the element,
+    // and ignore the input events of values assigned through it.
+    var proto = Object.getPrototypeOf(element);
+    var descriptor = null;
+    while (proto && !descriptor) {
+        descriptor = Object.getOwnPropertyDescriptor(proto, "value");
+        proto = Object.getPrototypeOf(proto);
+    }
+    if (descriptor && descriptor.set) {
+        descriptor.set.call(element, value);
+    } else {
+        element.value = value;
+    }
+    element.dispatchEvent(new Event("input", {"bubbles": true}));
+    element.dispatchEvent(new Event("change", {"bubbles": true}));
+}
+"""
+
+BATCH_SCRIPT = FIND_ALL_FUNCTION + SET_VALUE_FUNCTION + """
+var ops = arguments[0];
+var results = [];
+function resolve(value) {
+    if (value !== null && typeof value === "object" && "$ref" in value) {
+        return results[value.$ref];
+    }
+    return value;
+}
+for (var i = 0; i < ops.length; i++) {
+    var op = ops[i][0];
+    var args = ops[i].slice(1).map(resolve);
+    var result = null;
+    if (op === "find" || op === "find_all") {
+        var found = findAll(args[0], args[1], args[2] || document);
+        if (op === "find") {
+            if (!found.length) {
+                return {"error": {"index": i, "by": args[0], "value": args[1]}};
+            }
+            result = found[0];
+        } else {
+            result = found;
+        }
+    } else if (op === "text") {
+        result = args[0].innerText;
+    } else if (op === "attribute") {
+        result = args[0].getAttribute(args[1]);
+    } else if (op === "property") {
+        result = args[0][args[1]];
+    } else if (op === "click") {
+        args[0].click();
+    } else if (op === "clear" || op === "set_value") {
+        setValue(args[0], op === "clear" ? "" : args[1]);
+    }
+    results.push(result);
+}
+return {"results": results};
+"""
+
+IN_BROWSER_LOCATORS = {
+    By.CSS_SELECTOR: lambda value: ("css selector", value),
+    By.XPATH: lambda value: ("xpath", value),
+    By.ID: lambda value: ("css selector", f'[id="{value}"]'),
+    By.NAME: lambda value: ("css selector", f'[name="{value}"]'),
+    By.CLASS_NAME: lambda value: ("css selector", f".{value}"),
+    By.TAG_NAME: lambda value: ("css selector", value),
+}
+
+ElementRef = Union[WebElement, "BatchResult"]
+
+
+class BatchNotExecuted(Exception):
+    pass
+
+
+class BatchResult:
+    def __init__(self, batch: Batch, index: int) -> None:
+        self._batch = batch
+        self.index = index
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(index={self.index})"
+
+    @property
+    def value(self) -> Any:
+        return self._batch.get_result(self.index)
+
+
+class Batch:
+    def __init__(self, driver: Any, in_browser: bool = True) -> None:
+        self._driver = driver
+        self._in_browser = in_browser
+        self._ops: List[Tuple[Any, ...]] = []
+        self._results: Optional[List[Any]] = None
+
+    def __enter__(self) -> Batch:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.execute()
+
+    def find(
+        self, by: str, value: str, parent: Optional[ElementRef] = None
+    ) -> BatchResult:
+        return self._add("find", by, value, parent)
+
+    def find_all(
+        self, by: str, value: str, parent: Optional[ElementRef] = None
+    ) -> BatchResult:
+        return self._add("find_all", by, value, parent)
+
+    def text(self, element: ElementRef) -> BatchResult:
+        return self._add("text", element)
+
+    def get_attribute(self, element: ElementRef, name: str) -> BatchResult:
+        return self._add("attribute", element, name)
+
+    def get_property(self, element: ElementRef, name: str) -> BatchResult:
+        return self._add("property", element, name)
+
+    def click(self, element: ElementRef) -> BatchResult:
+        return self._add("click", element)
+
+    def clear(self, element: ElementRef) -> BatchResult:
+        return self._add("clear", element)
+
+    def set_value(self, element: ElementRef, value: str) -> BatchResult:
+        return self._add("set_value", element, value)
+
+    def get_result(self, index: int) -> Any:
+        if self._results is None:
+            raise BatchNotExecuted("batch was not executed yet")
+        return self._results[index]
+
+    def execute(self) -> List[Any]:
+        if self._results is not None:
+            return self._results
+        if self._in_browser and self._can_execute_in_browser():
+            self._results = self._execute_in_browser()
+        else:
+            logger.debug("Executing batch commands one by one", ops=self._ops)
+            self._results = self._execute_one_by_one()
+        return self._results
+
+    def _add(self, op: str, *args: Any) -> BatchResult:
+        if self._results is not None:
+            raise ValueError("batch was already executed")
+        self._ops.append((op, *args))
+        return BatchResult(self, len(self._ops) - 1)
+
+    def _can_execute_in_browser(self) -> bool:
+        return all(
+            op[1] in IN_BROWSER_LOCATORS
+            for op in self._ops
+            if op[0] in ("find", "find_all")
+        )
+
+    def _execute_in_browser(self) -> List[Any]:
+        script_ops = []
+        for op, *args in self._ops:
+            if op in ("find", "find_all"):
+                by, value, parent = args
+                args = [*IN_BROWSER_LOCATORS[by](value), parent]
+            script_ops.append([op, *(self._to_script_arg(arg) for arg in args)])
+        output = self._driver.execute_script(BATCH_SCRIPT, script_ops)
+        error = output.get("error")
+        if error is not None:
+            raise NoSuchElementException(
+                f"Unable to locate element: {error['by']}={error['value']!r}"
+                f" (batch operation #{error['index']})"
+            )
+        return output["results"]
+
+    def _execute_one_by_one(self) -> List[Any]:
+        results: List[Any] = []
+        for op, *args in self._ops:
+            args = [self._resolve(arg, results) for arg in args]
+            results.append(self._execute_op(op, args))
+        return results
+
+    def _execute_op(self, op: str, args: List[Any]) -> Any:
+        if op in ("find", "find_all"):
+            by, value, parent = args
+            root = self._driver if parent is None else parent
+            if op == "find":
+                return root.find_element(by, value)
+            return root.find_elements(by, value)
+        element = args[0]
+        if op == "text":
+            return element.text
+        if op == "attribute":
+            return element.get_attribute(args[1])
+        if op == "property":
+            return element.get_property(args[1])
+        if op == "click":
+            element.click()
+        elif op == "clear":
+            element.clear()
+        elif op == "set_value":
+            element.clear()
+            element.send_keys(args[1])
+        return None
+
+    @staticmethod
+    def _to_script_arg(arg: Any) -> Any:
+        if isinstance(arg, BatchResult):
+            return {"$ref": arg.index}
+        return arg
+
+    @staticmethod
+    def _resolve(arg: Any, results: List[Any]) -> Any:
+        if isinstance(arg, BatchResult):
+            return results[arg.index]
+        return arg
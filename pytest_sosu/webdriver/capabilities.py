@@ -207,6 +207,12 @@ class CapabilitiesMatrix:
     browsers: Optional[List[Browser]] = None
     platforms: Optional[List[Platform]] = None
     sauce_options_list: Optional[List[SauceOptions]] = None
+    # Fraction of the cells run per build, see `--sosu-rotation-build`.
+    rotation: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if self.rotation is not None and not 0 < self.rotation <= 1:
+            raise ValueError("rotation has to be a fraction in (0, 1]")
 
     def __structlog__(self) -> Dict[str, Any]:
         return self.to_dict()
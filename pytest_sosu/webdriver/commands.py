@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Tuple
+
+
+@dataclass
+class CommandTiming:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def avg(self) -> float:
+        if not self.count:
+            return 0.0
+        return self.total / self.count
+
+    def add(self, count: int, total: float, max_duration: float) -> None:
+        self.count += count
+        self.total += total
+        self.max = max(self.max, max_duration)
+
+
+class CommandStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._timings: Dict[str, CommandTiming] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._timings)
+
+    def record(self, command: str, duration: float) -> None:
+        with self._lock:
+            self._get_timing(command).add(1, duration, duration)
+
+    def get(self, command: str) -> CommandTiming:
+        return self._timings.get(command, CommandTiming())
+
+    def get_slowest(self, limit: int) -> List[Tuple[str, CommandTiming]]:
+        timings = sorted(
+            self._timings.items(),
+            key=lambda item: item[1].total,
+            reverse=True,
+        )
+        return timings[:limit]
+
+    def to_dict(self) -> Dict[str, List[Any]]:
+        with self._lock:
+            return {
+                command: [timing.count, timing.total, timing.max]
+                for command, timing in self._timings.items()
+            }
+
+    def merge_dict(self, data: Mapping[str, List[Any]]) -> None:
+        with self._lock:
+            for command, (count, total, max_duration) in data.items():
+                self._get_timing(command).add(count, total, max_duration)
+
+    def _get_timing(self, command: str) -> CommandTiming:
+        timing = self._timings.get(command)
+        if timing is None:
+            timing = CommandTiming()
+            self._timings[command] = timing
+        return timing
+
+
+class TimedCommandExecutor:
+    def __init__(self, command_executor: Any, command_stats: CommandStats) -> None:
+        self._command_executor = command_executor
+        self._command_stats = command_stats
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._command_executor, name)
+
+    def execute(self, command: str, params: Dict[str, Any]) -> Any:
+        start_time = time.perf_counter()
+        try:
+            return self._command_executor.execute(command, params)
+        finally:
+            self._command_stats.record(command, time.perf_counter() - start_time)
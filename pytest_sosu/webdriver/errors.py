@@ -0,0 +1,88 @@
+import contextlib
+import re
+import warnings
+from typing import Iterator, Optional, TypeVar
+
+from selenium.common.exceptions import (  # type: ignore
+    InvalidSessionIdException,
+    SessionNotCreatedException,
+    WebDriverException,
+)
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+
+from pytest_sosu.exceptions import SosuInfrastructureWarning
+from pytest_sosu.logging import get_struct_logger
+
+logger = get_struct_logger(__name__)
+
+INFRASTRUCTURE_EXCEPTION_CLASSES = (
+    InvalidSessionIdException,
+    SessionNotCreatedException,
+)
+
+# Raised by test code as well, so counted only when raised by a command of
+# the remote session, see `remote_session_errors`.
+TRANSPORT_EXCEPTION_CLASSES = (
+    Urllib3HTTPError,
+    ConnectionError,
+    TimeoutError,
+)
+REMOTE_SESSION_ERROR_ATTRIBUTE = "sosu_remote_session_error"
+
+ExceptionT = TypeVar("ExceptionT", bound=BaseException)
+
+INFRASTRUCTURE_ERROR_MESSAGE_RE = re.compile(
+    "|".join(
+        [
+            r"session .*(not found|does not exist|deleted|terminated)",
+            r"test has already finished",
+            r"did not see a new command",
+            r"internal server error",
+            r"bad gateway",
+            r"service unavailable",
+            r"gateway time-?out",
+        ]
+    ),
+    re.IGNORECASE,
+)
+
+
+def mark_remote_session_error(exc: ExceptionT) -> ExceptionT:
+    setattr(exc, REMOTE_SESSION_ERROR_ATTRIBUTE, True)
+    return exc
+
+
+@contextlib.contextmanager
+def remote_session_errors() -> Iterator[None]:
+    try:
+        yield
+    except Exception as exc:
+        mark_remote_session_error(exc)
+        raise
+
+
+def is_infrastructure_error(exc: BaseException) -> bool:
+    if isinstance(exc, INFRASTRUCTURE_EXCEPTION_CLASSES):
+        return True
+    if isinstance(exc, TRANSPORT_EXCEPTION_CLASSES):
+        return getattr(exc, REMOTE_SESSION_ERROR_ATTRIBUTE, False)
+    if isinstance(exc, WebDriverException):
+        return bool(INFRASTRUCTURE_ERROR_MESSAGE_RE.search(exc.msg or ""))
+    return False
+
+
+@contextlib.contextmanager
+def warn_on_infrastructure_error(stage: str, session_id: Optional[str]):
+    # The test result is already known at this point, so lost connections
+    # or sessions should not turn it into an error.
+    try:
+        yield
+    except Exception as exc:
+        if not is_infrastructure_error(exc):
+            raise
+        logger.warning(
+            "Infrastructure error ignored", stage=stage, session_id=session_id, exc=exc
+        )
+        warnings.warn(
+            SosuInfrastructureWarning(f"{stage} of session {session_id} failed: {exc}")
+        )
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import Any
+
+from pytest_sosu.webdriver.batch import Batch
+from pytest_sosu.webdriver.waits import (
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_WAIT_TIMEOUT,
+    WaitCondition,
+    wait_for,
+)
+
+
+class SosuDriverHelpers:
+    def __init__(self, driver: Any) -> None:
+        self._driver = driver
+
+    def batch(self, in_browser: bool = True) -> Batch:
+        return Batch(self._driver, in_browser=in_browser)
+
+    def wait_for(
+        self,
+        condition: WaitCondition,
+        timeout: float = DEFAULT_WAIT_TIMEOUT,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> Any:
+        return wait_for(
+            self._driver, condition, timeout=timeout, poll_interval=poll_interval
+        )
@@ -1,20 +1,61 @@
 from __future__ import annotations
 
 import contextlib
-from typing import Optional
+import time
+from typing import Any, Dict, Optional
 
 from selenium.webdriver import Remote as WebDriver  # type: ignore
 from selenium.webdriver.common.by import By  # noqa: F401 type: ignore
 from selenium.webdriver.common.options import ArgOptions  # type: ignore
 
+from pytest_sosu.artifacts import TestArtifacts
+from pytest_sosu.background import BackgroundExecutor
 from pytest_sosu.exceptions import WebDriverTestFailed, WebDriverTestInterrupted
+from pytest_sosu.live_sessions import live_session_registry
 from pytest_sosu.logging import get_struct_logger
+from pytest_sosu.metrics import (
+    JOB_RESULTS_TOTAL,
+    SESSION_CREATE_SECONDS,
+    SESSION_QUIT_SECONDS,
+    SESSIONS_OPENED_TOTAL,
+    metrics_registry,
+    track_session_failures,
+)
 from pytest_sosu.webdriver.capabilities import Capabilities
+from pytest_sosu.webdriver.commands import CommandStats, TimedCommandExecutor
+from pytest_sosu.webdriver.errors import (
+    remote_session_errors,
+    warn_on_infrastructure_error,
+)
+from pytest_sosu.webdriver.helpers import SosuDriverHelpers
 from pytest_sosu.webdriver.url import WebDriverUrlData
 
 logger = get_struct_logger(__name__)
 
+W3C_DEFAULT_SCRIPT_TIMEOUT = 30.0
 
+
+class SosuWebDriver(WebDriver):
+    # Known on the client side, so waits do not have to ask for it.
+    sosu_script_timeout: float = W3C_DEFAULT_SCRIPT_TIMEOUT
+
+    @property
+    def sosu(self) -> SosuDriverHelpers:
+        return SosuDriverHelpers(self)
+
+    def set_script_timeout(self, time_to_wait: float) -> None:
+        super().set_script_timeout(time_to_wait)
+        self.sosu_script_timeout = time_to_wait
+
+    def execute(
+        self, driver_command: str, params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        # Including the new session command, run by the constructor.
+        with remote_session_errors():
+            return super().execute(driver_command, params)
+
+
+# pylint: disable=too-many-arguments
 @contextlib.contextmanager
 def remote_webdriver_ctx(
     url_data: WebDriverUrlData,
@@ -22,15 +63,28 @@ def remote_webdriver_ctx(
     quit_on_finish: bool = True,
     mark_result_on_finish: bool = True,
     setup_timeouts: bool = True,
+    command_stats: Optional[CommandStats] = None,
+    failure_artifacts: Optional[TestArtifacts] = None,
+    finish_executor: Optional[BackgroundExecutor] = None,
 ):
     wd_safe_url = url_data.to_safe_url()
+    slug = capabilities.slug
     logger.debug("Driver starting", capabilities=capabilities, wd_url=wd_safe_url)
-    driver = create_remote_webdriver(
-        url_data,
-        capabilities,
-        setup_timeouts=setup_timeouts,
+    start_time = time.perf_counter()
+    with track_session_failures("create", slug):
+        driver = create_remote_webdriver(
+            url_data,
+            capabilities,
+            setup_timeouts=setup_timeouts,
+            command_stats=command_stats,
+        )
+    metrics_registry.observe(
+        SESSION_CREATE_SECONDS, time.perf_counter() - start_time, slug=slug
     )
+    metrics_registry.inc(SESSIONS_OPENED_TOTAL, slug=slug)
     session_id = driver.session_id
+    if quit_on_finish:
+        live_session_registry.add(session_id, url_data)
     logger.debug(
         "Driver started",
         capabilities=capabilities,
@@ -43,35 +97,77 @@ def remote_webdriver_ctx(
         yield driver
         job_result = "passed"
     except WebDriverTestFailed:
-        pass
+        if failure_artifacts is not None:
+            logger.debug("Capturing failure artifacts", session_id=session_id)
+            failure_artifacts.capture(driver)
     except (WebDriverTestInterrupted, KeyboardInterrupt):
         job_result = None
     finally:
-        if mark_result_on_finish:
-            if job_result is not None:
-                logger.debug(
-                    "Marking test",
-                    session_id=session_id,
-                    job_result=job_result,
-                )
-                driver.execute_script(f"sauce:job-result={job_result}")
-            else:
-                logger.debug(
-                    "Not marking test as it was interrupted",
-                    session_id=session_id,
-                )
-        if quit_on_finish:
-            logger.debug("Driver quitting", driver=driver)
-            driver.quit()
-            logger.debug("Driver quitted", driver=driver)
-        logger.info("Session stopped", session_id=session_id)
+        metrics_registry.inc(
+            JOB_RESULTS_TOTAL, slug=slug, result=job_result or "interrupted"
+        )
+        if finish_executor is not None and job_result is not None:
+            logger.debug("Finishing session in background", session_id=session_id)
+            finish_executor.submit(
+                _finish_session,
+                driver,
+                slug,
+                job_result,
+                mark_result_on_finish,
+                quit_on_finish,
+                task_name=f"session {session_id}",
+            )
+        else:
+            _finish_session(
+                driver, slug, job_result, mark_result_on_finish, quit_on_finish
+            )
+
+
+def _finish_session(
+    driver: SosuWebDriver,
+    slug: str,
+    job_result: Optional[str],
+    mark_result_on_finish: bool,
+    quit_on_finish: bool,
+) -> None:
+    session_id = driver.session_id
+    if quit_on_finish and not live_session_registry.claim(session_id):
+        logger.debug("Session already quitted", session_id=session_id)
+        return
+    if mark_result_on_finish:
+        if job_result is not None:
+            logger.debug(
+                "Marking test",
+                session_id=session_id,
+                job_result=job_result,
+            )
+            with warn_on_infrastructure_error("mark", session_id):
+                with track_session_failures("mark", slug):
+                    driver.execute_script(f"sauce:job-result={job_result}")
+        else:
+            logger.debug(
+                "Not marking test as it was interrupted",
+                session_id=session_id,
+            )
+    if quit_on_finish:
+        logger.debug("Driver quitting", driver=driver)
+        start_time = time.perf_counter()
+        with warn_on_infrastructure_error("quit", session_id):
+            with track_session_failures("quit", slug):
+                driver.quit()
+        metrics_registry.observe(
+            SESSION_QUIT_SECONDS, time.perf_counter() - start_time, slug=slug
+        )
+        logger.debug("Driver quitted", driver=driver)
+    logger.info("Session stopped", session_id=session_id)
 
 
 def create_remote_webdriver(
     wd_url_data: WebDriverUrlData,
     capabilities: Capabilities,
     setup_timeouts: bool = True,
-) -> WebDriver:
+    command_stats: Optional[CommandStats] = None,
+) -> SosuWebDriver:
     wd_url = wd_url_data.to_url()
     caps = capabilities.to_dict()
     logger.debug("Dumping caps data", caps=caps)
@@ -79,10 +175,15 @@ def create_remote_webdriver(
     logger.debug("Using webdriver URL", wd_url=wd_safe_url)
     options = ArgOptions()
     options._caps.update(caps)  # pylint: disable=protected-access
-    driver = WebDriver(
+    driver = SosuWebDriver(
         command_executor=wd_url,
         options=options,
     )
+    if command_stats is not None:
+        driver.command_executor = TimedCommandExecutor(  # type: ignore
+            driver.command_executor,
+            command_stats,
+        )
     if setup_timeouts:
         timeout = capabilities.sauce_options.command_timeout
         if timeout is not None:
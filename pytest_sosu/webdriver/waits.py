@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Tuple
+
+from selenium.common.exceptions import (  # type: ignore
+    JavascriptException,
+    TimeoutException,
+)
+from selenium.webdriver.support import expected_conditions  # type: ignore
+from selenium.webdriver.support.wait import WebDriverWait  # type: ignore
+
+from pytest_sosu.logging import get_struct_logger
+from pytest_sosu.webdriver.batch import FIND_ALL_FUNCTION, IN_BROWSER_LOCATORS
+
+logger = get_struct_logger(__name__)
+
+DEFAULT_WAIT_TIMEOUT = 10.0
+# Fallback re-check interval for changes not visible to MutationObserver
+# (e.g. network activity or CSS transitions).
+DEFAULT_POLL_INTERVAL = 0.1
+DEFAULT_NETWORK_IDLE_TIME = 0.5
+# Headroom over the wait timeout, so the browser reports the timeout
+# instead of the session failing with ScriptTimeoutException.
+SCRIPT_TIMEOUT_MARGIN = 5.0
+
+WAIT_SCRIPT = FIND_ALL_FUNCTION + """
+var condition = arguments[0];
+var timeoutMs = arguments[1];
+var pollMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var network = window.__sosuNetwork;
+if (!network) {
+    network = window.__sosuNetwork = {"pending": 0, "lastActivity": performance.now()};
+    var requestStarted = function () {
+        network.pending++;
+        network.lastActivity = performance.now();
+    };
+    var requestFinished = function () {
+        network.pending = Math.max(network.pending - 1, 0);
+        network.lastActivity = performance.now();
+    };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            requestStarted();
+            return originalFetch.apply(this, arguments).then(
+                function (response) { requestFinished(); return response; },
+                function (error) { requestFinished(); throw error; }
+            );
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        requestStarted();
+        this.addEventListener("loadend", requestFinished);
+        return originalSend.apply(this, arguments);
+    };
+}
+function isVisible(element) {
+    if (!element.getClientRects().length) {
+        return false;
+    }
+    var style = window.getComputedStyle(element);
+    return style.visibility !== "hidden" && style.opacity !== "0";
+}
+function getLastNetworkActivity() {
+    var last = network.lastActivity;
+    var entries = performance.getEntriesByType("resource");
+    for (var i = 0; i < entries.length; i++) {
+        last = Math.max(last, entries[i].responseEnd);
+    }
+    return last;
+}
+function check() {
+    var name = condition[0];
+    if (name === "visible") {
+        var elements = findAll(condition[1], condition[2], document);
+        for (var i = 0; i < elements.length; i++) {
+            if (isVisible(elements[i])) {
+                return {"value": elements[i]};
+            }
+        }
+    } else if (name === "text_present") {
+        var elements = findAll(condition[1], condition[2], document);
+        for (var i = 0; i < elements.length; i++) {
+            var text = elements[i].innerText || elements[i].textContent || "";
+            if (text.indexOf(condition[3]) !== -1) {
+                return {"value": true};
+            }
+        }
+    } else if (name === "network_idle") {
+        if (document.readyState === "complete" && network.pending === 0
+                && performance.now() - getLastNetworkActivity() >= condition[1]) {
+            return {"value": true};
+        }
+    } else if (name === "script") {
+        var value = new Function(condition[1]).apply(null, condition.slice(2));
+        if (value) {
+            return {"value": value};
+        }
+    }
+    return null;
+}
+var finished = false;
+var scheduled = false;
+var observer = null;
+var interval = null;
+var timer = null;
+function finish(result) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    if (observer !== null) {
+        observer.disconnect();
+    }
+    clearInterval(interval);
+    clearTimeout(timer);
+    done(result);
+}
+function run() {
+    scheduled = false;
+    if (finished) {
+        return;
+    }
+    try {
+        var result = check();
+        if (result !== null) {
+            finish(result);
+        }
+    } catch (error) {
+        finish({"error": String(error)});
+    }
+}
+function schedule() {
+    if (!scheduled) {
+        scheduled = true;
+        requestAnimationFrame(run);
+    }
+}
+run();
+if (!finished) {
+    observer = new MutationObserver(schedule);
+    observer.observe(document.documentElement, {
+        "attributes": true, "characterData": true, "childList": true, "subtree": true
+    });
+    interval = setInterval(run, pollMs);
+    timer = setTimeout(function () { finish({"timeout": true}); }, timeoutMs);
+}
+"""
+
+
+@dataclass(frozen=True)
+class WaitCondition:
+    name: str
+    args: Tuple[Any, ...] = ()
+    # Client-side equivalent, used when the condition cannot run in browser.
+    fallback: Optional[Callable[[Any], Any]] = None
+
+    @property
+    def in_browser(self) -> bool:
+        if self.name in ("visible", "text_present"):
+            return self.args[0] in IN_BROWSER_LOCATORS
+        return True
+
+    def to_script_arg(self) -> Tuple[Any, ...]:
+        if self.name in ("visible", "text_present"):
+            by, value, *rest = self.args
+            return (self.name, *IN_BROWSER_LOCATORS[by](value), *rest)
+        return (self.name, *self.args)
+
+
+def element_visible(by: str, value: str) -> WaitCondition:
+    return WaitCondition(
+        "visible",
+        (by, value),
+        fallback=expected_conditions.visibility_of_element_located((by, value)),
+    )
+
+
+def text_present(by: str, value: str, text: str) -> WaitCondition:
+    return WaitCondition(
+        "text_present",
+        (by, value, text),
+        fallback=expected_conditions.text_to_be_present_in_element((by, value), text),
+    )
+
+
+def network_idle(idle_time: float = DEFAULT_NETWORK_IDLE_TIME) -> WaitCondition:
+    # Requests are tracked by hooks on fetch and XMLHttpRequest installed
+    # by the first in-browser wait of the page, requests started before it
+    # are only seen once finished (through the resource timing entries).
+    return WaitCondition("network_idle", (int(idle_time * 1000),))
+
+
+def script_condition(script: str, *args: Any) -> WaitCondition:
+    return WaitCondition("script", (script, *args))
+
+
+def _ensure_script_timeout(driver: Any, timeout: float) -> None:
+    # Script timeout of the session is set to the command timeout, longer
+    # waits raise it. It is kept raised, so following waits cost no extra
+    # round-trip. Unknown for drivers other than `SosuWebDriver`.
+    script_timeout = getattr(driver, "sosu_script_timeout", None)
+    if script_timeout is None or script_timeout >= timeout:
+        return
+    logger.debug(
+        "Raising script timeout", script_timeout=script_timeout, timeout=timeout
+    )
+    driver.set_script_timeout(timeout)
+
+
+def wait_for(
+    driver: Any,
+    condition: WaitCondition,
+    timeout: float = DEFAULT_WAIT_TIMEOUT,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+) -> Any:
+    if not condition.in_browser:
+        if condition.fallback is None:
+            raise ValueError(f"condition {condition.name!r} requires a browser")
+        logger.debug("Waiting on the client side", condition=condition)
+        return WebDriverWait(driver, timeout, poll_frequency=poll_interval).until(
+            condition.fallback
+        )
+    _ensure_script_timeout(driver, timeout + SCRIPT_TIMEOUT_MARGIN)
+    output = driver.execute_async_script(
+        WAIT_SCRIPT,
+        list(condition.to_script_arg()),
+        int(timeout * 1000),
+        int(poll_interval * 1000),
+    )
+    if output.get("error") is not None:
+        raise JavascriptException(output["error"])
+    if output.get("timeout"):
+        raise TimeoutException(
+            f"Condition {condition.name} {condition.args!r} not met"
+            f" within {timeout}s"
+        )
+    return output["value"]
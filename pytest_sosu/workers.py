@@ -0,0 +1,29 @@
+from _pytest.config import Config
+
+CONTROLLER_WORKER_ID = "master"
+
+
+def is_xdist_worker(config: Config) -> bool:
+    return hasattr(config, "workerinput")
+
+
+def get_worker_id(config: Config) -> str:
+    if is_xdist_worker(config):
+        return getattr(config, "workerinput")["workerid"]
+    return CONTROLLER_WORKER_ID
+
+
+def set_worker_output(config: Config, key: str, value) -> None:
+    getattr(config, "workeroutput")[key] = value
+
+
+def get_worker_output(node, key: str, default=None):
+    return getattr(node, "workeroutput", {}).get(key, default)
+
+
+def get_worker_input(config: Config, key: str):
+    return getattr(config, "workerinput")[key]
+
+
+def set_worker_input(node, key: str, value) -> None:
+    node.workerinput[key] = value
@@ -0,0 +1,39 @@
+import base64
+
+from pytest_sosu.artifacts import ArtifactCollector, write_base64_file
+
+PNG_DATA = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 1000
+
+
+class FakeDriver:
+    page_source = "<html></html>"
+
+    def get_screenshot_as_base64(self):
+        return base64.b64encode(PNG_DATA).decode("ascii")
+
+    def get_log(self, log_type):
+        raise RuntimeError("unsupported")
+
+
+def test_write_base64_file(tmp_path):
+    path = tmp_path / "screenshot.png"
+
+    write_base64_file(str(path), base64.b64encode(PNG_DATA).decode("ascii"))
+
+    assert path.read_bytes() == PNG_DATA
+
+
+def test_capture(tmp_path):
+    collector = ArtifactCollector(str(tmp_path), max_workers=2)
+    artifacts = collector.for_test("tests/test_foo.py::test_bar[chrome-97]")
+
+    artifacts.capture(FakeDriver())
+    collector.shutdown()
+
+    test_dir = tmp_path / "tests_test_foo.py_test_bar_chrome-97_"
+    assert artifacts.paths == [
+        str(test_dir / "screenshot.png"),
+        str(test_dir / "page_source.html"),
+    ]
+    assert (test_dir / "screenshot.png").read_bytes() == PNG_DATA
+    assert (test_dir / "page_source.html").read_text() == "<html></html>"
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import pytest
+
+from pytest_sosu.auth_state import (
+    AuthState,
+    AuthStateCache,
+    FileAuthStateStore,
+    MemoryAuthStateStore,
+)
+
+# Values with characters changed by URI encoding, e.g. base64 padding.
+SESSION_COOKIE = {"name": "session", "value": "czNjcjN0==", "httpOnly": True}
+THEME_COOKIE = {"name": "theme", "value": "dark:v=2/a", "httpOnly": False}
+
+
+class FakeDriver:
+    def __init__(self, valid_session="czNjcjN0=="):
+        self.valid_session = valid_session
+        self.cookies = {}
+        self.current_url = "about:blank"
+        self.scripts = []
+        self.added_cookies = []
+        self.visited_urls = []
+
+    def get(self, url):
+        self.visited_urls.append(url)
+        logged_in = self.cookies.get("session") == self.valid_session
+        self.current_url = url if logged_in else "https://example.com/login"
+
+    def execute_script(self, script, *args):
+        self.scripts.append(args)
+        if "dump(storage)" in script:
+            return {
+                "origin": "https://example.com",
+                "localStorage": {"token": "abc"},
+                "sessionStorage": {},
+            }
+        if args:
+            state = args[0]
+            if state["origin"] != "https://example.com":
+                return False
+            for cookie in state["cookies"]:
+                self.cookies[cookie["name"]] = cookie["value"]
+            if state["reload"]:
+                self.get(state["url"])
+            return True
+        return None
+
+    def add_cookie(self, cookie):
+        self.added_cookies.append(cookie)
+        self.cookies[cookie["name"]] = cookie["value"]
+
+    def get_cookies(self):
+        return [SESSION_COOKIE, THEME_COOKIE]
+
+    def delete_all_cookies(self):
+        self.cookies.clear()
+
+
+def login(driver):
+    driver.cookies["session"] = "czNjcjN0=="
+    driver.current_url = "https://example.com/dashboard"
+
+
+@pytest.fixture(params=["memory", "file"])
+def store(request, tmp_path):
+    if request.param == "file":
+        return FileAuthStateStore(str(tmp_path))
+    return MemoryAuthStateStore()
+
+
+def test_login_once_then_restore(store):
+    first_driver = FakeDriver()
+    assert not AuthStateCache(store, first_driver, "chrome").login("alice", login)
+
+    second_driver = FakeDriver()
+    assert AuthStateCache(store, second_driver, "chrome").login("alice", login)
+    assert second_driver.current_url == "https://example.com/dashboard"
+    assert second_driver.cookies == {"session": "czNjcjN0==", "theme": "dark:v=2/a"}
+    # Only the HttpOnly cookie is set by WebDriver, followed by a navigation.
+    assert second_driver.added_cookies == [SESSION_COOKIE]
+    assert len(second_driver.visited_urls) == 2
+    restore_args = second_driver.scripts[0][0]
+    assert restore_args["localStorage"] == {"token": "abc"}
+    assert restore_args["cookies"] == [THEME_COOKIE]
+    assert not restore_args["reload"]
+
+
+def test_restore_without_http_only_cookies(store):
+    store.set(
+        ("alice", "chrome"),
+        AuthState(
+            url="https://example.com/dashboard",
+            origin="https://example.com",
+            cookies=[dict(SESSION_COOKIE, httpOnly=False), THEME_COOKIE],
+        ),
+    )
+    driver = FakeDriver()
+
+    assert AuthStateCache(store, driver, "chrome").login("alice", login)
+    assert driver.cookies == {"session": "czNjcjN0==", "theme": "dark:v=2/a"}
+    assert not driver.added_cookies
+    # Reloaded by the restore script.
+    assert driver.visited_urls == ["https://example.com/dashboard"] * 2
+    assert driver.scripts[0][0]["reload"]
+
+
+def test_concurrent_workers_log_in_once(tmp_path):
+    logins = []
+
+    def slow_login(driver):
+        logins.append(driver)
+        time.sleep(0.2)
+        login(driver)
+
+    def run():
+        # Separate store instances, as in separate xdist workers.
+        store = FileAuthStateStore(str(tmp_path))
+        AuthStateCache(store, FakeDriver(), "chrome").login("alice", slow_login)
+
+    threads = [threading.Thread(target=run) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(logins) == 1
+
+
+def test_rejected_state_is_replaced(store):
+    store.set(
+        ("alice", "chrome"),
+        AuthState(
+            url="https://example.com/dashboard",
+            origin="https://example.com",
+            cookies=[dict(SESSION_COOKIE, value="expired")],
+        ),
+    )
+    driver = FakeDriver()
+    logins = []
+
+    restored = AuthStateCache(store, driver, "chrome").login(
+        "alice", lambda d: (logins.append(d), login(d))
+    )
+
+    assert not restored
+    assert logins == [driver]
+    assert store.get(("alice", "chrome")).cookies[0]["value"] == "czNjcjN0=="
+    assert store.get(("alice", "firefox")) is None
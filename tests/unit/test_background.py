@@ -0,0 +1,80 @@
+import threading
+
+from pytest_sosu.background import BackgroundExecutor, BackgroundSessionFinisher
+
+
+def test_shutdown_waits_for_submitted_tasks():
+    executor = BackgroundExecutor(max_workers=2)
+    started = threading.Barrier(2, timeout=5)
+    results = []
+
+    def task(value):
+        started.wait()
+        results.append(value)
+
+    executor.submit(task, 1)
+    executor.submit(task, 2)
+    executor.shutdown()
+
+    assert sorted(results) == [1, 2]
+
+
+def test_drain_ignores_failed_tasks():
+    executor = BackgroundExecutor(max_workers=1)
+    results = []
+
+    def failing_task():
+        raise RuntimeError("quit failed")
+
+    executor.submit(failing_task, task_name="session s1")
+    executor.submit(results.append, 1)
+    executor.drain()
+
+    assert results == [1]
+    assert executor.failures == [("session s1", "RuntimeError: quit failed")]
+    executor.shutdown()
+
+
+def test_submit_blocks_while_max_pending_tasks():
+    executor = BackgroundExecutor(max_workers=1, max_pending=2)
+    release = threading.Event()
+    submitted = []
+
+    def submit_all():
+        for i in range(3):
+            executor.submit(release.wait, 5)
+            submitted.append(i)
+
+    thread = threading.Thread(target=submit_all)
+    thread.start()
+    thread.join(0.3)
+
+    assert submitted == [0, 1]
+    release.set()
+    thread.join(5)
+    assert submitted == [0, 1, 2]
+    executor.shutdown()
+
+
+def test_session_finisher_reports_failures():
+    finisher = BackgroundSessionFinisher(max_workers=1)
+    lines = []
+
+    class TerminalReporter:
+        def write_sep(self, sep, title):
+            lines.append(title)
+
+        def write_line(self, line):
+            lines.append(line)
+
+    def failing_quit():
+        raise RuntimeError("quit failed")
+
+    finisher.submit(failing_quit, task_name="session s1")
+    finisher.shutdown()
+    finisher.pytest_terminal_summary(TerminalReporter())
+
+    assert lines == [
+        "sosu background session finish failures",
+        "session s1: RuntimeError: quit failed",
+    ]
@@ -0,0 +1,25 @@
+from pytest_sosu.history import TestHistory
+
+
+def test_prune_drops_old_entries():
+    history = TestHistory(
+        {
+            "recent": {"duration": 1.0, "seen_at": 1000.0},
+            "old": {"duration": 1.0, "seen_at": 10.0},
+            "legacy": {"duration": 1.0},
+        }
+    )
+
+    history.prune(max_age=100, now=1050.0)
+
+    assert list(history.get_durations()) == ["recent"]
+
+
+def test_prune_keeps_most_recent_entries():
+    history = TestHistory()
+    for i in range(5):
+        history.touch(f"test_{i}", now=float(i))
+
+    history.prune(max_entries=2, now=5.0)
+
+    assert sorted(history.to_dict()) == ["test_3", "test_4"]
@@ -0,0 +1,132 @@
+import http.server
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from pytest_sosu.live_sessions import (
+    LiveSessionRegistry,
+    SessionStore,
+    reap_orphaned_sessions,
+)
+from pytest_sosu.webdriver import WebDriverUrlData
+
+
+@pytest.fixture
+def hub():
+    requests = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        delay = 0.0
+
+        def do_DELETE(self):  # pylint: disable=invalid-name
+            time.sleep(self.delay)
+            requests.append((self.path, self.headers.get("Authorization")))
+            body = b'{"value": null}'
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.requests = requests
+    server.handler_class = Handler
+    server.url_data = WebDriverUrlData(
+        host="127.0.0.1",
+        port=server.server_address[1],
+        scheme="http",
+        username="user",
+        access_key="key",
+    )
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_quit_all_deletes_sessions_concurrently(hub):
+    hub.handler_class.delay = 0.3
+    registry = LiveSessionRegistry()
+    for session_id in ["s1", "s2", "s3"]:
+        registry.add(session_id, hub.url_data)
+
+    start_time = time.monotonic()
+    quitted = registry.quit_all(timeout=5)
+
+    assert time.monotonic() - start_time < 0.9
+    assert sorted(quitted) == ["s1", "s2", "s3"]
+    assert sorted(path for path, _ in hub.requests) == [
+        "/wd/hub/session/s1",
+        "/wd/hub/session/s2",
+        "/wd/hub/session/s3",
+    ]
+    assert all(auth == "Basic dXNlcjprZXk=" for _, auth in hub.requests)
+    assert len(registry) == 0
+
+
+def test_quit_all_returns_after_deadline(hub):
+    hub.handler_class.delay = 2
+    registry = LiveSessionRegistry()
+    registry.add("s1", hub.url_data)
+
+    start_time = time.monotonic()
+    quitted = registry.quit_all(timeout=0.2)
+
+    assert time.monotonic() - start_time < 1
+    assert not quitted
+
+
+def test_claimed_session_is_not_quit(hub):
+    registry = LiveSessionRegistry()
+    registry.add("s1", hub.url_data)
+    registry.add("s2", hub.url_data)
+
+    assert registry.claim("s1")
+    assert not registry.claim("s1")
+    assert registry.quit_all(timeout=5) == ["s2"]
+    assert [path for path, _ in hub.requests] == ["/wd/hub/session/s2"]
+
+
+def test_store_keeps_unclaimed_sessions(hub, tmp_path):
+    store = SessionStore(str(tmp_path))
+    registry = LiveSessionRegistry(store)
+    registry.add("s1", hub.url_data)
+    registry.add("s2", hub.url_data)
+
+    registry.claim("s1")
+
+    entries = store.get_entries()
+    assert [entry["session_id"] for entry in entries] == ["s2"]
+    assert entries[0]["url"] == f"http://127.0.0.1:{hub.server_address[1]}/wd/hub"
+    assert entries[0]["pid"] == os.getpid()
+
+
+def test_reap_orphaned_sessions_of_dead_processes(hub, tmp_path):
+    store = SessionStore(str(tmp_path))
+    store.add("orphaned", hub.url_data)
+    store.add("alive", hub.url_data)
+    dead_process = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    orphaned_path = tmp_path / "orphaned.json"
+    entry = json.loads(orphaned_path.read_text())
+    entry["pid"] = int(dead_process.stdout)
+    orphaned_path.write_text(json.dumps(entry))
+
+    reaped = reap_orphaned_sessions(store, "user", "key", timeout=5)
+
+    assert reaped == ["orphaned"]
+    assert hub.requests == [("/wd/hub/session/orphaned", "Basic dXNlcjprZXk=")]
+    assert [entry["session_id"] for entry in store.get_entries()] == ["alive"]
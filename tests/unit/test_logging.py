@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import time
+
+import pytest
+
+from pytest_sosu.logging import (
+    JsonLinesWriter,
+    LazyStructLogger,
+    LogRingBuffer,
+    StdlibStructLogger,
+    StructLoggerFactory,
+)
+from pytest_sosu.webdriver import Browser, Capabilities
+
+
+def test_ring_buffer_keeps_last_events():
+    buffer = LogRingBuffer(maxlen=2)
+    for i in range(3):
+        buffer.append((0.0, logging.DEBUG, "test", f"event {i}", {"i": i}))
+
+    rendered = buffer.render().splitlines()
+
+    assert len(rendered) == 2
+    assert "event 1" in rendered[0]
+    assert "i=2" in rendered[1]
+
+
+def test_ring_buffer_resize_keeps_newest_events():
+    buffer = LogRingBuffer(maxlen=3)
+    for i in range(3):
+        buffer.append((0.0, logging.INFO, "test", f"event {i}", {}))
+
+    buffer.resize(1)
+
+    assert len(buffer) == 1
+    assert "event 2" in buffer.render()
+
+
+def test_lazy_logger_follows_logger_class_change():
+    class RecordingStructLogger(StdlibStructLogger):
+        messages = []
+
+        def debug(self, msg, **kwargs):
+            self.messages.append(msg)
+
+    factory = StructLoggerFactory(StdlibStructLogger)
+    logger = LazyStructLogger(factory, "test")
+    logger.debug("before")
+
+    factory.set_struct_logger_class(RecordingStructLogger)
+    logger.debug("after")
+
+    assert RecordingStructLogger.messages == ["after"]
+
+
+def test_json_lines_writer_writes_batches_on_close(tmp_path):
+    path = tmp_path / "events.jsonl"
+    writer = JsonLinesWriter(batch_size=2, flush_interval=60)
+    writer.open(str(path))
+    capabilities = Capabilities(browser=Browser("chrome"))
+    for i in range(3):
+        writer.append(
+            (
+                0.0,
+                logging.INFO,
+                "test",
+                "Driver starting",
+                {"i": i, "caps": capabilities},
+            )
+        )
+
+    writer.close()
+
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [event["data"]["i"] for event in events] == [0, 1, 2]
+    assert events[0]["level"] == "INFO"
+    assert events[0]["msg"] == "Driver starting"
+    assert events[0]["data"]["caps"] == capabilities.to_dict()
+
+
+def test_json_lines_writer_falls_back_to_repr(tmp_path):
+    path = tmp_path / "events.jsonl"
+    writer = JsonLinesWriter()
+    writer.open(str(path))
+    writer.append((0.0, logging.DEBUG, "test", "msg", {"obj": object}))
+    writer.close()
+
+    event = json.loads(path.read_text())
+    assert event["data"]["obj"] == repr(object)
+
+
+def test_json_lines_writer_open_fails_on_unwritable_path(tmp_path):
+    writer = JsonLinesWriter()
+
+    with pytest.raises(OSError):
+        writer.open(str(tmp_path / "missing" / "events.jsonl"))
+
+
+def test_json_lines_writer_survives_failing_events(tmp_path):
+    class Broken:
+        def __structlog__(self):
+            raise RuntimeError("changed during serialization")
+
+    path = tmp_path / "events.jsonl"
+    writer = JsonLinesWriter(batch_size=1)
+    writer.open(str(path))
+    writer.append((0.0, logging.INFO, "test", "broken", {"obj": Broken()}))
+    writer.append((0.0, logging.INFO, "test", "fine", {}))
+    writer.close()
+
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [event["msg"] for event in events] == ["broken", "fine"]
+    assert "changed during serialization" in events[0]["data"]["render_error"]
+
+
+def test_json_lines_writer_survives_write_errors(tmp_path):
+    path = tmp_path / "events.jsonl"
+    writer = JsonLinesWriter(batch_size=1, flush_interval=0.01)
+    writer.open(str(path))
+    os.close(writer._fd)  # pylint: disable=protected-access
+    writer._fd = os.open(path, os.O_RDONLY)  # pylint: disable=protected-access
+    writer.append((0.0, logging.INFO, "test", "lost", {}))
+    time.sleep(0.1)
+
+    writer.append((0.0, logging.INFO, "test", "lost too", {}))
+    time.sleep(0.1)
+
+    assert writer._thread.is_alive()  # pylint: disable=protected-access
+    assert len(writer._events) == 0  # pylint: disable=protected-access
+    writer.close()
+
+
+def test_json_lines_writer_drops_events_over_max_queue_size(tmp_path):
+    path = tmp_path / "events.jsonl"
+    writer = JsonLinesWriter(batch_size=100, flush_interval=60, max_queue_size=2)
+    writer.open(str(path))
+    for i in range(5):
+        writer.append((0.0, logging.INFO, "test", f"msg {i}", {}))
+    writer.close()
+
+    assert len(path.read_text().splitlines()) == 2
+    assert writer.dropped == 3
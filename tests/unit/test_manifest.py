@@ -0,0 +1,112 @@
+import os
+import time
+from types import SimpleNamespace
+
+from pytest_sosu.manifest import ProgressManifest, ProgressRecorder, prune_manifests
+
+pytest_plugins = ["pytester"]
+
+
+def _report(nodeid, when, outcome, **kwargs):
+    return SimpleNamespace(
+        nodeid=nodeid,
+        when=when,
+        outcome=outcome,
+        failed=outcome == "failed",
+        skipped=outcome == "skipped",
+        **kwargs,
+    )
+
+
+def test_manifest_finished_nodeids(tmp_path):
+    manifest = ProgressManifest(str(tmp_path), "build 1")
+    manifest.append("test_a", "chrome-latest", "passed")
+    manifest.append("test_b", "chrome-latest", "failed")
+    manifest.append("test_c", None, "skipped")
+    with open(manifest.path, "a", encoding="utf-8") as f:
+        f.write('{"nodeid": "test_d", "outc')
+
+    assert manifest.get_finished_nodeids() == {"test_a", "test_c"}
+    assert ProgressManifest(str(tmp_path), "build 2").read() == {}
+
+
+def test_recorder_records_final_outcome(tmp_path):
+    manifest = ProgressManifest(str(tmp_path), "build")
+    recorder = ProgressRecorder(manifest)
+
+    for report in [
+        _report("test_a", "setup", "passed"),
+        _report("test_a", "call", "infra-retry"),
+        _report("test_a", "teardown", "passed"),
+        _report("test_a", "setup", "passed"),
+        _report("test_a", "call", "passed"),
+        _report("test_a", "teardown", "passed", sosu_slug="chrome-latest"),
+        _report("test_b", "setup", "passed"),
+        _report("test_b", "call", "failed"),
+        _report("test_b", "teardown", "passed"),
+        _report("test_c", "setup", "skipped", sosu_slug_aborted=True),
+        _report("test_c", "teardown", "passed"),
+    ]:
+        recorder.pytest_runtest_logreport(report)
+
+    with open(manifest.path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
+    assert manifest.read() == {
+        "test_a": "passed",
+        "test_b": "failed",
+        "test_c": "aborted",
+    }
+    assert manifest.get_finished_nodeids() == {"test_a"}
+
+
+def test_prune_manifests(tmp_path):
+    old_manifest = ProgressManifest(str(tmp_path), "old")
+    old_manifest.append("test_a", None, "passed")
+    old_time = time.time() - 10 * 24 * 60 * 60
+    os.utime(old_manifest.path, (old_time, old_time))
+    new_manifest = ProgressManifest(str(tmp_path), "new")
+    new_manifest.append("test_a", None, "passed")
+
+    prune_manifests(str(tmp_path))
+
+    assert not os.path.exists(old_manifest.path)
+    assert os.path.exists(new_manifest.path)
+
+
+def test_resume_runs_tests_skipped_by_slug_abort(pytester, monkeypatch):
+    monkeypatch.setenv("SAUCE_USERNAME", "user")
+    monkeypatch.setenv("SAUCE_ACCESS_KEY", "key")
+    # Version alone identifies the build.
+    monkeypatch.setenv("SAUCE_BUILD_VERSION", "1")
+    pytester.makeconftest("""
+        import pytest
+
+        @pytest.hookimpl(trylast=True)
+        def pytest_configure(config):
+            # Slug already failing, so its tests are aborted before
+            # creating any session.
+            config.sosu_slug_failure_tracker.record_failure("chrome-latest")
+        """)
+    pytester.makepyfile("""
+        import pytest
+
+        from pytest_sosu.webdriver import Browser, Capabilities
+
+        @pytest.mark.sosu(capabilities=Capabilities(browser=Browser("chrome")))
+        def test_visit(sosu_selenium_webdriver):
+            pass
+
+        @pytest.mark.skip
+        def test_skipped():
+            pass
+
+        def test_plain():
+            pass
+        """)
+    args = ["-p", "pytest_sosu.plugin", "--sosu-abort-after", "1", "-v"]
+
+    pytester.runpytest(*args).assert_outcomes(passed=1, skipped=2)
+    result = pytester.runpytest(*args, "--sosu-resume")
+
+    result.assert_outcomes(skipped=1, deselected=2)
+    result.stdout.fnmatch_lines(["*::test_visit[[]chrome-latest[]] SKIPPED*"])
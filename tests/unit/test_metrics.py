@@ -0,0 +1,50 @@
+from pytest_sosu.metrics import (
+    SESSION_CREATE_SECONDS,
+    SESSIONS_OPENED_TOTAL,
+    MetricsRegistry,
+)
+
+
+def test_render():
+    registry = MetricsRegistry()
+    registry.inc(SESSIONS_OPENED_TOTAL, slug="chrome-97")
+    registry.observe(SESSION_CREATE_SECONDS, 0.75, slug="chrome-97")
+    registry.observe(SESSION_CREATE_SECONDS, 3, slug="chrome-97")
+
+    lines = registry.render().splitlines()
+
+    assert 'sosu_sessions_opened_total{slug="chrome-97"} 1' in lines
+    assert 'sosu_session_create_seconds_bucket{slug="chrome-97",le="0.5"} 0' in lines
+    assert 'sosu_session_create_seconds_bucket{slug="chrome-97",le="1"} 1' in lines
+    assert 'sosu_session_create_seconds_bucket{slug="chrome-97",le="5"} 2' in lines
+    assert 'sosu_session_create_seconds_bucket{slug="chrome-97",le="+Inf"} 2' in lines
+    assert 'sosu_session_create_seconds_sum{slug="chrome-97"} 3.75' in lines
+    assert 'sosu_session_create_seconds_count{slug="chrome-97"} 2' in lines
+    assert "# TYPE sosu_session_quit_seconds histogram" not in lines
+
+
+def test_merge_dict():
+    registry = MetricsRegistry()
+    registry.inc(SESSIONS_OPENED_TOTAL, slug="chrome-97")
+    registry.observe(SESSION_CREATE_SECONDS, 1, slug="chrome-97")
+    worker_registry = MetricsRegistry()
+    worker_registry.inc(SESSIONS_OPENED_TOTAL, 2, slug="chrome-97")
+    worker_registry.inc(SESSIONS_OPENED_TOTAL, slug="firefox-latest")
+    worker_registry.observe(SESSION_CREATE_SECONDS, 2, slug="chrome-97")
+
+    registry.merge_dict(worker_registry.to_dict())
+
+    assert registry.get_counter_value(SESSIONS_OPENED_TOTAL, slug="chrome-97") == 3
+    assert registry.get_counter_value(SESSIONS_OPENED_TOTAL, slug="firefox-latest") == 1
+    assert registry.get_histogram_count(SESSION_CREATE_SECONDS, slug="chrome-97") == 2
+
+
+def test_write_textfile(tmp_path):
+    registry = MetricsRegistry()
+    registry.inc(SESSIONS_OPENED_TOTAL, slug="chrome-97")
+    path = tmp_path / "sosu.prom"
+
+    registry.write_textfile(str(path))
+
+    assert path.read_text() == registry.render()
+    assert list(tmp_path.iterdir()) == [path]
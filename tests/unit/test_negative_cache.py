@@ -0,0 +1,56 @@
+import pytest
+from selenium.common.exceptions import SessionNotCreatedException
+
+from pytest_sosu.negative_cache import (
+    NegativeCache,
+    get_capabilities_payload_hash,
+    is_permanent_rejection,
+)
+from pytest_sosu.webdriver import Browser, Capabilities, SauceOptions
+
+CAPS = Capabilities(browser=Browser("chrome", 200))
+
+
+def test_get_capabilities_payload_hash_ignores_per_test_options():
+    caps_1 = CAPS.merge(Capabilities(sauce_options=SauceOptions(name="test 1")))
+    caps_2 = CAPS.merge(Capabilities(sauce_options=SauceOptions(name="test 2")))
+    caps_3 = CAPS.merge(Capabilities(sauce_options=SauceOptions(record_video=False)))
+
+    assert get_capabilities_payload_hash(caps_1) == get_capabilities_payload_hash(
+        caps_2
+    )
+    assert get_capabilities_payload_hash(caps_1) != get_capabilities_payload_hash(
+        caps_3
+    )
+
+
+@pytest.mark.parametrize(
+    "exc,expected_result",
+    [
+        (SessionNotCreatedException("Misconfigured -- Unsupported browser"), True),
+        (SessionNotCreatedException("Sauce could not start your job"), False),
+        (ValueError("unsupported"), False),
+    ],
+)
+def test_is_permanent_rejection(exc, expected_result):
+    assert is_permanent_rejection(exc) == expected_result
+
+
+def test_negative_cache(tmp_path):
+    negative_cache = NegativeCache(str(tmp_path / "cache"), ttl=60)
+
+    assert negative_cache.get(CAPS) is None
+    negative_cache.add(CAPS, "Unsupported browser")
+    assert negative_cache.get(CAPS) == "Unsupported browser"
+    assert negative_cache.get(Capabilities(browser=Browser("firefox"))) is None
+    negative_cache.clear()
+    assert negative_cache.get(CAPS) is None
+
+
+def test_negative_cache_expired(tmp_path):
+    negative_cache = NegativeCache(str(tmp_path), ttl=-1)
+
+    negative_cache.add(CAPS, "Unsupported browser")
+
+    assert negative_cache.get(CAPS) is None
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,59 @@
+import types
+
+from pytest_sosu.history import TestHistory
+from pytest_sosu.plan import PlannedSession, SessionPlan, build_session_plan
+from pytest_sosu.webdriver import Browser, Capabilities, SauceOptions
+
+CHROME_CAPS = Capabilities(browser=Browser("chrome"))
+FIREFOX_CAPS = Capabilities(browser=Browser("firefox"))
+
+
+def test_session_plan():
+    plan = SessionPlan(
+        sessions=[
+            PlannedSession("test_a[chrome-latest]", CHROME_CAPS, 120.0),
+            PlannedSession("test_b[chrome-latest]", CHROME_CAPS, 60.0),
+            PlannedSession("test_c[chrome-latest]", CHROME_CAPS, 60.0),
+            PlannedSession("test_a[firefox-latest]", FIREFOX_CAPS),
+        ],
+        concurrency=2,
+        default_duration=30.0,
+    )
+
+    assert plan.get_sessions_per_slug() == {"chrome-latest": 3, "firefox-latest": 1}
+    assert plan.get_unique_configurations_count() == 2
+    assert plan.get_session_minutes() == 4.5
+    assert plan.get_makespan() == 150.0
+
+
+def test_session_plan_unique_configurations():
+    plan = SessionPlan(
+        sessions=[
+            PlannedSession("test_a", CHROME_CAPS),
+            PlannedSession(
+                "test_b",
+                CHROME_CAPS.merge(
+                    Capabilities(sauce_options=SauceOptions(record_video=False))
+                ),
+            ),
+        ],
+    )
+
+    assert plan.get_sessions_per_slug() == {"chrome-latest": 2}
+    assert plan.get_unique_configurations_count() == 2
+
+
+def test_build_session_plan_counts_selenium_and_async_sessions():
+    items = [
+        types.SimpleNamespace(
+            nodeid="test_sync", fixturenames=["sosu_selenium_webdriver"]
+        ),
+        types.SimpleNamespace(
+            nodeid="test_async", fixturenames=["sosu_async_webdriver"]
+        ),
+        types.SimpleNamespace(nodeid="test_unit", fixturenames=["tmp_path"]),
+    ]
+
+    plan = build_session_plan(items, TestHistory(), concurrency=1)
+
+    assert [session.nodeid for session in plan.sessions] == ["test_sync", "test_async"]
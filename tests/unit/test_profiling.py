@@ -0,0 +1,115 @@
+import pstats
+import time
+
+import pytest
+
+from pytest_sosu.profiling import (
+    PluginProfiler,
+    build_collapsed_stacks,
+    profile_hot_path,
+    set_active_profiler,
+)
+
+
+def busy():
+    return sum(range(1000))
+
+
+@profile_hot_path
+def hot_function():
+    return busy()
+
+
+@profile_hot_path
+def hot_generator():
+    value = yield busy()
+    busy()
+    yield value
+
+
+@profile_hot_path
+def waiting_function():
+    time.sleep(0.2)
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    profiler = PluginProfiler(str(tmp_path / "profile.pstats"))
+    set_active_profiler(profiler)
+    yield profiler
+    set_active_profiler(None)
+
+
+def test_profile_hot_path_records_calls(profiler):
+    hot_function()
+    hot_function()
+
+    stats = profiler.collect()
+
+    calls = {name: func_stats[1] for (_, _, name), func_stats in stats.items()}
+    assert calls["hot_function"] == 2
+    assert calls["busy"] == 2
+
+
+def test_profile_hot_path_passes_sent_values(profiler):
+    gen = hot_generator()
+    next(gen)
+
+    assert gen.send("sent") == "sent"
+    stats = profiler.collect()
+    assert {name for _, _, name in stats} >= {"hot_generator", "busy"}
+
+
+def test_profile_hot_path_measures_cpu_time(profiler):
+    waiting_function()
+
+    stats = profiler.collect()
+
+    [cumulative_time] = [
+        func_stats[3]
+        for (_, _, name), func_stats in stats.items()
+        if name == "waiting_function"
+    ]
+    assert cumulative_time < 0.1
+
+
+def test_profile_hot_path_without_profiler():
+    assert hot_function() == busy()
+
+
+def test_write_outputs(profiler):
+    hot_function()
+
+    profiler.write()
+
+    stats = pstats.Stats(profiler.path)
+    assert stats.total_calls > 0
+    with open(profiler.collapsed_path, encoding="utf-8") as f:
+        stacks = [line.rsplit(" ", 1)[0] for line in f]
+    assert any(stack.startswith("hot_function (test_profiling.py") for stack in stacks)
+
+
+def test_build_collapsed_stacks_splits_shared_callees():
+    root_a = ("a.py", 1, "a")
+    root_b = ("b.py", 1, "b")
+    shared = ("c.py", 1, "c")
+    stats_data = {
+        root_a: (1, 1, 1.0, 4.0, {}),
+        root_b: (1, 1, 1.0, 2.0, {}),
+        shared: (
+            2,
+            2,
+            4.0,
+            4.0,
+            {root_a: (1, 1, 3.0, 3.0), root_b: (1, 1, 1.0, 1.0)},
+        ),
+    }
+
+    stacks = build_collapsed_stacks(stats_data)
+
+    assert stacks == {
+        "a (a.py:1)": 1.0,
+        "b (b.py:1)": 1.0,
+        "a (a.py:1);c (c.py:1)": 3.0,
+        "b (b.py:1);c (c.py:1)": 1.0,
+    }
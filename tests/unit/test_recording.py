@@ -0,0 +1,40 @@
+from pytest_sosu.history import TestHistory
+from pytest_sosu.recording import (
+    NO_RECORDING_SAUCE_OPTIONS,
+    AdaptiveRecordingPolicy,
+    get_code_hash,
+)
+from pytest_sosu.webdriver import SauceOptions
+
+
+def _example():
+    return 1
+
+
+def test_get_code_hash():
+    assert get_code_hash(_example) == get_code_hash(_example)
+    assert get_code_hash(_example) != get_code_hash(test_get_code_hash)
+
+
+def test_adaptive_recording_policy():
+    history = TestHistory()
+    policy = AdaptiveRecordingPolicy(history, stable_passes=2)
+    history.record_outcome("t", True, code_hash="a")
+    assert policy.get_sauce_options("t", "a") == SauceOptions()
+    history.record_outcome("t", True, code_hash="a")
+    assert policy.get_sauce_options("t", "a") == NO_RECORDING_SAUCE_OPTIONS
+
+
+def test_adaptive_recording_policy_code_changed():
+    history = TestHistory({"t": {"pass_streak": 5, "code_hash": "a"}})
+    policy = AdaptiveRecordingPolicy(history, stable_passes=2)
+    assert policy.get_sauce_options("t", "b") == SauceOptions()
+    history.record_outcome("t", True, code_hash="b")
+    assert history.get_pass_streak("t", "b") == 1
+
+
+def test_adaptive_recording_policy_failure_resets_streak():
+    history = TestHistory({"t": {"pass_streak": 5, "code_hash": "a"}})
+    policy = AdaptiveRecordingPolicy(history, stable_passes=2)
+    history.record_outcome("t", False, code_hash="a")
+    assert policy.get_sauce_options("t", "a") == SauceOptions()
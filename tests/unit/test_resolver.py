@@ -0,0 +1,60 @@
+import pytest
+
+from pytest_sosu.recording import NO_RECORDING_SAUCE_OPTIONS
+from pytest_sosu.resolver import CapabilitiesResolver
+from pytest_sosu.webdriver import Browser, Capabilities, Platform, SauceOptions
+
+
+def resolve_with_fixtures(test_name, build_name, recording_sauce_options, parameter):
+    sauce_options = SauceOptions(name=test_name, build=build_name)
+    if recording_sauce_options is not None:
+        sauce_options = sauce_options.merge(recording_sauce_options)
+    capabilities = Capabilities(
+        browser=Browser.default(),
+        platform=Platform.default(),
+        sauce_options=sauce_options,
+    )
+    return capabilities.merge(parameter)
+
+
+@pytest.mark.parametrize(
+    "recording_sauce_options,parameter",
+    (
+        (None, Capabilities()),
+        (None, Capabilities(browser=Browser("firefox"), platform=Platform("Linux"))),
+        (
+            NO_RECORDING_SAUCE_OPTIONS,
+            Capabilities(sauce_options=SauceOptions(tags=["a"])),
+        ),
+        (None, Capabilities(sauce_options=SauceOptions(name="custom name"))),
+    ),
+)
+def test_resolve_is_same_as_default_fixtures(recording_sauce_options, parameter):
+    resolver = CapabilitiesResolver(__name__)
+
+    for test_name in ["test_a", "test_b"]:
+        assert resolver.resolve(
+            test_name, "build", recording_sauce_options, parameter
+        ) == resolve_with_fixtures(
+            test_name, "build", recording_sauce_options, parameter
+        )
+
+
+def test_resolve_reuses_capabilities_not_depending_on_test():
+    resolver = CapabilitiesResolver(__name__)
+    parameter = Capabilities(
+        browser=Browser("firefox"),
+        sauce_options=SauceOptions(name="custom name"),
+    )
+
+    first = resolver.resolve("test_a", "build", None, parameter)
+    second = resolver.resolve(
+        "test_b",
+        "build",
+        None,
+        Capabilities(
+            browser=Browser("firefox"), sauce_options=SauceOptions(name="custom name")
+        ),
+    )
+
+    assert first is second
@@ -0,0 +1,164 @@
+import http.server
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from pytest_sosu.retries import is_infrastructure_failure
+
+pytest_plugins = ["pytester"]
+
+
+def _report(when, failed):
+    return SimpleNamespace(when=when, failed=failed)
+
+
+def _item(**kwargs):
+    return SimpleNamespace(fixturenames=["sosu_selenium_webdriver"], **kwargs)
+
+
+def test_is_infrastructure_failure():
+    item = _item(sosu_infrastructure_error_when_call=True)
+
+    assert is_infrastructure_failure(
+        item, [_report("setup", False), _report("call", True)]
+    )
+    assert not is_infrastructure_failure(
+        item, [_report("setup", False), _report("call", False)]
+    )
+
+
+def test_is_infrastructure_failure_mixed_with_test_failure():
+    item = _item(sosu_infrastructure_error_when_call=True)
+
+    assert not is_infrastructure_failure(
+        item, [_report("call", True), _report("teardown", True)]
+    )
+
+
+def test_is_infrastructure_failure_without_session():
+    item = SimpleNamespace(
+        fixturenames=["tmp_path"], sosu_infrastructure_error_when_call=True
+    )
+
+    assert not is_infrastructure_failure(item, [_report("call", True)])
+
+
+class FakeHub(http.server.ThreadingHTTPServer):
+    # Sessions with number up to `lost_sessions` are lost before
+    # the first command of the test.
+
+    def __init__(self, lost_sessions):
+        super().__init__(("127.0.0.1", 0), FakeHubHandler)
+        self.lost_sessions = lost_sessions
+        self.sessions = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/wd/hub"
+
+
+class FakeHubHandler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path == "/wd/hub/session":
+            self.server.sessions += 1
+            session_id = f"s{self.server.sessions}"
+            self._respond(200, {"sessionId": session_id, "capabilities": {}})
+        else:
+            self._respond(200, None)
+
+    def do_GET(self):
+        session_number = int(self.path.split("/")[4][1:])
+        if session_number <= self.server.lost_sessions:
+            self._respond(
+                404, {"error": "invalid session id", "message": "session deleted"}
+            )
+        else:
+            self._respond(200, "Example")
+
+    def do_DELETE(self):
+        self._respond(200, None)
+
+    def _respond(self, status, value):
+        data = json.dumps({"value": value}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+RETRIED_TESTS = """
+def test_lost_session(sosu_selenium_webdriver):
+    assert sosu_selenium_webdriver.title == "Example"
+
+
+def test_connection_error_in_test(sosu_selenium_webdriver):
+    raise ConnectionError("raised by the test itself")
+
+
+def test_without_session():
+    raise ConnectionError("raised by the test itself")
+"""
+
+
+@pytest.fixture
+def run_retried_tests(pytester, monkeypatch):
+    monkeypatch.setenv("SAUCE_USERNAME", "user")
+    monkeypatch.setenv("SAUCE_ACCESS_KEY", "key")
+    pytester.makepyfile(RETRIED_TESTS)
+
+    def run(lost_sessions, *args):
+        hub = FakeHub(lost_sessions)
+        thread = threading.Thread(target=hub.serve_forever, daemon=True)
+        thread.start()
+        monkeypatch.setenv("SAUCE_WEBDRIVER_URL", hub.url)
+        try:
+            result = pytester.runpytest("-p", "pytest_sosu.plugin", *args)
+        finally:
+            hub.shutdown()
+            hub.server_close()
+        return result, hub.sessions
+
+    return run
+
+
+def test_only_remote_session_failures_are_retried(run_retried_tests):
+    result, sessions = run_retried_tests(1, "--sosu-infra-retries=2", "-v")
+
+    # Lost session retried once, the other test with session run once.
+    assert sessions == 3
+    result.stdout.fnmatch_lines(
+        [
+            "*::test_lost_session INFRA-RETRY*",
+            "*::test_lost_session PASSED*",
+            "*::test_connection_error_in_test FAILED*",
+            "*::test_without_session FAILED*",
+        ]
+    )
+
+
+def test_infrastructure_retries_are_limited(run_retried_tests):
+    result, sessions = run_retried_tests(10, "--sosu-infra-retries=2")
+
+    assert sessions == 4
+    result.stdout.fnmatch_lines(
+        [
+            "*= sosu infrastructure retries =*",
+            "*::test_lost_session (call): *InvalidSessionIdException*",
+            "*::test_lost_session (call): *InvalidSessionIdException*",
+            "*= 3 failed, *2 infra-retry in *",
+        ]
+    )
+
+
+def test_infrastructure_failures_are_not_retried_by_default(run_retried_tests):
+    result, sessions = run_retried_tests(10)
+
+    assert sessions == 2
+    result.assert_outcomes(failed=3)
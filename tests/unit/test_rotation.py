@@ -0,0 +1,130 @@
+import math
+import types
+
+import pytest
+
+from pytest_sosu.plugin_helpers import has_rotation_items, select_rotation_items
+from pytest_sosu.rotation import (
+    ROTATION_CURSOR_CACHE_KEY,
+    RotationCursor,
+    is_in_rotation,
+)
+from pytest_sosu.webdriver import Browser, CapabilitiesMatrix
+
+pytest_plugins = ["pytester"]
+
+
+@pytest.mark.parametrize("count,fraction", ((10, 0.3), (7, 0.5), (5, 1.0), (3, 0.1)))
+def test_every_cell_is_run_within_rotation_period(count, fraction):
+    period = math.ceil(1 / fraction)
+    runs = [
+        [i for i in range(count) if is_in_rotation(i, count, fraction, build_number)]
+        for build_number in range(period)
+    ]
+
+    assert {i for run in runs for i in run} == set(range(count))
+    assert all(0 < len(run) <= max(count * fraction + 1, 1) for run in runs)
+
+
+def make_item(nodeid, caps_matrix, capabilities, index=0):
+    return types.SimpleNamespace(
+        nodeid=nodeid,
+        own_markers=[pytest.mark.sosu(capabilities_matrix=caps_matrix).mark],
+        callspec=types.SimpleNamespace(
+            params={"sosu_webdriver_parameter_capabilities": capabilities},
+            indices={"sosu_webdriver_parameter_capabilities": index},
+        ),
+    )
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnknownMarkWarning")
+def test_select_rotation_items_keeps_failed_cells():
+    caps_matrix = CapabilitiesMatrix(
+        browsers=[Browser("chrome"), Browser("firefox"), Browser("safari")],
+        rotation=1 / 3,
+    )
+    items = [
+        make_item(f"test_visit[{caps.slug}]", caps_matrix, caps, i)
+        for i, caps in enumerate(caps_matrix.iter_capabilities())
+    ]
+
+    selected, deselected = select_rotation_items(
+        items, build_number=1, failed_nodeids={"test_visit[safari-latest]"}
+    )
+
+    assert [item.nodeid for item in selected] == [
+        "test_visit[firefox-latest]",
+        "test_visit[safari-latest]",
+    ]
+    assert [item.nodeid for item in deselected] == ["test_visit[chrome-latest]"]
+
+
+class FakeCache(dict):
+    def set(self, key, value):
+        self[key] = value
+
+
+@pytest.mark.parametrize(
+    "tests_ran,exitstatus,expected_value",
+    [
+        (True, pytest.ExitCode.OK, 4),
+        (True, pytest.ExitCode.TESTS_FAILED, 4),
+        (True, pytest.ExitCode.INTERRUPTED, 3),
+        (False, pytest.ExitCode.OK, 3),
+    ],
+)
+def test_rotation_cursor_advances_only_after_tests_ran(
+    tests_ran, exitstatus, expected_value
+):
+    cache = FakeCache({ROTATION_CURSOR_CACHE_KEY: 3})
+    cursor = RotationCursor(cache)
+
+    if tests_ran:
+        cursor.pytest_runtest_logreport()
+    cursor.pytest_sessionfinish(exitstatus)
+
+    assert cache[ROTATION_CURSOR_CACHE_KEY] == expected_value
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnknownMarkWarning")
+def test_has_rotation_items():
+    caps_matrix = CapabilitiesMatrix(browsers=[Browser("chrome")], rotation=0.5)
+    items = [
+        make_item("test_visit", caps_matrix, next(caps_matrix.iter_capabilities()))
+    ]
+
+    assert has_rotation_items(items)
+    assert not has_rotation_items(
+        [
+            make_item(
+                "test_other", CapabilitiesMatrix(browsers=[Browser("chrome")]), None
+            )
+        ]
+    )
+
+
+def test_rotation_of_matrix_with_unhashable_options(pytester, monkeypatch):
+    monkeypatch.setenv("SAUCE_USERNAME", "user")
+    monkeypatch.setenv("SAUCE_ACCESS_KEY", "key")
+    pytester.makepyfile("""
+        import pytest
+
+        from pytest_sosu.webdriver import Browser, CapabilitiesMatrix, SauceOptions
+
+        @pytest.mark.sosu(
+            capabilities_matrix=CapabilitiesMatrix(
+                browsers=[Browser("chrome"), Browser("firefox")],
+                sauce_options_list=[SauceOptions(tags=["smoke"])],
+                rotation=0.5,
+            )
+        )
+        def test_visit(sosu_webdriver_parameter_capabilities):
+            pass
+        """)
+
+    result = pytester.runpytest(
+        "-p", "pytest_sosu.plugin", "--co", "--sosu-rotation-build", "1"
+    )
+
+    assert result.ret == pytest.ExitCode.OK
+    result.stdout.fnmatch_lines(["*test_visit*firefox*", "*1/2 tests collected*"])
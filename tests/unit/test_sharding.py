@@ -0,0 +1,119 @@
+import pytest
+
+from pytest_sosu.sharding import Shard, load_shard_durations, split_into_shard
+
+pytest_plugins = ["pytester"]
+
+KEYS = [f"tests/test_foo.py::test_{i}[chrome-latest]" for i in range(100)]
+
+
+def _get_shards(keys, count, durations):
+    return [
+        {keys[i] for i in split_into_shard(keys, Shard(index, count), durations)[0]}
+        for index in range(1, count + 1)
+    ]
+
+
+@pytest.mark.parametrize(
+    "value,expected_shard",
+    [
+        ("1/1", Shard(1, 1)),
+        ("2/3", Shard(2, 3)),
+    ],
+)
+def test_shard_from_str(value, expected_shard):
+    assert Shard.from_str(value) == expected_shard
+
+
+@pytest.mark.parametrize("value", ["1", "0/3", "4/3", "a/b"])
+def test_shard_from_str_invalid(value):
+    with pytest.raises(ValueError):
+        Shard.from_str(value)
+
+
+def test_split_into_shard_count_balanced():
+    shards = _get_shards(KEYS, 4, {})
+
+    assert set().union(*shards) == set(KEYS)
+    assert sum(len(shard) for shard in shards) == len(KEYS)
+    assert all(24 <= len(shard) <= 26 for shard in shards)
+
+
+def test_split_into_shard_duration_balanced():
+    durations = {key: 10.0 if i < 10 else 1.0 for i, key in enumerate(KEYS)}
+
+    shards = _get_shards(KEYS, 4, durations)
+
+    ideal_duration = sum(durations.values()) / 4
+    for shard in shards:
+        shard_duration = sum(durations[key] for key in shard)
+        assert abs(shard_duration - ideal_duration) <= max(durations.values())
+
+
+def test_split_into_shard_stable_when_key_added():
+    shards = _get_shards(KEYS, 4, {})
+    new_shards = _get_shards(KEYS + ["tests/test_foo.py::test_new"], 4, {})
+
+    moved = sum(len(shard - new_shard) for shard, new_shard in zip(shards, new_shards))
+    assert moved <= 3
+
+
+def test_load_shard_durations(tmp_path):
+    path = tmp_path / "durations.json"
+    path.write_text(
+        '{"tests/test_foo.py::test_1": 1.5, "tests/test_foo.py::test_2": 2}'
+    )
+
+    assert load_shard_durations(str(path)) == {
+        "tests/test_foo.py::test_1": 1.5,
+        "tests/test_foo.py::test_2": 2.0,
+    }
+
+
+@pytest.mark.parametrize("content", ['["test_1"]', '{"test_1": "slow"}', "{"])
+def test_load_shard_durations_invalid(tmp_path, content):
+    path = tmp_path / "durations.json"
+    path.write_text(content)
+
+    with pytest.raises(ValueError):
+        load_shard_durations(str(path))
+
+
+def test_exported_durations_balance_shards(pytester, monkeypatch):
+    monkeypatch.setenv("SAUCE_USERNAME", "user")
+    monkeypatch.setenv("SAUCE_ACCESS_KEY", "key")
+    pytester.makepyfile("""
+        import time
+
+        import pytest
+
+        def test_slow():
+            time.sleep(0.3)
+
+        @pytest.mark.parametrize("i", range(5))
+        def test_fast(i):
+            pass
+        """)
+    durations_path = pytester.path / "durations.json"
+
+    pytester.runpytest(
+        "-p", "pytest_sosu.plugin", "--sosu-export-durations", str(durations_path)
+    ).assert_outcomes(passed=6)
+    durations = load_shard_durations(str(durations_path))
+
+    assert len(durations) == 6
+    nodeids = sorted(durations)
+    shards = []
+    for index in (1, 2):
+        result = pytester.runpytest(
+            "-p",
+            "pytest_sosu.plugin",
+            "--co",
+            "-q",
+            f"--sosu-shard={index}/2",
+            f"--sosu-shard-durations={durations_path}",
+        )
+        shards.append({line for line in result.outlines if "::" in line})
+    assert shards == _get_shards(nodeids, 2, durations)
+    # The slow test alone takes most of the time.
+    assert {"test_exported_durations_balance_shards.py::test_slow"} in shards
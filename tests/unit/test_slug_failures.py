@@ -0,0 +1,23 @@
+from pytest_sosu.slug_failures import SlugFailureTracker
+
+
+def test_should_skip_after_consecutive_failures(tmp_path):
+    tracker = SlugFailureTracker(str(tmp_path), threshold=2)
+
+    tracker.record_failure("chrome-97-on-Windows-10")
+    assert not tracker.should_skip("chrome-97-on-Windows-10")
+    tracker.record_failure("chrome-97-on-Windows-10")
+    assert tracker.should_skip("chrome-97-on-Windows-10")
+    assert not tracker.should_skip("firefox-96-on-Windows-10")
+
+
+def test_success_resets_consecutive_failures(tmp_path):
+    tracker = SlugFailureTracker(str(tmp_path), threshold=2)
+    other_worker_tracker = SlugFailureTracker(str(tmp_path), threshold=2)
+
+    tracker.record_failure("chrome-latest")
+    other_worker_tracker.record_success("chrome-latest")
+    tracker.record_failure("chrome-latest")
+
+    assert tracker.get_consecutive_failures("chrome-latest") == 1
+    assert not other_worker_tracker.should_skip("chrome-latest")
@@ -0,0 +1,159 @@
+import os
+import shlex
+import subprocess
+import sys
+import time
+
+import pytest
+
+from pytest_sosu.tunnel import SharedTunnel, TunnelError, build_tunnel_command
+from pytest_sosu.utils import is_process_alive
+
+STAND_IN_SCRIPT = """
+import os, sys, time
+with open(sys.argv[1], "a") as f:
+    f.write(f"{os.getpid()}\\n")
+time.sleep(float(sys.argv[3]))
+if sys.argv[2]:
+    open(sys.argv[2], "w").close()
+time.sleep(60)
+"""
+
+
+@pytest.fixture
+def stand_in(tmp_path):
+    script_path = tmp_path / "tunnel.py"
+    script_path.write_text(STAND_IN_SCRIPT)
+    starts_path = tmp_path / "starts"
+
+    def build(readyfile="${readyfile}", delay=0.0, timeout=10.0):
+        command = " ".join(
+            [
+                shlex.quote(sys.executable),
+                shlex.quote(str(script_path)),
+                shlex.quote(str(starts_path)),
+                readyfile,
+                str(delay),
+            ]
+        )
+        return SharedTunnel(
+            "my tunnel",
+            command,
+            username="user",
+            access_key="key",
+            timeout=timeout,
+            directory=str(tmp_path / "tunnels"),
+        )
+
+    def get_pids():
+        if not starts_path.exists():
+            return []
+        return [int(line) for line in starts_path.read_text().split()]
+
+    build.get_pids = get_pids
+    return build
+
+
+def wait_for_exit(pid, timeout=5):
+    deadline = time.monotonic() + timeout
+    while is_process_alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return not is_process_alive(pid)
+
+
+def test_build_tunnel_command():
+    assert build_tunnel_command(
+        "sc -u ${username} -i '${tunnel_name}' -f ${readyfile} -r ${region} ${x}",
+        tunnel_name="my tunnel",
+        readyfile="/tmp/ready",
+        username="user",
+        access_key="key",
+    ) == ["sc", "-u", "user", "-i", "my tunnel", "-f", "/tmp/ready", "-r", "", "${x}"]
+
+
+def test_tunnel_is_started_once_and_stopped_by_last_user(stand_in):
+    first = stand_in(delay=0.3)
+    second = stand_in()
+
+    first.acquire()
+    assert os.path.exists(first.readyfile)
+    second.acquire()
+
+    [pid] = stand_in.get_pids()
+    first.release()
+    assert is_process_alive(pid)
+    assert os.path.exists(second.readyfile)
+
+    second.release()
+    assert wait_for_exit(pid)
+    assert not os.path.exists(second.readyfile)
+
+
+def test_tunnel_is_restarted_after_being_stopped(stand_in):
+    tunnel = stand_in()
+
+    tunnel.acquire()
+    tunnel.release()
+    tunnel.acquire()
+    tunnel.release()
+
+    assert len(stand_in.get_pids()) == 2
+
+
+def test_users_of_dead_processes_are_ignored(stand_in):
+    tunnel = stand_in()
+    tunnel.acquire()
+    users_dir = os.path.join(tunnel.directory, "users")
+    # PID above the default Linux limit, never alive.
+    open(os.path.join(users_dir, "4194304-dead"), "w").close()
+
+    tunnel.release()
+
+    [pid] = stand_in.get_pids()
+    assert wait_for_exit(pid)
+    assert os.listdir(users_dir) == []
+
+
+def test_tunnel_not_ready_within_timeout(stand_in):
+    tunnel = stand_in(readyfile="''", timeout=0.5)
+
+    with pytest.raises(TunnelError, match="not ready within"):
+        tunnel.acquire()
+
+    [pid] = stand_in.get_pids()
+    assert wait_for_exit(pid)
+
+
+def test_tunnel_exited_before_being_ready(tmp_path):
+    tunnel = SharedTunnel(
+        "my-tunnel",
+        f"{shlex.quote(sys.executable)} -c pass",
+        username="user",
+        access_key="key",
+        directory=str(tmp_path),
+    )
+
+    with pytest.raises(TunnelError, match="exited before being ready"):
+        tunnel.acquire()
+
+
+def test_reused_pid_is_not_stopped(stand_in):
+    tunnel = stand_in()
+    os.makedirs(tunnel.directory)
+    # Unrelated process group leader, as if it got the pid of a dead tunnel.
+    process = subprocess.Popen(
+        [sys.executable, "-c", "import time; time.sleep(60)"],
+        start_new_session=True,
+    )
+    try:
+        with open(os.path.join(tunnel.directory, "pid"), "w") as f:
+            f.write(f"{process.pid} 1")
+
+        tunnel.acquire()
+        tunnel.release()
+
+        assert len(stand_in.get_pids()) == 1
+        assert process.poll() is None
+    finally:
+        process.kill()
+        process.wait()
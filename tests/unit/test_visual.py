@@ -0,0 +1,88 @@
+import io
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+# pylint: disable=wrong-import-position
+from pytest_sosu.visual import VisualBaselines  # noqa: E402
+
+
+def make_png(pixels):
+    output = io.BytesIO()
+    Image.fromarray(pixels).save(output, format="PNG")
+    return output.getvalue()
+
+
+@pytest.fixture
+def pixels():
+    return numpy.full((40, 60, 3), 200, dtype=numpy.uint8)
+
+
+@pytest.fixture
+def checker(tmp_path):
+    return VisualBaselines(str(tmp_path)).for_test("test_a.py::test_a", "chrome")
+
+
+def check_png_creating_baseline(checker, data, **kwargs):
+    with pytest.raises(AssertionError, match="has no baseline"):
+        checker.check_png(data, **kwargs)
+    return checker.comparisons[-1]
+
+
+def test_first_check_creates_baseline_and_fails(checker, pixels):
+    first = check_png_creating_baseline(checker, make_png(pixels))
+    second = checker.check_png(make_png(pixels))
+
+    assert first.created
+    assert second.identical
+    assert numpy.array_equal(numpy.load(first.baseline_path), pixels)
+
+
+def test_update_creates_baseline_without_failing(tmp_path, pixels):
+    baselines = VisualBaselines(str(tmp_path), update=True)
+    checker = baselines.for_test("test_a.py::test_a", "chrome")
+
+    assert checker.check_png(make_png(pixels)).created
+
+
+def test_check_fails_on_changed_pixels(checker, pixels):
+    check_png_creating_baseline(checker, make_png(pixels))
+    changed = pixels.copy()
+    changed[0:4, 0:6] = 0
+
+    with pytest.raises(AssertionError, match="1.00% of pixels"):
+        checker.check_png(make_png(changed))
+    comparison = checker.check_png(make_png(changed), max_diff_ratio=0.01)
+    assert comparison.diff_ratio == pytest.approx(0.01)
+
+
+def test_check_ignores_regions(checker, pixels):
+    check_png_creating_baseline(
+        checker, make_png(pixels), ignore_regions=[(0, 0, 10, 10)]
+    )
+    changed = pixels.copy()
+    changed[0:10, 0:10] = 0
+
+    comparison = checker.check_png(make_png(changed), ignore_regions=[(0, 0, 10, 10)])
+
+    assert comparison.identical
+
+
+def test_check_fails_on_size_change(checker, pixels):
+    check_png_creating_baseline(checker, make_png(pixels))
+
+    with pytest.raises(AssertionError, match="different size"):
+        checker.check_png(make_png(pixels[:20]))
+
+
+def test_update_replaces_baseline(tmp_path, pixels):
+    baselines = VisualBaselines(str(tmp_path), update=True)
+    checker = baselines.for_test("test_a.py::test_a", "chrome")
+    checker.check_png(make_png(pixels))
+    changed = pixels.copy()
+    changed[0, 0] = 0
+
+    assert checker.check_png(make_png(changed)).updated
+    assert checker.check_png(make_png(changed)).identical
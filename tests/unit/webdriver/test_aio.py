@@ -0,0 +1,180 @@
+import asyncio
+import json
+from urllib.parse import urlsplit
+
+import pytest
+from selenium.common.exceptions import (  # type: ignore
+    NoSuchElementException,
+    SessionNotCreatedException,
+)
+
+from pytest_sosu.webdriver import Browser, Capabilities, WebDriverUrlData
+from pytest_sosu.webdriver.aio import (
+    ELEMENT_KEY,
+    AsyncWebElement,
+    async_remote_webdriver_ctx,
+    create_async_remote_webdriver,
+)
+
+pytest.importorskip("aiohttp")
+
+
+class FakeHub:
+    def __init__(self, drop_reused=False):
+        self.requests = []
+        self.connections = 0
+        # Closes kept alive connections instead of responding, as done
+        # by servers closing idle connections.
+        self.drop_reused = drop_reused
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        connection_requests = 0
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            connection_requests += 1
+            if self.drop_reused and connection_requests > 1:
+                break
+            method, url, _ = request_line.decode().split(" ", 2)
+            # Absolute URL when requested through a proxy.
+            path = urlsplit(url).path
+            self.proxied = url != path
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line == b"\r\n":
+                    break
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            payload = json.loads(body) if body else None
+            self.requests.append((method, path, payload))
+            status, value = self.respond(method, path, payload)
+            data = json.dumps({"value": value}).encode()
+            if path.endswith("/title"):
+                writer.write(
+                    f"HTTP/1.1 {status} OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                    f"{len(data):x}\r\n".encode() + data + b"\r\n0\r\n\r\n"
+                )
+            else:
+                # No reason phrase, which is optional.
+                head = f"HTTP/1.1 {status}\r\nContent-Length: {len(data)}\r\n"
+                writer.write(head.encode() + b"\r\n" + data)
+            await writer.drain()
+        writer.close()
+
+    def respond(self, method, path, payload):
+        if path == "/wd/hub/session":
+            caps = payload["capabilities"]["alwaysMatch"]
+            if caps.get("browserName") == "broken":
+                return 500, {"error": "session not created", "message": "nope"}
+            return 200, {"sessionId": "abc", "capabilities": caps}
+        if path.endswith("/title"):
+            return 200, "Example"
+        if path.endswith("/element") and payload["value"] == '[id="missing"]':
+            return 404, {"error": "no such element", "message": "missing"}
+        if path.endswith("/element"):
+            return 200, {ELEMENT_KEY: "el-1"}
+        return 200, None
+
+
+def run_with_hub(coro_func, hub=None, host=None):
+    hub = hub or FakeHub()
+
+    async def main():
+        server = await asyncio.start_server(hub.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        url_data = WebDriverUrlData(host="127.0.0.1", port=port, scheme="http")
+        if host is not None:
+            hub.address = f"127.0.0.1:{port}"
+            url_data = WebDriverUrlData(host=host, scheme="http")
+        try:
+            await coro_func(url_data)
+        finally:
+            server.close()
+            await server.wait_closed()
+        return hub
+
+    return asyncio.run(main())
+
+
+def test_async_remote_webdriver_ctx():
+    async def scenario(url_data):
+        async with async_remote_webdriver_ctx(url_data, Capabilities()) as driver:
+            await driver.get("https://example.com")
+            titles = await asyncio.gather(driver.title, driver.title)
+            assert titles == ["Example", "Example"]
+            element = await driver.find_element("id", "main")
+            assert isinstance(element, AsyncWebElement)
+            await element.click()
+            with pytest.raises(NoSuchElementException):
+                await driver.find_element("id", "missing")
+
+    hub = run_with_hub(scenario)
+
+    assert [(m, p) for m, p, _ in hub.requests][-2:] == [
+        ("POST", "/wd/hub/session/abc/execute/sync"),
+        ("DELETE", "/wd/hub/session/abc"),
+    ]
+    assert hub.requests[-2][2]["script"] == "sauce:job-result=passed"
+    assert hub.connections < len(hub.requests)
+
+
+def test_async_remote_webdriver_ctx_without_quit_closes_http_session():
+    async def scenario(url_data):
+        async with async_remote_webdriver_ctx(
+            url_data, Capabilities(), quit_on_finish=False
+        ) as driver:
+            assert await driver.title == "Example"
+            client_session = driver._client._session
+        assert client_session.closed
+
+    hub = run_with_hub(scenario)
+
+    assert "DELETE" not in [m for m, _, _ in hub.requests]
+
+
+def test_create_async_remote_webdriver_rejected():
+    async def scenario(url_data):
+        capabilities = Capabilities(browser=Browser("broken"))
+        with pytest.raises(SessionNotCreatedException, match="nope"):
+            await create_async_remote_webdriver(url_data, capabilities)
+
+    run_with_hub(scenario)
+
+
+def test_stale_keep_alive_connection_is_retried():
+    async def scenario(url_data):
+        driver = await create_async_remote_webdriver(url_data, Capabilities())
+        assert await driver.title == "Example"
+        await driver.close()
+
+    hub = run_with_hub(scenario, hub=FakeHub(drop_reused=True))
+
+    assert [p for _, p, _ in hub.requests] == [
+        "/wd/hub/session",
+        "/wd/hub/session/abc/title",
+    ]
+    assert hub.connections == 2
+
+
+def test_requests_go_through_proxy_from_environment(monkeypatch):
+    monkeypatch.delenv("NO_PROXY", raising=False)
+    monkeypatch.delenv("no_proxy", raising=False)
+    hub = FakeHub()
+
+    async def scenario(url_data):
+        monkeypatch.setenv("HTTP_PROXY", f"http://{hub.address}")
+        driver = await create_async_remote_webdriver(url_data, Capabilities())
+        assert await driver.title == "Example"
+        await driver.close()
+
+    run_with_hub(scenario, hub=hub, host="hub.invalid")
+
+    assert hub.proxied
+    assert [p for _, p, _ in hub.requests] == [
+        "/wd/hub/session",
+        "/wd/hub/session/abc/title",
+    ]
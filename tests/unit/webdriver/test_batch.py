@@ -0,0 +1,78 @@
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from pytest_sosu.webdriver.batch import Batch, BatchNotExecuted
+
+
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+        self.clicked = False
+
+    def click(self):
+        self.clicked = True
+
+
+class FakeDriver:
+    def __init__(self, script_output=None):
+        self.script_output = script_output
+        self.scripts = []
+        self.elements = {}
+
+    def execute_script(self, script, *args):
+        self.scripts.append(args)
+        return self.script_output
+
+    def find_element(self, by, value):
+        return self.elements[(by, value)]
+
+
+def test_execute_in_browser():
+    driver = FakeDriver(script_output={"results": ["element", "Example", None]})
+
+    with Batch(driver) as batch:
+        element = batch.find(By.ID, "title")
+        text = batch.text(element)
+        batch.click(element)
+
+    assert text.value == "Example"
+    assert element.value == "element"
+    assert driver.scripts == [
+        (
+            [
+                ["find", "css selector", '[id="title"]', None],
+                ["text", {"$ref": 0}],
+                ["click", {"$ref": 0}],
+            ],
+        )
+    ]
+
+
+def test_execute_in_browser_element_not_found():
+    driver = FakeDriver(
+        script_output={"error": {"index": 0, "by": "css selector", "value": "#a"}}
+    )
+    batch = Batch(driver)
+    batch.find(By.CSS_SELECTOR, "#a")
+
+    with pytest.raises(NoSuchElementException):
+        batch.execute()
+
+
+def test_execute_one_by_one_for_unsupported_locator():
+    driver = FakeDriver()
+    driver.elements[(By.LINK_TEXT, "More")] = FakeElement("More")
+    batch = Batch(driver)
+    element = batch.find(By.LINK_TEXT, "More")
+    text = batch.text(element)
+    batch.click(element)
+
+    with pytest.raises(BatchNotExecuted):
+        assert text.value
+
+    batch.execute()
+
+    assert not driver.scripts
+    assert text.value == "More"
+    assert element.value.clicked
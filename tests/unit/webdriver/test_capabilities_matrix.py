@@ -1,3 +1,5 @@
+import pytest
+
 from pytest_sosu.webdriver import Browser, Capabilities, CapabilitiesMatrix, Platform
 
 
@@ -16,3 +18,8 @@ def test_iter_capabilities():
         Capabilities(platform=win_10, browser=chrome_97),
         Capabilities(platform=win_10, browser=ff_96),
     }
+
+
+def test_rotation_has_to_be_fraction():
+    with pytest.raises(ValueError):
+        CapabilitiesMatrix(browsers=[Browser("chrome")], rotation=0)
@@ -0,0 +1,36 @@
+from pytest_sosu.webdriver.commands import CommandStats, TimedCommandExecutor
+
+
+class FakeCommandExecutor:
+    url = "http://localhost:4444/wd/hub"
+
+    def execute(self, command, params):
+        return {"value": command}
+
+
+def test_timed_command_executor():
+    command_stats = CommandStats()
+    executor = TimedCommandExecutor(FakeCommandExecutor(), command_stats)
+
+    assert executor.execute("findElement", {}) == {"value": "findElement"}
+    executor.execute("findElement", {})
+    executor.execute("clickElement", {})
+
+    assert executor.url == "http://localhost:4444/wd/hub"
+    assert command_stats.get("findElement").count == 2
+    assert command_stats.get("clickElement").count == 1
+    assert command_stats.get("get").count == 0
+
+
+def test_merge_dict():
+    command_stats = CommandStats()
+    command_stats.record("get", 1.5)
+    command_stats.record("findElement", 0.25)
+    other_command_stats = CommandStats()
+    other_command_stats.record("get", 0.5)
+
+    command_stats.merge_dict(other_command_stats.to_dict())
+
+    assert [command for command, _ in command_stats.get_slowest(1)] == ["get"]
+    timing = command_stats.get("get")
+    assert (timing.count, timing.total, timing.max, timing.avg) == (2, 2.0, 1.5, 1.0)
@@ -0,0 +1,61 @@
+import pytest
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    SessionNotCreatedException,
+    WebDriverException,
+)
+from urllib3.exceptions import MaxRetryError
+
+from pytest_sosu.exceptions import SosuInfrastructureWarning
+from pytest_sosu.webdriver.errors import (
+    is_infrastructure_error,
+    mark_remote_session_error,
+    remote_session_errors,
+    warn_on_infrastructure_error,
+)
+
+
+@pytest.mark.parametrize(
+    "exc,expected_result",
+    [
+        pytest.param(SessionNotCreatedException("unsupported"), True, id="creation"),
+        pytest.param(
+            mark_remote_session_error(MaxRetryError(None, "/session")),
+            True,
+            id="connection",
+        ),
+        pytest.param(
+            mark_remote_session_error(ConnectionError()), True, id="remote builtin"
+        ),
+        pytest.param(ConnectionError(), False, id="builtin"),
+        pytest.param(MaxRetryError(None, "/"), False, id="connection of test code"),
+        pytest.param(
+            WebDriverException("Test did not see a new command for 90 seconds"),
+            True,
+            id="sauce idle timeout",
+        ),
+        pytest.param(NoSuchElementException("no such element"), False, id="element"),
+        pytest.param(AssertionError(), False, id="assertion"),
+    ],
+)
+def test_is_infrastructure_error(exc, expected_result):
+    assert is_infrastructure_error(exc) == expected_result
+
+
+def test_remote_session_errors():
+    with pytest.raises(TimeoutError) as exc_info:
+        with remote_session_errors():
+            raise TimeoutError()
+
+    assert is_infrastructure_error(exc_info.value)
+
+
+def test_warn_on_infrastructure_error():
+    with pytest.warns(SosuInfrastructureWarning, match="quit of session abc"):
+        with warn_on_infrastructure_error("quit", "abc"):
+            with remote_session_errors():
+                raise MaxRetryError(None, "/session/abc")
+
+    with pytest.raises(NoSuchElementException):
+        with warn_on_infrastructure_error("quit", "abc"):
+            raise NoSuchElementException("missing")
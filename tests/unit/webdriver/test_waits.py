@@ -0,0 +1,82 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+
+from pytest_sosu.webdriver.waits import (
+    element_visible,
+    network_idle,
+    text_present,
+    wait_for,
+)
+
+
+class FakeDriver:
+    def __init__(self, script_output=None, script_timeout=30.0):
+        self.script_output = script_output
+        self.scripts = []
+        self.elements = {}
+        self.sosu_script_timeout = script_timeout
+        self.script_timeouts = []
+
+    def execute_async_script(self, script, *args):
+        self.scripts.append((self.sosu_script_timeout, *args))
+        return self.script_output
+
+    def set_script_timeout(self, timeout):
+        self.script_timeouts.append(timeout)
+        self.sosu_script_timeout = timeout
+
+    def find_element(self, by, value):
+        return self.elements[(by, value)]
+
+
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+
+    def is_displayed(self):
+        return True
+
+
+def test_wait_for_in_browser():
+    driver = FakeDriver(script_output={"value": "element"})
+
+    result = wait_for(driver, element_visible(By.ID, "main"), timeout=2)
+
+    assert result == "element"
+    assert driver.scripts == [
+        (30.0, ["visible", "css selector", '[id="main"]'], 2000, 100)
+    ]
+    assert not driver.script_timeouts
+
+
+def test_wait_for_network_idle():
+    driver = FakeDriver(script_output={"value": True})
+
+    assert wait_for(driver, network_idle(idle_time=0.25)) is True
+    assert driver.scripts[0][1] == ["network_idle", 250]
+
+
+def test_wait_for_longer_than_script_timeout():
+    driver = FakeDriver(script_output={"value": True}, script_timeout=10.0)
+
+    wait_for(driver, network_idle(), timeout=60)
+    wait_for(driver, network_idle(), timeout=60)
+
+    assert [script[0] for script in driver.scripts] == [65.0, 65.0]
+    assert driver.script_timeouts == [65.0]
+
+
+def test_wait_for_timeout():
+    driver = FakeDriver(script_output={"timeout": True})
+
+    with pytest.raises(TimeoutException):
+        wait_for(driver, text_present(By.CSS_SELECTOR, "h1", "Welcome"), timeout=1)
+
+
+def test_wait_for_client_side_fallback():
+    driver = FakeDriver()
+    driver.elements[(By.LINK_TEXT, "Next")] = FakeElement("Next page")
+
+    assert wait_for(driver, text_present(By.LINK_TEXT, "Next", "page"), timeout=1)
+    assert not driver.scripts